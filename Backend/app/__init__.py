@@ -1,6 +1,6 @@
-from flask import Flask
-
 def create_app():
+    # Imported here so the shared app.utils modules load without Flask installed
+    from flask import Flask
     app = Flask(__name__)
     
     # Load configuration settings
@@ -1,18 +1,27 @@
 from typing import List
 import time
 import os
-import json
+from app.agents.entities import unique_items
+from app.utils.audit_log import AuditLogWriter, get_audit_log
 
 class AuditAgent:
-    def log_metadata(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str):
-        """Enhanced audit logging with more details"""
+    def __init__(self, writer: AuditLogWriter = None):
+        # Segmented append-only log shared by the process unless a writer is injected
+        self.writer = writer
+
+    def build_metadata(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str, profile: dict = None, compliance_type: str = None, processing_ms: float = None, incremental: dict = None) -> dict:
+        """Enhanced audit metadata with more details"""
+        # One record entry per distinct value, however many times it occurs
+        sensitive_items = unique_items(sensitive_items)
         item_counts = {}
         for item in sensitive_items:
             item_type = item['type']
             item_counts[item_type] = item_counts.get(item_type, 0) + 1
-        
+
         metadata = {
             "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "logged_at": time.time(),
+            "compliance_type": compliance_type,
             "file_path": file_path,
             "file_size": os.path.getsize(file_path) if os.path.exists(file_path) else 0,
             "original_length": len(original_text),
@@ -20,18 +29,43 @@ class AuditAgent:
             "total_redacted_items": len(sensitive_items),
             "redacted_items_by_type": item_counts,
             "redacted_items": [
-                {"type": item["type"], "value_length": len(item["value"])} 
+                {"type": item["type"], "value_length": len(item["value"])}
                 for item in sensitive_items
             ],
             "compliance_notes": str(compliance_feedback),
             "processing_status": "completed"
         }
+        if processing_ms is not None:
+            metadata["processing_ms"] = round(processing_ms, 1)
+        if profile:
+            metadata["profile"] = profile
+        if incremental:
+            # Work saved by reusing the previous revision's detections
+            metadata["incremental"] = incremental
+        return metadata
+
+    def log_record(self, *args, **kwargs) -> dict:
+        """Append the metadata to the audit log (indexed and rolled up on commit); returns it with its record_id"""
+        metadata = self.build_metadata(*args, **kwargs)
+        metadata["record_id"] = (self.writer or get_audit_log()).append(metadata)
+        return metadata
+
+    def log_cached(self, summary: dict, file_path: str, processing_ms: float = None) -> dict:
+        """Audit a result served from the result cache: the cached summary, stamped for this request"""
+        metadata = dict(summary)
+        metadata.update({
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "logged_at": time.time(),
+            "file_path": file_path,
+            "cache_hit": True,
+        })
+        if processing_ms is not None:
+            metadata["processing_ms"] = round(processing_ms, 1)
+        metadata["record_id"] = (self.writer or get_audit_log()).append(metadata)
+        return metadata
 
-        os.makedirs("audit_logs", exist_ok=True)
-        
-        log_file = f"audit_logs/audit_log_{os.path.basename(file_path)}_{int(time.time())}.json"
-        with open(log_file, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"📋 [AuditAgent] Detailed metadata saved to {log_file}")
-        return log_file
+    def log_metadata(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str, profile: dict = None, compliance_type: str = None) -> str:
+        """Append the metadata to the audit log; returns the stable record id"""
+        record_id = self.log_record(original_text, redacted_text, sensitive_items, compliance_feedback, file_path, profile, compliance_type)["record_id"]
+        print(f"📋 [AuditAgent] Metadata queued as audit record {record_id}")
+        return record_id
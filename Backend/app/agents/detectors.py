@@ -0,0 +1,81 @@
+import re
+from typing import List
+from app.agents.entities import EntitySet
+
+# Compiled once at import so every agent (redactor, compliance verifier) shares them
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
+PHONE_PATTERNS = [
+    re.compile(r'\b\d{3}-\d{3}-\d{4}\b'),  # 123-456-7890
+    re.compile(r'\b\(\d{3}\)\s*\d{3}-\d{4}\b'),  # (123) 456-7890
+    re.compile(r'\b\d{10}\b'),  # 1234567890
+    re.compile(r'\b\d{3}\.\d{3}\.\d{4}\b'),  # 123.456.7890
+    re.compile(r'\+\d{1,3}[\s-]?\d{3,4}[\s-]?\d{3,4}[\s-]?\d{3,4}\b')  # International
+]
+URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+SSN_PATTERN = re.compile(r'\b\d{3}-\d{2}-\d{4}\b')
+CREDIT_CARD_PATTERN = re.compile(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b')
+IP_ADDRESS_PATTERN = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+# Capitalised word runs that only the NER model can confirm or reject as names
+NAME_CANDIDATE_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3}\b')
+
+REGEX_TYPES = ["email", "phone", "url", "ssn", "credit_card", "ip_address"]
+
+# GLiNER label -> our standard entity type
+GLINER_LABEL_TYPES = {
+    "Person": "name",
+    "Organization": "organization",
+    "Date": "date",
+    "Email": "email",
+    "Phone": "phone",
+    "Location": "location",
+    "URL": "url",
+    "Money": "financial",
+    "Time": "date",
+}
+GLINER_LABELS = list(GLINER_LABEL_TYPES)
+
+
+def name_candidates(text: str) -> List[str]:
+    """Capitalised word runs that could be names, whole even at a sentence start, where the first
+    word may be capitalised by grammar alone; the caller's name filter decides"""
+    return [match.group() for match in NAME_CANDIDATE_PATTERN.finditer(text)]
+
+
+def has_phone_digits(phone: str) -> bool:
+    return len(NON_DIGIT_PATTERN.sub('', phone)) >= 10
+
+
+def _is_card_number(card: str) -> bool:
+    return len(NON_DIGIT_PATTERN.sub('', card)) == 16
+
+
+def _is_ip_address(ip: str) -> bool:
+    return all(0 <= int(octet) <= 255 for octet in ip.split('.'))
+
+
+# entity type -> [(compiled pattern, validator of the matched value or None)]
+REGEX_DETECTORS = {
+    "email": [(EMAIL_PATTERN, None)],
+    "phone": [(pattern, has_phone_digits) for pattern in PHONE_PATTERNS],
+    "url": [(URL_PATTERN, None)],
+    "ssn": [(SSN_PATTERN, None)],
+    "credit_card": [(CREDIT_CARD_PATTERN, _is_card_number)],
+    "ip_address": [(IP_ADDRESS_PATTERN, _is_ip_address)],
+}
+
+
+def scan_spans(text: str, types: List[str] = None, entities: EntitySet = None) -> EntitySet:
+    """Run the compiled regex detectors into an EntitySet of text (a new one unless given)"""
+    entities = EntitySet(text) if entities is None else entities
+    for entity_type in REGEX_TYPES:
+        if types is None or entity_type in types:
+            for pattern, check in REGEX_DETECTORS[entity_type]:
+                entities.add_matches(pattern, entity_type, check, text)
+    return entities.dedup()
+
+
+def scan_regex(text: str, types: List[str] = None) -> List[dict]:
+    """Run the compiled regex detectors, optionally restricted to the given types"""
+    return list(scan_spans(text, types))
@@ -0,0 +1,237 @@
+"""Compact span-based entity sets shared by detection, redaction and audit.
+
+An EntitySet belongs to one text and stores each detected entity as a span of it in
+parallel arrays: start, end, type id and score. Type names are interned once per
+process, so a span costs a few machine words instead of a dict holding a copy of
+the value. Values are sliced from the text only when asked for.
+
+Iterating a set still yields {"type", "value"} dicts, one per span, so code written
+against the old item lists keeps working. unique_items() gives the one-per-value
+view used by audit records and policy checks.
+"""
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+TYPE_NAMES: List[str] = []
+TYPE_IDS: Dict[str, int] = {}
+_type_lock = threading.Lock()
+
+# Entity types whose pattern already ends on a non-word character, matched without \b
+UNBOUNDED_TYPES = ("email", "url", "ssn", "credit_card", "ip_address", "phone")
+
+
+def type_id(name: str) -> int:
+    """Interned id for an entity type name"""
+    tid = TYPE_IDS.get(name)
+    if tid is None:
+        with _type_lock:
+            tid = TYPE_IDS.get(name)
+            if tid is None:
+                TYPE_NAMES.append(name)
+                tid = TYPE_IDS[name] = len(TYPE_NAMES) - 1
+    return tid
+
+
+def _value_pattern(values: Iterable[str], bounded: bool) -> Optional[re.Pattern]:
+    # Longest first, so where values overlap at one position the longer one wins
+    alternatives = sorted({v for v in values if v}, key=len, reverse=True)
+    if not alternatives:
+        return None
+    body = "|".join(re.escape(v) for v in alternatives)
+    return re.compile(rf"\b(?:{body})\b" if bounded else f"(?:{body})", re.IGNORECASE)
+
+
+class EntitySet:
+    """Entities of one text as parallel arrays of start, end, type id and score"""
+    __slots__ = ("text", "starts", "ends", "type_ids", "scores")
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.starts = array("q")
+        self.ends = array("q")
+        self.type_ids = array("H")
+        self.scores = array("f")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def __iter__(self) -> Iterator[dict]:
+        text, names = self.text, TYPE_NAMES
+        for start, end, tid in zip(self.starts, self.ends, self.type_ids):
+            yield {"type": names[tid], "value": text[start:end]}
+
+    def __repr__(self) -> str:
+        return f"EntitySet({len(self)} spans)"
+
+    def __reduce__(self):
+        # Type ids are per process, so a set crossing to a worker travels with type names
+        return EntitySet.from_state, (self.text, self.to_state())
+
+    def add(self, start: int, end: int, entity_type: str, score: float = 1.0):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.type_ids.append(type_id(entity_type))
+        self.scores.append(score)
+
+    def add_matches(self, pattern: re.Pattern, entity_type: str, check=None, text: str = None, offset: int = 0):
+        """Add a span per match of pattern in text (default: the whole set's text), filtered by check(value)"""
+        tid = type_id(entity_type)
+        starts, ends, type_ids, scores = self.starts, self.ends, self.type_ids, self.scores
+        for match in pattern.finditer(self.text if text is None else text):
+            if check is None or check(match.group()):
+                starts.append(match.start() + offset)
+                ends.append(match.end() + offset)
+                type_ids.append(tid)
+                scores.append(1.0)
+
+    def spans(self) -> Iterator[Tuple[int, int, str, float]]:
+        names = TYPE_NAMES
+        for start, end, tid, score in zip(self.starts, self.ends, self.type_ids, self.scores):
+            yield start, end, names[tid], score
+
+    def merge(self, other: "EntitySet", offset: int = 0) -> "EntitySet":
+        """Append other's spans, shifted by offset (other covering text[offset:...])"""
+        if offset:
+            self.starts.extend(s + offset for s in other.starts)
+            self.ends.extend(e + offset for e in other.ends)
+        else:
+            self.starts.extend(other.starts)
+            self.ends.extend(other.ends)
+        self.type_ids.extend(other.type_ids)
+        self.scores.extend(other.scores)
+        return self
+
+    def dedup(self) -> "EntitySet":
+        """Sort spans by position and drop repeats of the same span and type, keeping the best score"""
+        order = sorted(range(len(self)), key=lambda i: (self.starts[i], self.ends[i], self.type_ids[i], -self.scores[i]))
+        starts, ends, type_ids, scores = array("q"), array("q"), array("H"), array("f")
+        last = None
+        for i in order:
+            key = (self.starts[i], self.ends[i], self.type_ids[i])
+            if key == last:
+                continue
+            last = key
+            starts.append(key[0])
+            ends.append(key[1])
+            type_ids.append(key[2])
+            scores.append(self.scores[i])
+        self.starts, self.ends, self.type_ids, self.scores = starts, ends, type_ids, scores
+        return self
+
+    def keep_types(self, types) -> "EntitySet":
+        """Drop spans whose type is not in types"""
+        keep = {type_id(t) for t in types}
+        indexes = [i for i, tid in enumerate(self.type_ids) if tid in keep]
+        if len(indexes) < len(self):
+            self.starts = array("q", (self.starts[i] for i in indexes))
+            self.ends = array("q", (self.ends[i] for i in indexes))
+            self.type_ids = array("H", (self.type_ids[i] for i in indexes))
+            self.scores = array("f", (self.scores[i] for i in indexes))
+        return self
+
+    def spread(self, types: Iterable[str] = None) -> "EntitySet":
+        """Add a span for every other occurrence of the values found so far (case-insensitive).
+
+        Detectors that only see part of the text, such as NER on the first window, find a value
+        once; spreading marks it wherever it appears, in one regex pass per boundary rule.
+        By default only the word-bounded types are spread: the others come from regexes that
+        already match every occurrence.
+        """
+        if types is None:
+            types = [name for name in TYPE_NAMES if name not in UNBOUNDED_TYPES]
+        wanted = {type_id(t) for t in types}
+        value_types = {}
+        for start, end, tid in zip(self.starts, self.ends, self.type_ids):
+            if tid in wanted:
+                value_types.setdefault(self.text[start:end].lower(), tid)
+        for bounded in (False, True):
+            values = [v for v, tid in value_types.items() if (TYPE_NAMES[tid] in UNBOUNDED_TYPES) != bounded]
+            pattern = _value_pattern(values, bounded)
+            if pattern is None:
+                continue
+            for match in pattern.finditer(self.text):
+                tid = value_types.get(match.group().lower())
+                if tid is not None:
+                    self.add(match.start(), match.end(), TYPE_NAMES[tid])
+        return self.dedup()
+
+    def resolve(self) -> List[Tuple[int, int, str]]:
+        """Non-overlapping (start, end, type) spans in text order; overlapping spans are joined under the longest one's type"""
+        order = sorted(range(len(self)), key=lambda i: (self.starts[i], -self.ends[i]))
+        resolved = []  # [start, end, type id, length of the longest member]
+        for i in order:
+            start, end, tid = self.starts[i], self.ends[i], self.type_ids[i]
+            if resolved and start < resolved[-1][1]:
+                last = resolved[-1]
+                last[1] = max(last[1], end)
+                if end - start > last[3]:
+                    last[2], last[3] = tid, end - start
+                continue
+            resolved.append([start, end, tid, end - start])
+        return [(start, end, TYPE_NAMES[tid]) for start, end, tid, _ in resolved]
+
+    def redact(self, tag: str = "[REDACTED_{type}]") -> str:
+        """The text with every span replaced by its tag, built in one pass"""
+        pieces = []
+        pos = 0
+        for start, end, entity_type in self.resolve():
+            pieces.append(self.text[pos:start])
+            pieces.append(tag.format(type=entity_type.upper()))
+            pos = end
+        pieces.append(self.text[pos:])
+        return "".join(pieces)
+
+    def unique_items(self) -> List[dict]:
+        """One {"type", "value"} per distinct type and case-insensitive value, in text order"""
+        unique = {}
+        for item in self:
+            unique.setdefault((item["type"], item["value"].lower()), item)
+        return list(unique.values())
+
+    def counts_by_type(self) -> Dict[str, int]:
+        counts = {}
+        for tid in self.type_ids:
+            counts[TYPE_NAMES[tid]] = counts.get(TYPE_NAMES[tid], 0) + 1
+        return counts
+
+    def to_state(self) -> dict:
+        """JSON-ready columns; type names rather than ids, since ids are per process"""
+        return {"starts": list(self.starts), "ends": list(self.ends),
+                "types": [TYPE_NAMES[t] for t in self.type_ids], "scores": [round(s, 4) for s in self.scores]}
+
+    @classmethod
+    def from_state(cls, text: str, state: dict) -> "EntitySet":
+        entities = cls(text)
+        entities.starts.extend(state["starts"])
+        entities.ends.extend(state["ends"])
+        entities.type_ids.extend(type_id(t) for t in state["types"])
+        entities.scores.extend(state["scores"])
+        return entities
+
+    @classmethod
+    def from_items(cls, text: str, items: Iterable[dict]) -> "EntitySet":
+        """Spans for {"type", "value"} items by locating every occurrence of their values in text"""
+        if isinstance(items, EntitySet) and (items.text is text or items.text == text):
+            return items
+        entities = cls(text)
+        value_types = {}
+        for item in items:
+            value_types.setdefault(item["value"].lower(), item["type"])
+        for bounded in (False, True):
+            pattern = _value_pattern([v for v, t in value_types.items() if (t in UNBOUNDED_TYPES) != bounded], bounded)
+            if pattern is not None:
+                for match in pattern.finditer(text):
+                    entity_type = value_types.get(match.group().lower())
+                    if entity_type is not None:
+                        entities.add(match.start(), match.end(), entity_type)
+        return entities.dedup()
+
+
+def unique_items(entities) -> List[dict]:
+    """unique_items() of an EntitySet; a plain item list is returned as it is"""
+    return entities.unique_items() if isinstance(entities, EntitySet) else list(entities)
@@ -1,16 +1,12 @@
-from flask import current_app
 import os
 import json
-import docx
-from PyPDF2 import PdfReader
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import re
 from typing import List
 
 class RunnerAgent:
     def load_text(self, file_path: str) -> str:
         if file_path.endswith(".pdf"):
+            from PyPDF2 import PdfReader
             reader = PdfReader(file_path)
             text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
 
@@ -24,6 +20,7 @@ class RunnerAgent:
                 text = json.dumps(self.json_data, indent=2)
 
         elif file_path.endswith(".docx"):
+            import docx
             doc = docx.Document(file_path)
             text = "\n".join([para.text for para in doc.paragraphs])
 
@@ -61,12 +58,15 @@ class RunnerAgent:
                     f.write(redacted_text)
 
         elif file_type == "docx":
+            from docx import Document
             doc = Document()
             for paragraph in redacted_text.split("\n"):
                 doc.add_paragraph(paragraph)
             doc.save(output_path)
 
         elif file_type == "pdf":
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.pagesizes import letter
             c = canvas.Canvas(output_path, pagesize=letter)
             lines = redacted_text.split("\n")
             width, height = letter
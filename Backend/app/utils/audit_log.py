@@ -0,0 +1,292 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Iterator, List, Optional
+from app.utils.metrics import STAGE_SECONDS, ERRORS
+
+FSYNC_POLICIES = ("record", "batch", "interval")
+SEGMENT_PREFIX = "audit-"
+SEGMENT_SUFFIX = ".jsonl"
+
+_STOP = object()
+
+
+def segment_paths(directory: str) -> List[str]:
+    """Segment files, oldest first; segments of concurrent writers interleave"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def _segment_number(path: str) -> int:
+    """audit-<number>-<pid>-<token>.jsonl, or audit-<number>.jsonl from before segments had owners"""
+    return int(os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].split("-", 1)[0])
+
+
+def iter_records(directory: str) -> Iterator[dict]:
+    """Every record in write order; a torn last line from a crash is skipped"""
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def read_record(directory: str, record_id: str) -> Optional[dict]:
+    """Linear scan for one record; fine for tooling, not for the request path"""
+    for record in iter_records(directory):
+        if record.get("record_id") == record_id:
+            return record
+    return None
+
+
+class _Waiter:
+    """Released once its batch is committed; error is set when the batch did not reach disk"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.error = None
+
+
+class AuditLogWriter:
+    """Appends audit records as compact JSON lines to rotating segment files.
+
+    append() only queues the record and returns its id. One background thread drains
+    whatever is queued into a single write (group commit) and syncs it per fsync_policy:
+    "record" fsyncs after every record, "batch" once per drained batch, and "interval"
+    at most every fsync_interval seconds. A segment is closed once it would grow past
+    segment_max_bytes and writing continues in the next one.
+
+    Segments belong to one writer (their name carries its pid and a random token), so
+    worker processes sharing the directory never append to, or cut, each other's files,
+    and the offsets passed to on_commit are always into the writer's own segment.
+
+    on_commit, if given, is called from the writer thread after each batch is synced with
+    (record, segment name, byte offset, line length) tuples, e.g. to update an index.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024,
+                 fsync_policy: str = "batch", fsync_interval: float = 1.0, batch_size: int = 256,
+                 on_commit: Callable[[list], None] = None):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.on_commit = on_commit
+        self.last_error = None
+        # First write failure since the last flush(), reported to that flush
+        self._unflushed_error = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._file = None
+        self._token = uuid.uuid4().hex[:8]
+        self._segment = 0
+        self._size = 0
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    def append(self, record: dict, wait: bool = False) -> str:
+        """Queue a record and return its id; wait blocks until it is written and synced per policy,
+        and raises OSError if the write failed"""
+        record = {**record, "record_id": record.get("record_id") or uuid.uuid4().hex}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        waiter = _Waiter() if wait else None
+        self._ensure_started()
+        self._queue.put((line.encode("utf-8"), record, waiter))
+        if waiter is not None:
+            waiter.event.wait()
+            if waiter.error:
+                raise OSError(f"Audit record {record['record_id']} not written: {waiter.error}")
+        return record["record_id"]
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until everything queued so far is written and fsynced; False on timeout or a failed write"""
+        if self._thread is None:
+            return True
+        waiter = _Waiter()
+        self._queue.put((None, None, waiter))
+        return waiter.event.wait(timeout) and waiter.error is None
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def _open_segment(self):
+        """Start a new segment of this writer's own, numbered after every segment in the directory"""
+        os.makedirs(self.directory, exist_ok=True)
+        existing = segment_paths(self.directory)
+        self._segment = max(self._segment, _segment_number(existing[-1]) if existing else 0) + 1
+        name = f"{SEGMENT_PREFIX}{self._segment:08d}-{os.getpid()}-{self._token}{SEGMENT_SUFFIX}"
+        # "x": a name clash would mean another writer's file, which is never appended to
+        self._file = open(os.path.join(self.directory, name), "xb")
+        self._size = 0
+
+    def _rotate(self):
+        self._sync()
+        self._file.close()
+        self._open_segment()
+
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    def _write(self, line: bytes) -> tuple:
+        """Append one line; returns (segment name, byte offset) where it landed"""
+        if self._file is None:
+            self._open_segment()
+        elif self._size and self._size + len(line) > self.segment_max_bytes:
+            self._rotate()
+        offset = self._size
+        self._file.write(line)
+        self._size += len(line)
+        self._unsynced = True
+        if self.fsync_policy == "record":
+            self._sync()
+        return os.path.basename(self._file.name), offset
+
+    def _commit(self, batch: list):
+        start = time.perf_counter()
+        force_sync = False
+        written = []
+        error = None
+        try:
+            for line, record, _ in batch:
+                if line is None:
+                    force_sync = True
+                else:
+                    segment, offset = self._write(line)
+                    written.append((record, segment, offset, len(line)))
+            if self._file is not None:
+                self._file.flush()
+            interval_due = time.monotonic() - self._last_sync >= self.fsync_interval
+            if force_sync or self.fsync_policy == "batch" or interval_due:
+                self._sync()
+        except OSError as e:
+            error = self.last_error = str(e)
+            self._unflushed_error = self._unflushed_error or error
+            written = []
+            ERRORS.inc(stage="audit_commit")
+            print(f"❌ Audit log write failed: {e}")
+            # The next batch starts a new segment; a partly written line stays at the old one's end
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+            self._unsynced = False
+        if written and self.on_commit is not None:
+            try:
+                self.on_commit(written)
+            except Exception as e:
+                # The segments stay authoritative; the index catches up on the next start
+                ERRORS.inc(stage="audit_index")
+                print(f"❌ Audit index update failed: {e}")
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="audit_commit")
+        flushed = False
+        for line, _, waiter in batch:
+            if waiter is not None:
+                # A flush reports any failure since the previous flush, not only this batch's
+                waiter.error = error or (self._unflushed_error if line is None else None)
+                flushed = flushed or line is None
+                waiter.event.set()
+        if flushed:
+            self._unflushed_error = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                # With unsynced data pending, wake up in time to honour the interval policy
+                timeout = None
+                if self._unsynced:
+                    timeout = max(0.0, self.fsync_interval - (time.monotonic() - self._last_sync))
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                self._commit([])
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [entry for entry in batch if entry is not _STOP]
+                batch.append((None, None, None))
+            self._commit(batch)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_audit_log = None
+_audit_store = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_store():
+    """Process-wide query index over the audit log, brought up to date with the segments on first use"""
+    global _audit_store
+    if _audit_store is None:
+        with _audit_log_lock:
+            if _audit_store is None:
+                from config import Config
+                from app.utils.audit_store import AuditStore
+                store = AuditStore(Config.AUDIT_DB_PATH, Config.AUDIT_LOG_FOLDER)
+                store.catch_up()
+                _audit_store = store
+    return _audit_store
+
+
+def get_audit_log() -> AuditLogWriter:
+    """Process-wide writer configured from Config and indexed as it commits; closed at interpreter exit"""
+    global _audit_log
+    if _audit_log is None:
+        store = get_audit_store()
+        with _audit_log_lock:
+            if _audit_log is None:
+                from config import Config
+                _audit_log = AuditLogWriter(
+                    Config.AUDIT_LOG_FOLDER,
+                    segment_max_bytes=Config.AUDIT_SEGMENT_MAX_BYTES,
+                    fsync_policy=Config.AUDIT_FSYNC_POLICY,
+                    fsync_interval=Config.AUDIT_FSYNC_INTERVAL,
+                    batch_size=Config.AUDIT_BATCH_SIZE,
+                    on_commit=store.add_records,
+                )
+                atexit.register(_audit_log.close)
+    return _audit_log
+
+
+def audit_entry(record: dict) -> tuple:
+    """(archive name, bytes) for putting an audit record into a response ZIP"""
+    return f"audit_logs/{record['record_id']}.json", json.dumps(record, indent=2).encode("utf-8")
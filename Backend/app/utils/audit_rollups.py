@@ -0,0 +1,150 @@
+"""Hourly and daily audit rollups, kept up to date as records are indexed.
+
+A rollup cell is (bucket, period, compliance type, file type), where bucket is "hour"
+or "day" and period numbers the hour (epoch hours) or local day (date ordinal).
+audit_rollups holds each cell's record and entity totals and latency sum/max;
+audit_rollup_counts holds its entity counts by type and its latency histogram, one row
+per (kind, name). New records are added with upserts, so writes never read the cells
+back, and reads are GROUP BYs over the cells of one bucket. A dashboard query therefore
+reads periods x regimes x file types rows at most, however many records there are.
+"""
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+# Upper bounds of the latency histogram in milliseconds; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+BUCKETS = ("hour", "day")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS audit_rollups ("
+    " bucket TEXT NOT NULL, period INTEGER NOT NULL, compliance_type TEXT NOT NULL, file_type TEXT NOT NULL,"
+    " records INTEGER NOT NULL, entities INTEGER NOT NULL, latency_count INTEGER NOT NULL,"
+    " latency_sum_ms REAL NOT NULL, latency_max_ms REAL NOT NULL,"
+    " PRIMARY KEY (bucket, period, compliance_type, file_type)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS audit_rollup_counts ("
+    " bucket TEXT NOT NULL, period INTEGER NOT NULL, compliance_type TEXT NOT NULL, file_type TEXT NOT NULL,"
+    " kind TEXT NOT NULL, name TEXT NOT NULL, count INTEGER NOT NULL,"
+    " PRIMARY KEY (bucket, period, compliance_type, file_type, kind, name)) WITHOUT ROWID",
+)
+TABLES = ("audit_rollups", "audit_rollup_counts")
+
+UPSERT_CELL = (
+    "INSERT INTO audit_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT(bucket, period, compliance_type, file_type) DO UPDATE SET"
+    " records = records + excluded.records, entities = entities + excluded.entities,"
+    " latency_count = latency_count + excluded.latency_count,"
+    " latency_sum_ms = latency_sum_ms + excluded.latency_sum_ms,"
+    " latency_max_ms = MAX(latency_max_ms, excluded.latency_max_ms)"
+)
+UPSERT_COUNT = (
+    "INSERT INTO audit_rollup_counts VALUES (?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT(bucket, period, compliance_type, file_type, kind, name) DO UPDATE SET count = count + excluded.count"
+)
+
+RollupKey = Tuple[str, int, str, str]  # (bucket, period, compliance type, file type)
+
+
+def period_of(bucket: str, ts: float) -> int:
+    """Epoch hour, or the ordinal of the local date, containing ts"""
+    if bucket == "hour":
+        return int(ts // 3600)
+    return date.fromtimestamp(ts).toordinal()
+
+
+def period_label(bucket: str, period: int) -> str:
+    if bucket == "hour":
+        return time.strftime("%Y-%m-%d %H:00", time.localtime(period * 3600))
+    return date.fromordinal(period).isoformat()
+
+
+def period_range(bucket: str, since: float = None, until: float = None) -> Tuple[List[str], list]:
+    """SQL clauses and params for the periods overlapping [since, until)"""
+    clauses, params = ["bucket = ?"], [bucket]
+    if since is not None:
+        clauses.append("period >= ?")
+        params.append(period_of(bucket, since))
+    if until is not None:
+        clauses.append("period <= ?")
+        # The period holding the instant just before until is the last one overlapping
+        params.append(period_of(bucket, until - 1e-3))
+    return clauses, params
+
+
+def latency_bucket(latency_ms: float) -> str:
+    """Histogram bucket name: its upper bound, or +Inf"""
+    for bound in LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+def accumulate(records: Iterable[Tuple[dict, float, str]]) -> Tuple[List[tuple], List[tuple]]:
+    """Upsert parameters for (record, timestamp, file type) triples: (cell rows, count rows)"""
+    cells: Dict[RollupKey, list] = {}
+    counts: Dict[tuple, int] = {}
+    for record, ts, file_type in records:
+        latency = record.get("processing_ms")
+        for bucket in BUCKETS:
+            key = (bucket, period_of(bucket, ts), record.get("compliance_type") or "", file_type)
+            cell = cells.setdefault(key, [0, 0, 0, 0.0, 0.0])
+            cell[0] += 1
+            cell[1] += record.get("total_redacted_items", 0)
+            for entity_type, count in (record.get("redacted_items_by_type") or {}).items():
+                counts[key + ("entity", entity_type)] = counts.get(key + ("entity", entity_type), 0) + count
+            if latency is not None:
+                cell[2] += 1
+                cell[3] += latency
+                cell[4] = max(cell[4], latency)
+                histogram_key = key + ("latency", latency_bucket(latency))
+                counts[histogram_key] = counts.get(histogram_key, 0) + 1
+    return ([key + tuple(cell) for key, cell in cells.items()],
+            [key + (count,) for key, count in counts.items()])
+
+
+def _percentile(histogram: Dict[str, int], count: int, max_ms: float, fraction: float):
+    """Upper bound of the histogram bucket holding the percentile, capped at the maximum"""
+    target = fraction * count
+    seen = 0
+    for bound in LATENCY_BUCKETS_MS:
+        seen += histogram.get(str(bound), 0)
+        if seen >= target:
+            return min(bound, max_ms)
+    return max_ms
+
+
+def summarize(cell: dict, counts: Dict[Tuple[str, str], int]) -> dict:
+    """Public view of a group: summed cell row plus its (kind, name) counts"""
+    entities = {name: total for (kind, name), total in counts.items() if kind == "entity"}
+    histogram = {name: total for (kind, name), total in counts.items() if kind == "latency"}
+    latency_count = cell["latency_count"]
+    return {
+        "records": cell["records"],
+        "entities": cell["entities"],
+        "entities_by_type": dict(sorted(entities.items(), key=lambda kv: -kv[1])),
+        "latency": {
+            "count": latency_count,
+            "mean_ms": round(cell["latency_sum_ms"] / latency_count, 1) if latency_count else None,
+            "p50_ms": _percentile(histogram, latency_count, cell["latency_max_ms"], 0.5) if latency_count else None,
+            "p95_ms": _percentile(histogram, latency_count, cell["latency_max_ms"], 0.95) if latency_count else None,
+            "max_ms": round(cell["latency_max_ms"], 1) if latency_count else None,
+        },
+    }
+
+
+def merge_groups(rows: Iterable[dict], count_rows: Iterable[dict], relabel=None) -> Dict[str, dict]:
+    """Summaries per group key from grouped cell and count rows, optionally merging keys via relabel"""
+    relabel = relabel or (lambda key: key)
+    cells: Dict[str, dict] = {}
+    for row in rows:
+        key = relabel(row["key"])
+        cell = cells.setdefault(key, {"records": 0, "entities": 0, "latency_count": 0,
+                                      "latency_sum_ms": 0.0, "latency_max_ms": 0.0})
+        for field in ("records", "entities", "latency_count", "latency_sum_ms"):
+            cell[field] += row[field] or 0
+        cell["latency_max_ms"] = max(cell["latency_max_ms"], row["latency_max_ms"] or 0.0)
+    counts: Dict[str, Dict[Tuple[str, str], int]] = {}
+    for row in count_rows:
+        group = counts.setdefault(relabel(row["key"]), {})
+        group[(row["kind"], row["name"])] = group.get((row["kind"], row["name"]), 0) + row["count"]
+    return {key: summarize(cell, counts.get(key, {})) for key, cell in sorted(cells.items())}
@@ -0,0 +1,444 @@
+"""Indexed view of the audit log for queries by time, compliance type, entity type and status.
+
+The segment files written by app.utils.audit_log stay the source of truth; this SQLite
+index holds one row per record (plus one per entity type in it) and where the record
+sits in its segment. It is updated in the writer's group commit and can always be
+rebuilt from the segments.
+
+Run from Backend/:
+
+    python -m app.utils.audit_store query --compliance HIPAA --entity ssn --since 2026-10-12
+    python -m app.utils.audit_store query --group-by day --since 2026-10-01
+    python -m app.utils.audit_store rollups --bucket day --since 2026-10-01
+    python -m app.utils.audit_store record <record_id>
+    python -m app.utils.audit_store rebuild
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.utils import audit_rollups
+from app.utils.audit_log import segment_paths
+from app.utils.metrics import file_format
+
+LEGACY_PREFIX = "audit_log_"
+
+# group_by name -> SQL expression; time buckets group on whole hours and are labelled in Python
+GROUP_EXPRESSIONS = {
+    "hour": "CAST(ts / 3600 AS INTEGER)",
+    "day": "CAST(ts / 3600 AS INTEGER)",
+    "compliance_type": "compliance_type",
+    "status": "status",
+    "file_type": "file_type",
+    "entity_type": "entity_type",
+}
+TIME_LABELS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+
+
+def parse_time(value) -> Optional[float]:
+    """Epoch seconds from a number or an ISO date/datetime (local time)"""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+def record_time(record: dict) -> float:
+    """When the record was logged; older records only carry the formatted local timestamp"""
+    if record.get("logged_at"):
+        return float(record["logged_at"])
+    try:
+        return time.mktime(time.strptime(record["timestamp"], '%Y-%m-%d %H:%M:%S'))
+    except (KeyError, ValueError):
+        return 0.0
+
+
+def _label_groups(group_by: str, groups: List[dict]) -> List[dict]:
+    """Turn hour numbers into local hour/day labels, merging hours that fall on the same day"""
+    if group_by not in TIME_LABELS:
+        return groups
+    merged = {}
+    for group in groups:
+        label = time.strftime(TIME_LABELS[group_by], time.localtime(group["key"] * 3600))
+        bucket = merged.setdefault(label, {"key": label, "records": 0, "entities": 0})
+        bucket["records"] += group["records"]
+        bucket["entities"] += group["entities"] or 0
+    return sorted(merged.values(), key=lambda g: g["key"])
+
+
+class AuditStore:
+    """SQLite index over the audit segments, safe to share between the writer and request threads"""
+
+    def __init__(self, db_path: str, log_directory: str):
+        self.db_path = db_path
+        self.log_directory = log_directory
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # the segments are the durable copy
+            self._conn.execute("PRAGMA cache_size=-65536")
+            self._conn.execute("PRAGMA mmap_size=268435456")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit_records ("
+                " record_id TEXT PRIMARY KEY, ts REAL NOT NULL, compliance_type TEXT, status TEXT,"
+                " file_type TEXT, file_path TEXT, total_items INTEGER NOT NULL,"
+                " segment TEXT NOT NULL, byte_offset INTEGER NOT NULL)"
+            )
+            # Denormalised so entity totals never need a join back to audit_records
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit_entities ("
+                " record_id TEXT NOT NULL, ts REAL NOT NULL, compliance_type TEXT, status TEXT,"
+                " entity_type TEXT NOT NULL, count INTEGER NOT NULL,"
+                " PRIMARY KEY (record_id, entity_type))"
+            )
+            # Bytes of each segment already indexed, so a restart only reads what is new
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit_segments (segment TEXT PRIMARY KEY, indexed_bytes INTEGER NOT NULL)"
+            )
+            # Hourly and daily rollups per (regime, file type), updated in the same transaction as the index
+            has_rollups = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_rollups'"
+            ).fetchone() is not None
+            for statement in audit_rollups.SCHEMA:
+                self._conn.execute(statement)
+            # Covering indexes: time-range counts and groupings never touch the tables themselves
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_audit_ts"
+                " ON audit_records (ts, compliance_type, status, file_type, total_items)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_audit_compliance"
+                " ON audit_records (compliance_type, ts, status, file_type, total_items)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_audit_entity_ts"
+                " ON audit_entities (ts, entity_type, compliance_type, status, count)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_audit_entity"
+                " ON audit_entities (entity_type, compliance_type, ts, status, count)"
+            )
+            indexed_before = self._conn.execute("SELECT 1 FROM audit_records LIMIT 1").fetchone() is not None
+        if indexed_before and not has_rollups:
+            # An index from before rollups existed: rebuild once so the rollups cover every record
+            self.rebuild()
+
+    def add_records(self, entries: List[Tuple[dict, str, int, int]]):
+        """Index (record, segment name, byte offset, line length) tuples in one transaction"""
+        record_rows, entity_rows, segment_ends, rolled = [], [], {}, {}
+        for record, segment, offset, length in entries:
+            ts = record_time(record)
+            compliance_type = record.get("compliance_type")
+            status = record.get("processing_status")
+            file_type = file_format(record.get("file_path") or "")
+            record_rows.append((
+                record["record_id"], ts, compliance_type, status, file_type,
+                record.get("file_path"), record.get("total_redacted_items", 0), segment, offset,
+            ))
+            rolled[record["record_id"]] = (record, ts, file_type)
+            for entity_type, count in (record.get("redacted_items_by_type") or {}).items():
+                entity_rows.append((record["record_id"], ts, compliance_type, status, entity_type, count))
+            segment_ends[segment] = max(segment_ends.get(segment, 0), offset + length)
+        with self._lock, self._conn:
+            # Records indexed before (a replayed segment or legacy import) are already in the rollups
+            ids = list(rolled)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                for row in self._conn.execute(
+                    f"SELECT record_id FROM audit_records WHERE record_id IN ({','.join('?' * len(chunk))})", chunk
+                ):
+                    del rolled[row["record_id"]]
+            cell_rows, count_rows = audit_rollups.accumulate(rolled.values())
+            self._conn.executemany(audit_rollups.UPSERT_CELL, cell_rows)
+            self._conn.executemany(audit_rollups.UPSERT_COUNT, count_rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO audit_records (record_id, ts, compliance_type, status, file_type,"
+                " file_path, total_items, segment, byte_offset) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                record_rows,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO audit_entities (record_id, ts, compliance_type, status, entity_type, count)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                entity_rows,
+            )
+            self._conn.executemany(
+                "INSERT INTO audit_segments (segment, indexed_bytes) VALUES (?, ?)"
+                " ON CONFLICT(segment) DO UPDATE SET indexed_bytes = MAX(indexed_bytes, excluded.indexed_bytes)",
+                list(segment_ends.items()),
+            )
+
+    def catch_up(self, batch_size: int = 5000) -> int:
+        """Index whatever the segments hold beyond what was indexed (e.g. after a crash); returns the count"""
+        with self._lock:
+            indexed = {row["segment"]: row["indexed_bytes"]
+                       for row in self._conn.execute("SELECT * FROM audit_segments")}
+        added = 0
+        for path in segment_paths(self.log_directory):
+            segment = os.path.basename(path)
+            batch = []
+            with open(path, "rb") as f:
+                f.seek(indexed.get(segment, 0))
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break  # end of file, or a torn write still in progress
+                    try:
+                        batch.append((json.loads(line), segment, offset, len(line)))
+                    except ValueError:
+                        continue
+                    if len(batch) >= batch_size:
+                        self.add_records(batch)
+                        added += len(batch)
+                        batch = []
+            if batch:
+                self.add_records(batch)
+                added += len(batch)
+        return added
+
+    def import_legacy(self) -> int:
+        """Index the one-file-per-document JSON logs written before the segmented log"""
+        if not os.path.isdir(self.log_directory):
+            return 0
+        entries = []
+        for name in sorted(os.listdir(self.log_directory)):
+            if not (name.startswith(LEGACY_PREFIX) and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.log_directory, name), encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            record.setdefault("record_id", name[:-len(".json")])
+            entries.append((record, name, 0, 0))
+        if entries:
+            self.add_records(entries)
+        return len(entries)
+
+    def rebuild(self) -> int:
+        """Drop the index and rebuild it from the segments and any legacy files"""
+        with self._lock, self._conn:
+            for table in ("audit_records", "audit_entities", "audit_segments") + audit_rollups.TABLES:
+                self._conn.execute(f"DELETE FROM {table}")
+        return self.import_legacy() + self.catch_up()
+
+    def rollups(self, since=None, until=None, bucket: str = "day", compliance_type: str = None,
+                file_type: str = None) -> dict:
+        """Dashboard series and totals from the rollups; since/until are rounded out to whole buckets"""
+        if bucket not in audit_rollups.BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(audit_rollups.BUCKETS)}")
+        clauses, params = audit_rollups.period_range(bucket, parse_time(since), parse_time(until))
+        for column, value in (("compliance_type", compliance_type), ("file_type", file_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}"
+
+        groups = {}
+        with self._lock:
+            for name, column in (("series", "period"), ("by_compliance_type", "compliance_type"),
+                                 ("by_file_type", "file_type"), ("totals", "'all'")):
+                rows = self._conn.execute(
+                    f"SELECT {column} AS key, SUM(records) AS records, SUM(entities) AS entities,"
+                    " SUM(latency_count) AS latency_count, SUM(latency_sum_ms) AS latency_sum_ms,"
+                    f" MAX(latency_max_ms) AS latency_max_ms FROM audit_rollups{where} GROUP BY key",
+                    params,
+                ).fetchall()
+                count_rows = self._conn.execute(
+                    f"SELECT {column} AS key, kind, name, SUM(count) AS count"
+                    f" FROM audit_rollup_counts{where} GROUP BY key, kind, name",
+                    params,
+                ).fetchall()
+                relabel = None
+                if column == "period":
+                    relabel = lambda period: audit_rollups.period_label(bucket, period)
+                elif column == "compliance_type":
+                    relabel = lambda key: key or "unknown"
+                groups[name] = audit_rollups.merge_groups(rows, count_rows, relabel)
+
+        empty = audit_rollups.summarize(
+            {"records": 0, "entities": 0, "latency_count": 0, "latency_sum_ms": 0.0, "latency_max_ms": 0.0}, {})
+        return {
+            "filters": {"since": since, "until": until, "compliance_type": compliance_type,
+                        "file_type": file_type},
+            "bucket": bucket,
+            "series": [{"key": key, **summary} for key, summary in groups["series"].items()],
+            "by_compliance_type": groups["by_compliance_type"],
+            "by_file_type": groups["by_file_type"],
+            "totals": groups["totals"].get("all", empty),
+        }
+
+    def get_record(self, record_id: str) -> Optional[dict]:
+        """Full record, read straight from its segment at the indexed offset"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, byte_offset FROM audit_records WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        path = os.path.join(self.log_directory, row["segment"])
+        with open(path, "rb") as f:
+            if row["segment"].startswith(LEGACY_PREFIX):
+                return json.load(f)
+            f.seek(row["byte_offset"])
+            try:
+                record = json.loads(f.readline())
+            except ValueError:
+                record = None
+            if record is not None and record.get("record_id") == record_id:
+                return record
+            # A stale offset (e.g. indexed before segments had one writer each): scan the segment
+            f.seek(0)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("record_id") == record_id:
+                    return record
+        return None
+
+    def _filters(self, since=None, until=None, compliance_type=None, status=None, entity_type=None,
+                 prefix: str = "") -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, op, value in (("ts", ">=", parse_time(since)), ("ts", "<", parse_time(until)),
+                                  ("compliance_type", "=", compliance_type), ("status", "=", status),
+                                  ("entity_type", "=", entity_type)):
+            if value is not None:
+                clauses.append(f"{prefix}{column} {op} ?")
+                params.append(value)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query(self, since=None, until=None, compliance_type: str = None, entity_type: str = None,
+              status: str = None, group_by: str = None, limit: int = 50) -> dict:
+        """Record and entity totals for the filters, optionally grouped, plus the newest matching records.
+
+        With entity_type, a record matches when it contains at least one entity of that
+        type; those queries run on audit_entities, which has one row per record and type.
+        """
+        if group_by is not None and group_by not in GROUP_EXPRESSIONS:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_EXPRESSIONS)}")
+        where, params = self._filters(since, until, compliance_type, status)
+        entity_where, entity_params = self._filters(since, until, compliance_type, status, entity_type or None)
+        # Record-level questions go to whichever table carries the filters
+        record_table, record_where, record_params = "audit_records", where, params
+        if entity_type:
+            record_table, record_where, record_params = "audit_entities", entity_where, entity_params
+
+        with self._lock:
+            total_records = self._conn.execute(
+                f"SELECT COUNT(*) FROM {record_table}{record_where}", record_params
+            ).fetchone()[0]
+            entities = self._conn.execute(
+                f"SELECT entity_type, SUM(count) AS total FROM audit_entities{entity_where}"
+                " GROUP BY entity_type ORDER BY total DESC",
+                entity_params,
+            ).fetchall()
+            groups = None
+            if group_by == "entity_type":
+                groups = self._conn.execute(
+                    f"SELECT entity_type AS key, COUNT(*) AS records, SUM(count) AS entities"
+                    f" FROM audit_entities{entity_where} GROUP BY key ORDER BY key",
+                    entity_params,
+                ).fetchall()
+            elif group_by == "file_type" and entity_type:
+                joined_where, _ = self._filters(since, until, compliance_type, status, entity_type, prefix="e.")
+                groups = self._conn.execute(
+                    "SELECT r.file_type AS key, COUNT(*) AS records, SUM(e.count) AS entities"
+                    f" FROM audit_entities e JOIN audit_records r ON r.record_id = e.record_id{joined_where}"
+                    " GROUP BY key ORDER BY key",
+                    entity_params,
+                ).fetchall()
+            elif group_by:
+                items = "count" if entity_type else "total_items"
+                groups = self._conn.execute(
+                    f"SELECT {GROUP_EXPRESSIONS[group_by]} AS key, COUNT(*) AS records, SUM({items}) AS entities"
+                    f" FROM {record_table}{record_where} GROUP BY key ORDER BY key",
+                    record_params,
+                ).fetchall()
+            record_ids = self._conn.execute(
+                f"SELECT record_id FROM {record_table}{record_where} ORDER BY ts DESC LIMIT ?",
+                record_params + [max(int(limit), 0)],
+            ).fetchall()
+            records = [
+                dict(self._conn.execute(
+                    "SELECT record_id, ts, compliance_type, status, file_type, file_path, total_items"
+                    " FROM audit_records WHERE record_id = ?", (row["record_id"],)
+                ).fetchone())
+                for row in record_ids
+            ]
+
+        result = {
+            "filters": {"since": since, "until": until, "compliance_type": compliance_type,
+                        "entity_type": entity_type, "status": status},
+            "total_records": total_records,
+            "entities_by_type": {row["entity_type"]: row["total"] for row in entities},
+            "records": records,
+        }
+        if groups is not None:
+            result["group_by"] = group_by
+            result["groups"] = _label_groups(group_by, [dict(row) for row in groups])
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=Config.AUDIT_DB_PATH)
+    parser.add_argument("--log-dir", default=Config.AUDIT_LOG_FOLDER)
+    commands = parser.add_subparsers(dest="command", required=True)
+    query = commands.add_parser("query", help="filter and aggregate audit records")
+    query.add_argument("--since", help="epoch seconds or ISO date/datetime")
+    query.add_argument("--until", help="epoch seconds or ISO date/datetime")
+    query.add_argument("--compliance", dest="compliance_type")
+    query.add_argument("--entity", dest="entity_type")
+    query.add_argument("--status")
+    query.add_argument("--group-by", choices=list(GROUP_EXPRESSIONS))
+    query.add_argument("--limit", type=int, default=20)
+    record = commands.add_parser("record", help="print one full record")
+    record.add_argument("record_id")
+    rollups = commands.add_parser("rollups", help="hourly/daily dashboard rollups")
+    rollups.add_argument("--since", help="epoch seconds or ISO date/datetime")
+    rollups.add_argument("--until", help="epoch seconds or ISO date/datetime")
+    rollups.add_argument("--bucket", choices=list(audit_rollups.BUCKETS), default="day")
+    rollups.add_argument("--compliance", dest="compliance_type")
+    rollups.add_argument("--file-type")
+    commands.add_parser("rebuild", help="rebuild the index and rollups from the audit log")
+    args = parser.parse_args()
+
+    store = AuditStore(args.db, args.log_dir)
+    try:
+        if args.command == "rebuild":
+            print(f"✅ Indexed {store.rebuild()} audit records")
+            return
+        if args.command == "record":
+            print(json.dumps(store.get_record(args.record_id), indent=2))
+            return
+        store.catch_up()
+        if args.command == "rollups":
+            print(json.dumps(store.rollups(args.since, args.until, args.bucket, args.compliance_type,
+                                           args.file_type), indent=2))
+            return
+        print(json.dumps(store.query(args.since, args.until, args.compliance_type, args.entity_type,
+                                     args.status, args.group_by, args.limit), indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Bulk redaction of ZIP and TAR archives.
+
+Members are read one at a time from the archive (tar in stream mode, ZIP by central
+directory), each is spooled through app.utils.ingest and handed to a worker pool. Only
+the members in flight are on disk at once, never the whole archive. Redacted outputs
+are yielded as ZIP entries in the order they finish, so they can be streamed straight
+into a response, and a consolidated audit manifest (per-file status, audit record ids,
+entity counts, files per second) closes the archive.
+
+Run from Backend/:
+
+    python -m app.utils.bulk contracts.tar.gz --compliance GDPR --jobs 8 --output redacted.zip
+"""
+import argparse
+import json
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+from app.utils.ingest import DEFAULT_MAX_BYTES, IngestError, Spool, is_supported
+from app.utils.metrics import STAGE_SECONDS
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+MANIFEST_NAME = "audit_manifest.json"
+COPY_CHUNK_BYTES = 1024 * 1024
+# Raised while reading a damaged or truncated archive
+ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error)
+
+
+def archive_kind(filename: str) -> Optional[str]:
+    """"zip", "tar" or None, from the archive's file name"""
+    name = (filename or "").lower()
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith(TAR_SUFFIXES):
+        return "tar"
+    return None
+
+
+def safe_member_name(name: str) -> str:
+    """Archive-relative path with absolute prefixes and parent references removed"""
+    parts = [part for part in posixpath.normpath(name.replace("\\", "/")).split("/") if part not in ("", ".", "..")]
+    return "/".join(parts)
+
+
+def iter_members(source: BinaryIO, kind: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """(name, readable stream) for each regular file; a stream is only valid until the next member"""
+    if kind == "zip":
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as stream:
+                        yield info.filename, stream
+    elif kind == "tar":
+        # "r|*" reads the archive front to back, so it works on non-seekable uploads too
+        with tarfile.open(fileobj=source, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile():
+                    yield member.name, archive.extractfile(member)
+    else:
+        raise ValueError(f"Unsupported archive type: {kind}")
+
+
+class BulkRedactor:
+    """Runs archive members through process_file on a bounded worker pool.
+
+    process_file(path, content_digest) must return (output_path, audit_record), or
+    (None, None) when nothing was redacted. At most max_in_flight members are spooled
+    or being processed at any time.
+    """
+
+    def __init__(self, process_file: Callable[[str, str], tuple], work_dir: str, workers: int = 4,
+                 max_member_bytes: int = DEFAULT_MAX_BYTES, max_members: int = 100000, max_in_flight: int = None):
+        self.process_file = process_file
+        self.work_dir = work_dir
+        self.workers = workers
+        self.max_member_bytes = max_member_bytes
+        self.max_members = max_members
+        self.max_in_flight = max_in_flight or workers * 2
+
+    def run(self, members: Iterator[Tuple[str, BinaryIO]], manifest_info: dict = None) -> Iterator[tuple]:
+        """Yield (arcname, output path) per redacted member as it finishes, then the manifest entry"""
+        started = time.perf_counter()
+        info = dict(manifest_info or {})
+        files = []
+        names = set()
+        pending = {}
+        members = iter(members)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk") as pool:
+            try:
+                while True:
+                    # Headers have been streamed by now, so archive damage is reported in the manifest
+                    try:
+                        member = next(members, None)
+                    except ARCHIVE_ERRORS as e:
+                        info["archive_error"] = str(e) or type(e).__name__
+                        break
+                    if member is None:
+                        break
+                    if len(files) >= self.max_members:
+                        info["truncated"] = f"only the first {self.max_members} files were processed"
+                        break
+                    name, stream = member
+                    entry = {"name": safe_member_name(name), "status": "queued"}
+                    files.append(entry)
+                    if not is_supported(entry["name"]):
+                        entry["status"] = "skipped"
+                        continue
+                    try:
+                        upload = self._spool(entry["name"], stream)
+                    except (IngestError, *ARCHIVE_ERRORS) as e:
+                        entry.update(status="error", error=str(e) or type(e).__name__)
+                        continue
+                    entry.update(size=upload["size"], sha256=upload["sha256"])
+                    pending[pool.submit(self.process_file, upload["path"], upload["sha256"])] = (entry, upload)
+                    while len(pending) >= self.max_in_flight:
+                        yield from self._drain(pending, names)
+                while pending:
+                    yield from self._drain(pending, names)
+            finally:
+                for future, (_, upload) in pending.items():
+                    future.cancel()
+                    _remove(upload["path"])
+
+        yield MANIFEST_NAME, json.dumps(self.manifest(files, time.perf_counter() - started, info),
+                                        indent=2).encode("utf-8")
+
+    def _spool(self, name: str, stream: BinaryIO) -> dict:
+        spool = Spool(self.work_dir, name, self.max_member_bytes)
+        try:
+            with STAGE_SECONDS.time(stage="archive_extract"):
+                for chunk in iter(lambda: stream.read(COPY_CHUNK_BYTES), b""):
+                    spool.write(chunk)
+            return spool.finish()
+        except BaseException:
+            spool.abort()
+            raise
+
+    def _drain(self, pending: dict, names: set) -> Iterator[tuple]:
+        """Wait for at least one member to finish and yield the outputs of all that have"""
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            entry, upload = pending.pop(future)
+            _remove(upload["path"])
+            try:
+                output_path, record = future.result()
+            except Exception as e:
+                entry.update(status="error", error=str(e))
+                continue
+            if not output_path:
+                entry["status"] = "no_pii"
+                continue
+            arcname = f"redacted/{entry['name']}"
+            if arcname in names:
+                arcname = f"redacted/{len(names)}_{entry['name']}"
+            names.add(arcname)
+            entry.update(status="redacted", output=arcname, record_id=record.get("record_id"),
+                         total_redacted_items=record.get("total_redacted_items"),
+                         redacted_items_by_type=record.get("redacted_items_by_type"))
+            yield arcname, output_path
+            # The consumer has written the entry by the time it asks for the next one
+            _remove(output_path)
+
+    @staticmethod
+    def manifest(files: list, seconds: float, info: dict = None) -> dict:
+        counts = {status: 0 for status in ("redacted", "no_pii", "error", "skipped")}
+        for entry in files:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        processed = len(files) - counts["skipped"]
+        return {
+            **(info or {}),
+            "summary": {
+                "files": len(files),
+                **counts,
+                "bytes": sum(entry.get("size", 0) for entry in files),
+                "seconds": round(seconds, 3),
+                "files_per_second": round(processed / seconds, 2) if seconds else None,
+            },
+            "files": files,
+        }
+
+
+def _remove(path: str):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def main():
+    from config import Config
+    from app.utils.zip_stream import stream_zip
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive", help="ZIP or TAR archive of PDF, TXT, JSON and DOCX files")
+    parser.add_argument("--compliance", choices=["GDPR", "HIPAA", "DPDP"], required=True)
+    parser.add_argument("--jobs", type=int, default=Config.BULK_WORKERS, help="parallel workers")
+    parser.add_argument("--output", help="output ZIP (default: <archive>_redacted.zip)")
+    args = parser.parse_args()
+
+    kind = archive_kind(args.archive)
+    if kind is None:
+        parser.error("archive must be .zip or a tar (.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz)")
+    output = args.output or f"{os.path.splitext(args.archive)[0]}_redacted.zip"
+
+    from routes import build_coordinator
+    coordinator = build_coordinator()
+    coordinator.admission_timeout = float("inf")
+    work_dir = tempfile.mkdtemp(prefix="bulk-")
+    try:
+        bulk = BulkRedactor(
+            lambda path, digest: coordinator.handle_file(path, args.compliance, work_dir, content_digest=digest),
+            work_dir, args.jobs, Config.MAX_UPLOAD_BYTES, Config.BULK_MAX_MEMBERS
+        )
+        info = {"archive": os.path.basename(args.archive), "compliance_type": args.compliance}
+        with open(args.archive, "rb") as source, open(output, "wb") as out:
+            for chunk in stream_zip(bulk.run(iter_members(source, kind), info)):
+                out.write(chunk)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with zipfile.ZipFile(output) as result:
+        summary = json.loads(result.read(MANIFEST_NAME))["summary"]
+    print(f"📦 {summary['files']} files: {summary['redacted']} redacted, {summary['no_pii']} clean, "
+          f"{summary['error']} errors, {summary['skipped']} skipped")
+    print(f"⚡ {summary['files_per_second']} files/s over {summary['seconds']}s -> {output}")
+
+
+if __name__ == "__main__":
+    main()
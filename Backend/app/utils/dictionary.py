@@ -0,0 +1,332 @@
+"""Known-entity dictionary detection: customer-supplied identifiers matched in one pass.
+
+Dictionaries are UTF-8 text files with one entry per line, "entity_type<TAB>value"
+(a line without a tab gets the type "custom"; "#" lines are comments). Values are
+matched case-insensitively on whole words, so "CUST-00042" matches "cust 00042" but
+not "CUST-000421".
+
+The entries are compiled into a word-level Aho-Corasick automaton. It is the
+gazetteer's trie (app.utils.gazetteer) plus failure and output links, each node's
+depth in words and its entity type. Scanning a text then takes one hash probe per
+word, however many entries there are.
+
+The compiled automaton is a flat file under GAZETTEER_CACHE_DIR named after a
+fingerprint of the dictionary files. Every process mmaps that same file, so Flask
+threads, FastAPI pool workers and job workers share one copy in the page cache.
+When a dictionary file changes, the next check (at most every
+DICTIONARY_CHECK_SECONDS) compiles the new automaton in the background. One process
+compiles it and the others wait for the file. Each process swaps to the new file
+once it is complete, without a restart. POST /dictionary/reload forces the check.
+
+Prebuild (for example before a deploy) from Backend/:
+
+    python -m app.utils.dictionary employees.tsv customers.tsv
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple
+from app.agents.entities import EntitySet
+from app.utils.gazetteer import (WORD_PATTERN, Gazetteer, MappedTrie, TrieBuilder, get_gazetteer, split_paths,
+                                 word_key, words, write_atomic)
+
+MAGIC = b"DICTAC01"
+DEFAULT_TYPE = "custom"
+# A compile lock older than this is taken to belong to a process that died mid-compile
+STALE_LOCK_SECONDS = 600
+
+
+def read_dictionary(path: str) -> Iterator[Tuple[str, str]]:
+    """(entity type, value) pairs of a dictionary file"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            entity_type, tab, value = line.partition("\t")
+            if not tab:
+                entity_type, value = DEFAULT_TYPE, line
+            if value.strip():
+                yield entity_type.strip().lower() or DEFAULT_TYPE, value.strip()
+
+
+def compile_dictionary(entries: Iterable[Tuple[str, str]], path: str) -> dict:
+    """Compile (entity type, value) pairs into an automaton file at path; returns its metadata"""
+    trie = TrieBuilder()
+    labels = array("H", [0])
+    types, type_labels = [], {}
+    count = 0
+    for entity_type, value in entries:
+        node = trie.insert(word_key(word) for word in words(value))
+        labels.frombytes(bytes(2 * (trie.nodes - len(labels))))
+        if node:
+            if entity_type not in type_labels:
+                types.append(entity_type)
+                type_labels[entity_type] = len(types)
+            labels[node] = type_labels[entity_type]
+            count += 1
+
+    # Nodes in breadth-first (depth) order by counting sort, so a parent's link is set first
+    nodes = trie.nodes
+    depths = trie.depths
+    max_depth = max(depths)
+    starts = [0] * (max_depth + 2)
+    for depth in depths:
+        starts[depth + 1] += 1
+    for depth in range(1, max_depth + 2):
+        starts[depth] += starts[depth - 1]
+    order = array("I", bytes(4 * nodes))
+    for node in range(nodes):
+        order[starts[depths[node]]] = node
+        starts[depths[node]] += 1
+
+    fail = array("I", bytes(4 * nodes))
+    out = array("I", bytes(4 * nodes))
+    for node in order:
+        parent = trie.node_parents[node]
+        if not parent:
+            continue
+        key = trie.node_keys[node]
+        state = fail[parent]
+        child = trie.child(state, key)
+        while not child and state:
+            state = fail[state]
+            child = trie.child(state, key)
+        fail[node] = child
+        # Nearest entry that ends at a proper suffix of this node
+        out[node] = child if labels[child] else out[child]
+
+    metadata = {"entries": count, "nodes": nodes, "max_depth": max_depth, "types": types}
+
+    def write(f):
+        trie.write(f, MAGIC)
+        fail.tofile(f)
+        out.tofile(f)
+        labels.tofile(f)
+        depths.tofile(f)
+        f.write(json.dumps(metadata).encode("utf-8"))
+    write_atomic(path, write)
+    return metadata
+
+
+class DictionaryAutomaton(MappedTrie):
+    """A compiled dictionary mapped read-only; scan() finds every entry in a text in one pass"""
+
+    def __init__(self, path: str):
+        super().__init__(path, MAGIC)
+        self._fail = self._array("I", self.nodes)
+        self._out = self._array("I", self.nodes)
+        self._labels = self._array("H", self.nodes)
+        self._depths = self._array("H", self.nodes)
+        metadata = json.loads(bytes(self._views[0][self._offset:]).decode("utf-8"))
+        self.entries = metadata["entries"]
+        self.types = metadata["types"]
+        self.max_depth = metadata["max_depth"]
+
+    def scan(self, text: str, entities: EntitySet = None) -> EntitySet:
+        """Add a span for every dictionary entry found in text; overlapping matches are all kept"""
+        entities = EntitySet(text) if entities is None else entities
+        step, fail, out, labels, depths, types = self._step, self._fail, self._out, self._labels, self._depths, self.types
+        # Start offsets of the last max_depth words, the longest an entry can span
+        window = max(self.max_depth, 1)
+        word_starts = [0] * window
+        node = 0
+        for index, match in enumerate(WORD_PATTERN.finditer(text)):
+            key = word_key(match.group().lower())
+            word_starts[index % window] = match.start()
+            child = step(node, key)
+            while not child and node:
+                node = fail[node]
+                child = step(node, key)
+            node = child
+            hit = node if labels[node] else out[node]
+            while hit:
+                entities.add(word_starts[(index - depths[hit] + 1) % window], match.end(), types[labels[hit] - 1])
+                hit = out[hit]
+        return entities
+
+    def status(self) -> dict:
+        return {"path": self.path, "entries": self.entries, "nodes": self.nodes, "types": self.types}
+
+
+def dictionary_fingerprint(paths: List[str]) -> str:
+    """Identifies the compiled automaton: each dictionary file's path, size and mtime"""
+    digest = hashlib.sha256(MAGIC)
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def dictionary_path(cache_dir: str, fingerprint: str) -> str:
+    return os.path.join(cache_dir, f"dictionary-{fingerprint}.ac")
+
+
+def build_dictionary(paths: List[str], cache_dir: str) -> str:
+    """Path of the compiled automaton for paths, compiling it unless it exists.
+
+    Processes coordinate through an exclusive lock file: one compiles, the others wait for
+    the finished file.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = dictionary_path(cache_dir, dictionary_fingerprint(paths))
+    lock_path = f"{path}.lock"
+    while not os.path.exists(path):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            time.sleep(0.2)
+            continue
+        try:
+            os.close(fd)
+            if not os.path.exists(path):
+                started = time.perf_counter()
+                entries = (entry for dictionary in paths for entry in read_dictionary(dictionary))
+                metadata = compile_dictionary(entries, path)
+                print(f"📖 Compiled dictionary: {metadata['entries']} entries, {metadata['nodes']} nodes "
+                      f"in {time.perf_counter() - started:.1f}s -> {path}")
+        finally:
+            os.remove(lock_path)
+    return path
+
+
+class DictionaryHandle:
+    """The current automaton for a set of dictionary files, swapped in when the files change"""
+
+    def __init__(self, paths: List[str], cache_dir: str, check_seconds: float = 30.0):
+        self.paths = paths
+        self.cache_dir = cache_dir
+        self.check_seconds = check_seconds
+        self.current: Optional[DictionaryAutomaton] = None
+        self.fingerprint = None
+        # Files whose last build failed are not rebuilt by get() until they change
+        self.failed_fingerprint = None
+        self.checked_at = None
+        self.reloads = 0
+        self.error = None
+        self._building = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[DictionaryAutomaton]:
+        """The automaton to scan with, None until the first build finishes; never waits for a compile.
+
+        Checks the files for changes at most every check_seconds. A compiled file that already exists
+        (built by warmup or another process) is mapped at once; a compile runs in the background while
+        the current automaton keeps serving.
+        """
+        if self.checked_at is None or time.monotonic() - self.checked_at >= self.check_seconds:
+            self.reload(wait=False)
+        return self.current
+
+    def reload(self, wait: bool = True) -> bool:
+        """Swap in the automaton for the files as they are now; False if it is already current or still building.
+
+        Without wait, files whose last build failed are left alone until they change.
+        """
+        with self._lock:
+            self.checked_at = time.monotonic()
+            try:
+                fingerprint = dictionary_fingerprint(self.paths)
+            except OSError as e:
+                self.error = str(e)
+                return False
+            if fingerprint == self.fingerprint or (not wait and fingerprint == self.failed_fingerprint):
+                return False
+            path = dictionary_path(self.cache_dir, fingerprint)
+            if self._building is None and os.path.exists(path):
+                try:
+                    self._swap(DictionaryAutomaton(path), fingerprint)
+                    return True
+                except (OSError, ValueError) as e:
+                    # Unreadable or foreign file: leave it to a full build
+                    self.error = str(e)
+            if self._building is None:
+                self._building = threading.Thread(target=self._build, args=(fingerprint,),
+                                                  name="dictionary-build", daemon=True)
+                self._building.start()
+            building = self._building
+        if wait:
+            building.join()
+        return wait and self.fingerprint == fingerprint
+
+    def _swap(self, automaton: DictionaryAutomaton, fingerprint: str):
+        # Scans still holding the old automaton finish on it; its map closes once they drop it
+        self.current, self.fingerprint, self.error, self.failed_fingerprint = automaton, fingerprint, None, None
+        self.reloads += 1
+
+    def _build(self, fingerprint: str):
+        try:
+            automaton = DictionaryAutomaton(build_dictionary(self.paths, self.cache_dir))
+            with self._lock:
+                self._swap(automaton, fingerprint)
+        except Exception as e:
+            with self._lock:
+                self.error, self.failed_fingerprint = str(e), fingerprint
+            print(f"❌ Dictionary build failed: {e}")
+        finally:
+            with self._lock:
+                self._building = None
+
+    def status(self) -> dict:
+        status = self.current.status() if self.current else {}
+        status.update({"reloads": self.reloads, "building": self._building is not None, "error": self.error})
+        return status
+
+
+_dictionary = None
+_dictionary_lock = threading.Lock()
+
+
+def get_dictionary() -> Optional[DictionaryHandle]:
+    """Process-wide handle for Config.DICTIONARY_PATHS; None when no dictionaries are configured"""
+    global _dictionary
+    from config import Config
+    if not Config.DICTIONARY_PATHS:
+        return None
+    if _dictionary is None:
+        with _dictionary_lock:
+            if _dictionary is None:
+                _dictionary = DictionaryHandle(split_paths(Config.DICTIONARY_PATHS), Config.GAZETTEER_CACHE_DIR,
+                                               Config.DICTIONARY_CHECK_SECONDS)
+    return _dictionary
+
+
+def lists_version(gazetteer: Gazetteer = None, dictionary: DictionaryHandle = None) -> str:
+    """Identifies the name lists and dictionaries in force (the process-wide ones unless given).
+
+    They change results as much as code does, so this goes into result cache and revision keys.
+    """
+    gazetteer = gazetteer or get_gazetteer()
+    version = os.path.basename(gazetteer.path).split(".")[0]
+    dictionary = dictionary or get_dictionary()
+    if dictionary is not None:
+        dictionary.get()
+        version += f"+dictionary-{dictionary.fingerprint}"
+    return version
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="dictionary files (default: DICTIONARY_PATHS)")
+    parser.add_argument("--cache-dir", default=Config.GAZETTEER_CACHE_DIR)
+    args = parser.parse_args()
+    paths = args.paths or split_paths(Config.DICTIONARY_PATHS)
+    if not paths:
+        parser.error("no dictionary files given and DICTIONARY_PATHS is empty")
+    automaton = DictionaryAutomaton(build_dictionary(paths, args.cache_dir))
+    print(f"📖 {automaton.entries} entries of types {', '.join(automaton.types)} in {automaton.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+
+class AdmissionRejected(Exception):
+    """Raised when the pipeline already has as many requests as it will accept"""
+
+    def __init__(self, retry_after: int = 5):
+        super().__init__("Server busy, too many documents in flight")
+        self.retry_after = retry_after
+
+
+class PipelineExecutor:
+    """Keeps blocking pipeline work off the asyncio event loop.
+
+    CPU-heavy stages (parsing, NER, regex, redaction) go to the cpu pool, which is
+    a process pool in "process" mode and a thread pool otherwise. Stages that mostly
+    wait (LLM calls, audit writes) go to a separate io thread pool so they never
+    occupy a CPU worker. admit() bounds how many requests may be in flight.
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 4, io_workers: int = 8,
+                 max_pending: int = 16, retry_after: int = 5):
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        if mode == "process":
+            self._cpu_pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._cpu_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline-cpu")
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="pipeline-io")
+        # Only touched from the event loop thread, so a plain counter is enough
+        self._in_flight = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._in_flight >= self.max_pending:
+            raise AdmissionRejected(self.retry_after)
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+    async def run_cpu(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu_pool, fn, *args)
+
+    async def run_io(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, fn, *args)
+
+    def submit_cpu(self, fn, *args) -> Future:
+        """run_cpu for callers on plain threads (e.g. archive members), which wait on the future"""
+        return self._cpu_pool.submit(fn, *args)
+
+    def submit_io(self, fn, *args) -> Future:
+        return self._io_pool.submit(fn, *args)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self):
+        self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,324 @@
+"""Compiled allow/deny lists (gazetteers) for filtering detected entities.
+
+Lists are plain text files, one entry per line ("#" starts a comment), matched
+case-insensitively on whole words. They are compiled into a word-level trie: each
+transition is keyed by (node, 64-bit hash of the lowercased word) in an
+open-addressing hash table, and each node carries flags for the lists that end there.
+Looking a candidate up costs one probe per word and trie step, whatever the size of
+the lists.
+
+The compiled trie is written to a cache file named after a fingerprint of the source
+lists, and loaded with mmap, so a restart (or another worker process) maps the
+existing file instead of recompiling hundreds of thousands of entries.
+
+For the person-name filter a candidate is:
+  - allowed when it is exactly an allowlist entry (always redacted as a name),
+  - denied when it is exactly a denylist entry or contains a deny term (titles,
+    company suffixes, street words, months) anywhere,
+  - otherwise left to the caller's heuristics.
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import uuid
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ALLOW = 1
+DENY = 2
+DENY_TERM = 4
+LIST_FLAGS = {"allow": ALLOW, "deny": DENY, "deny_terms": DENY_TERM}
+
+# Candidates that look like names but are not (formerly RedactorAgent.name_exclusions)
+DEFAULT_DENY = [
+    'united states', 'new york', 'los angeles', 'san francisco',
+    'machine learning', 'data science', 'artificial intelligence',
+    'google drive', 'microsoft office', 'adobe acrobat', 'dear sir',
+    'dear madam', 'yours truly', 'best regards', 'thank you',
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+]
+# Words that rule a candidate out wherever they appear in it
+DEFAULT_DENY_TERMS = [
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sir', 'madam',
+    'inc', 'llc', 'corp', 'ltd', 'co',
+    'street', 'avenue', 'road', 'drive', 'lane',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july',
+    'august', 'september', 'october', 'november', 'december',
+]
+
+WORD_PATTERN = re.compile(r"\w+")
+MAGIC = b"GAZTRIE1"
+HEADER = struct.Struct("<8sQQ")  # magic, table slots, nodes
+_MIX = 0x9E3779B97F4A7C15
+
+
+@lru_cache(maxsize=1 << 16)
+def word_key(word: str) -> int:
+    """Stable 64-bit key of a lowercased word; never 0, which marks an empty slot"""
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+def words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def read_list(path: str) -> Iterable[str]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = line.split("#", 1)[0].strip()
+            if entry:
+                yield entry
+
+
+class TrieBuilder:
+    """Word trie built straight into the open-addressing transition table, plus each node's parent, word and depth"""
+
+    def __init__(self):
+        self._allocate(1024)
+        self.transitions = 0
+        self.node_parents = array("I", [0])
+        self.node_keys = array("Q", [0])
+        self.depths = array("H", [0])
+
+    @property
+    def nodes(self) -> int:
+        return len(self.node_parents)
+
+    def _allocate(self, slots: int):
+        self.slots = slots
+        self.keys = array("Q", bytes(8 * slots))
+        self.parents = array("I", bytes(4 * slots))
+        self.targets = array("I", bytes(4 * slots))
+
+    def _slot(self, node: int, key: int) -> int:
+        keys, parents, targets, mask = self.keys, self.parents, self.targets, self.slots - 1
+        i = (key + node * _MIX) & mask
+        while targets[i] and not (keys[i] == key and parents[i] == node):
+            i = (i + 1) & mask
+        return i
+
+    def child(self, node: int, key: int) -> int:
+        return self.targets[self._slot(node, key)]
+
+    def insert(self, word_keys: Iterable[int]) -> int:
+        """Add the path for a sequence of word keys; returns its final node (0 for no words)"""
+        node = 0
+        for key in word_keys:
+            i = self._slot(node, key)
+            child = self.targets[i]
+            if not child:
+                child = len(self.node_parents)
+                self.keys[i], self.parents[i], self.targets[i] = key, node, child
+                self.node_parents.append(node)
+                self.node_keys.append(key)
+                self.depths.append(min(self.depths[node] + 1, 0xFFFF))
+                self.transitions += 1
+                if self.transitions * 2 > self.slots:
+                    self._grow()
+            node = child
+        return node
+
+    def _grow(self):
+        # Re-place every transition from the per-node arrays at twice the size
+        self._allocate(self.slots * 2)
+        for child in range(1, self.nodes):
+            i = self._slot(self.node_parents[child], self.node_keys[child])
+            self.keys[i], self.parents[i], self.targets[i] = self.node_keys[child], self.node_parents[child], child
+
+    def write(self, f, magic: bytes):
+        f.write(HEADER.pack(magic, self.slots, self.nodes))
+        self.keys.tofile(f)
+        self.parents.tofile(f)
+        self.targets.tofile(f)
+
+
+def write_atomic(path: str, write):
+    """Write a compiled file through a temporary name so readers only ever map complete files"""
+    tmp_path = os.path.join(os.path.dirname(path) or ".", f".tmp-{uuid.uuid4().hex}")
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def compile_trie(entries: Iterable[Tuple[str, int]], path: str) -> int:
+    """Compile (entry, flag) pairs into a trie file at path; returns the number of nodes"""
+    trie = TrieBuilder()
+    flags = bytearray(1)
+    for entry, flag in entries:
+        node = trie.insert(word_key(word) for word in words(entry))
+        flags.extend(bytes(trie.nodes - len(flags)))
+        if node:
+            flags[node] |= flag
+
+    def write(f):
+        trie.write(f, MAGIC)
+        f.write(bytes(flags))
+    write_atomic(path, write)
+    return trie.nodes
+
+
+class MappedTrie:
+    """The transition table of a compiled trie file, mapped read-only and shared through the page cache"""
+
+    def __init__(self, path: str, magic: bytes):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        file_magic, slots, nodes = HEADER.unpack_from(self._map)
+        if file_magic != magic:
+            raise ValueError(f"Not a compiled {magic.decode()} file: {path}")
+        self._views = [memoryview(self._map)]
+        self._offset = HEADER.size
+        self._keys = self._array("Q", slots)
+        self._parents = self._array("I", slots)
+        self._targets = self._array("I", slots)
+        self._mask = slots - 1
+        self.nodes = nodes
+
+    def _array(self, typecode: str, count: int) -> memoryview:
+        """The next count items of the file as a typed view"""
+        size = array(typecode).itemsize * count
+        view = self._views[0][self._offset:self._offset + size].cast(typecode)
+        self._views.append(view)
+        self._offset += size
+        return view
+
+    def _step(self, node: int, key: int) -> int:
+        """Child of node along the word with this key; 0 when there is none"""
+        keys, parents, targets, mask = self._keys, self._parents, self._targets, self._mask
+        i = (key + node * _MIX) & mask
+        while True:
+            target = targets[i]
+            if not target or (keys[i] == key and parents[i] == node):
+                return target
+            i = (i + 1) & mask
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._map.close()
+
+
+class Gazetteer(MappedTrie):
+    """A compiled allow/deny trie; lookups never touch the source lists"""
+
+    def __init__(self, path: str):
+        super().__init__(path, MAGIC)
+        self._flags = self._array("B", self.nodes)
+
+    def lookup(self, text: str) -> Tuple[int, int]:
+        """(flags of the entry equal to the whole text, flags of every entry found inside it)"""
+        keys = [word_key(w) for w in words(text)]
+        whole = inside = 0
+        for start in range(len(keys)):
+            node = 0
+            for pos in range(start, len(keys)):
+                node = self._step(node, keys[pos])
+                if not node:
+                    break
+                flag = self._flags[node]
+                if flag:
+                    inside |= flag
+                    if start == 0 and pos == len(keys) - 1:
+                        whole = flag
+        return whole, inside
+
+    def verdicts(self, candidates: Iterable[str]) -> List[Optional[bool]]:
+        """Per candidate: True if allowlisted, False if denied, None if no list decides"""
+        results = []
+        for candidate in candidates:
+            whole, inside = self.lookup(candidate)
+            if whole & ALLOW:
+                results.append(True)
+            elif whole & DENY or inside & DENY_TERM:
+                results.append(False)
+            else:
+                results.append(None)
+        return results
+
+
+def list_fingerprint(sources: Dict[str, List[str]]) -> str:
+    """Identifies the compiled form: built-in lists plus each source file's path, size and mtime"""
+    digest = hashlib.sha256(MAGIC)
+    for entry in DEFAULT_DENY + ["\0"] + DEFAULT_DENY_TERMS:
+        digest.update(entry.encode("utf-8") + b"\n")
+    for kind in sorted(sources):
+        for path in sources[kind]:
+            stat = os.stat(path)
+            digest.update(f"{kind}\0{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def load_gazetteer(sources: Dict[str, List[str]], cache_dir: str) -> Gazetteer:
+    """Map the compiled trie for the built-in lists plus sources ({"allow"|"deny"|"deny_terms": [paths]}),
+    compiling it into cache_dir first if the lists changed"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"gazetteer-{list_fingerprint(sources)}.trie")
+    if not os.path.exists(path):
+        def entries():
+            yield from ((entry, DENY) for entry in DEFAULT_DENY)
+            yield from ((entry, DENY_TERM) for entry in DEFAULT_DENY_TERMS)
+            for kind, paths in sources.items():
+                for list_path in paths:
+                    yield from ((entry, LIST_FLAGS[kind]) for entry in read_list(list_path))
+        nodes = compile_trie(entries(), path)
+        print(f"📚 Compiled gazetteer: {nodes} trie nodes -> {path}")
+    return Gazetteer(path)
+
+
+def split_paths(value: str) -> List[str]:
+    return [path for path in value.split(os.pathsep) if path]
+
+
+def builtin_cache_dir() -> str:
+    """Where the built-in lists alone are compiled: a per-user temp directory, never the working tree"""
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "default")
+    return os.path.join(tempfile.gettempdir(), f"gazetteer-cache-{user}")
+
+
+def gazetteer_for(allow_paths: str = "", deny_paths: str = "", deny_term_paths: str = "",
+                  cache_dir: str = "gazetteer_cache") -> Gazetteer:
+    """Gazetteer for os.pathsep-separated list paths, cached under cache_dir
+    (or builtin_cache_dir() when no lists are given)"""
+    sources = {
+        "allow": split_paths(allow_paths),
+        "deny": split_paths(deny_paths),
+        "deny_terms": split_paths(deny_term_paths),
+    }
+    return load_gazetteer(sources, cache_dir if any(sources.values()) else builtin_cache_dir())
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer from the Config list paths"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                from config import Config
+                _gazetteer = gazetteer_for(Config.NAME_ALLOWLIST_PATHS, Config.NAME_DENYLIST_PATHS,
+                                           Config.NAME_DENY_TERM_PATHS, Config.GAZETTEER_CACHE_DIR)
+    return _gazetteer
+
+
+def has_name_shape(name: str) -> bool:
+    """2-4 words of 2-20 characters each"""
+    name_words = name.split()
+    return 2 <= len(name_words) <= 4 and all(2 <= len(word) <= 20 for word in name_words)
+
+
+def filter_person_names(names: List[str], gazetteer: Gazetteer = None) -> List[bool]:
+    """Per name: allow/deny lists first; names neither list decides must have a name's shape"""
+    gazetteer = gazetteer or get_gazetteer()
+    return [
+        listed if listed is not None else has_name_shape(name)
+        for name, listed in zip(names, gazetteer.verdicts(names))
+    ]
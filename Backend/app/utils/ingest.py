@@ -0,0 +1,133 @@
+"""Single-pass upload ingest.
+
+An upload is copied to a spool file in fixed-size chunks, and each chunk is also fed
+to the content hash, the size limit and the format sniffer on the way through. Nothing
+re-reads the file afterwards. The result is a dict describing the spooled file:
+
+    {"path", "filename", "format", "size", "sha256"}
+
+The spool path keeps the upload's extension, so RunnerAgent can open it directly, and
+sha256 can key the result cache without hashing the file again. Sniffing checks that
+the content matches the extension: PDFs start with %PDF-, DOCX files are ZIPs holding
+word/document.xml, and TXT and JSON are valid UTF-8 (JSON opening with { or [).
+"""
+import codecs
+import hashlib
+import os
+import uuid
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".json", ".docx")
+CHUNK_BYTES = 1024 * 1024
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# PDF readers accept a header anywhere in the first KiB
+HEAD_BYTES = 1024
+DOCX_MARKER = b"word/document.xml"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class IngestError(Exception):
+    """Upload rejected; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_supported(filename: str) -> bool:
+    return os.path.splitext(filename or "")[1].lower() in SUPPORTED_EXTENSIONS
+
+
+class Spool:
+    """One upload being written to disk; write() hashes, counts and sniffs each chunk as it passes"""
+
+    def __init__(self, directory: str, filename: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        ext = os.path.splitext(filename or "")[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise IngestError("Unsupported file type. Use PDF, TXT, JSON, or DOCX.")
+        self.filename = filename
+        self.ext = ext
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.path = os.path.join(directory, f"{uuid.uuid4()}{ext}")
+        self._hash = hashlib.sha256()
+        self._head = b""
+        self._tail = b""
+        self._docx_marker = False
+        self._first_char = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")() if ext in (".txt", ".json") else None
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "wb")
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise IngestError(f"File too large. Maximum size: {self.max_bytes / (1024 * 1024):.1f}MB", 413)
+        self._hash.update(chunk)
+        if len(self._head) < HEAD_BYTES:
+            self._head += chunk[:HEAD_BYTES - len(self._head)]
+        if self.ext == ".docx" and not self._docx_marker:
+            # Local file headers carry entry names inline; keep a tail so a name split across chunks is found
+            window = self._tail + chunk
+            self._docx_marker = DOCX_MARKER in window
+            self._tail = window[-(len(DOCX_MARKER) - 1):]
+        elif self._decoder is not None:
+            self._check_text(chunk)
+        self._file.write(chunk)
+
+    def _check_text(self, chunk: bytes, final: bool = False):
+        try:
+            text = self._decoder.decode(chunk, final)
+        except UnicodeDecodeError:
+            raise IngestError(f"Invalid {self.ext[1:].upper()} file: not UTF-8 text")
+        if not self._first_char:
+            self._first_char = text.lstrip("\ufeff \t\r\n")[:1]
+
+    def finish(self) -> dict:
+        """Close the spool and check the sniffed format; returns the upload description"""
+        self._file.close()
+        if not self.size:
+            raise IngestError("Empty file")
+        if self.ext == ".pdf" and b"%PDF-" not in self._head:
+            raise IngestError("Invalid PDF file: missing %PDF header")
+        if self.ext == ".docx" and not (self._head.startswith(ZIP_MAGIC) and self._docx_marker):
+            raise IngestError("Invalid DOCX file: not a Word document archive")
+        if self._decoder is not None:
+            self._check_text(b"", final=True)
+            if self.ext == ".json" and self._first_char not in ("{", "["):
+                raise IngestError("Invalid JSON file: expected an object or array")
+        return {"path": self.path, "filename": self.filename, "format": self.ext[1:],
+                "size": self.size, "sha256": self._hash.hexdigest()}
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def spool_stream(stream, directory: str, filename: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 chunk_size: int = CHUNK_BYTES) -> dict:
+    """Spool a readable binary stream (e.g. a Flask FileStorage's .stream) in one pass"""
+    spool = Spool(directory, filename, max_bytes)
+    try:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            spool.write(chunk)
+        return spool.finish()
+    except BaseException:
+        spool.abort()
+        raise
+
+
+async def aspool_upload(upload, directory: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                        chunk_size: int = CHUNK_BYTES) -> dict:
+    """spool_stream for an async reader such as FastAPI's UploadFile"""
+    spool = Spool(directory, upload.filename, max_bytes)
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            spool.write(chunk)
+        return spool.finish()
+    except BaseException:
+        spool.abort()
+        raise
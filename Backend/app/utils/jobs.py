@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import zipfile
+import threading
+from typing import Callable, List, Optional, Tuple
+
+# Job lifecycle: queued -> running -> completed | failed
+# File lifecycle: queued -> running -> redacted | no_pii | error
+FINISHED_FILE_STATES = ("redacted", "no_pii", "error")
+
+
+class JobStore:
+    """SQLite-backed job table so queued work survives a worker restart"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, compliance_type TEXT NOT NULL, status TEXT NOT NULL,"
+                " created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+                " result_path TEXT, error TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_files ("
+                " job_id TEXT NOT NULL, idx INTEGER NOT NULL, filename TEXT NOT NULL,"
+                " input_path TEXT NOT NULL, status TEXT NOT NULL,"
+                " output_path TEXT, audit_path TEXT, message TEXT,"
+                " PRIMARY KEY (job_id, idx))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+
+    def create_job(self, job_id: str, compliance_type: str, files: List[Tuple[str, str]]) -> str:
+        """Register a job with its (filename, input_path) pairs"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, compliance_type, status, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, compliance_type, now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_files (job_id, idx, filename, input_path, status) VALUES (?, ?, ?, ?, 'queued')",
+                [(job_id, idx, filename, path) for idx, (filename, path) in enumerate(files)],
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = self._conn.execute(
+                "SELECT * FROM job_files WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        result = dict(job)
+        result["files"] = [dict(f) for f in files]
+        return result
+
+    def mark_job(self, job_id: str, status: str, result_path: str = None, error: str = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result_path = COALESCE(?, result_path), error = ?, updated_at = ? WHERE id = ?",
+                (status, result_path, error, time.time(), job_id),
+            )
+
+    def mark_file(self, job_id: str, idx: int, status: str, output_path: str = None,
+                  audit_path: str = None, message: str = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_files SET status = ?, output_path = ?, audit_path = ?, message = ? WHERE job_id = ? AND idx = ?",
+                (status, output_path, audit_path, message, job_id, idx),
+            )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def unfinished_jobs(self) -> List[str]:
+        """Jobs that were queued or interrupted mid-run, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def summarize_job(job: dict) -> dict:
+    """Public view of a job: status plus per-file progress"""
+    finished = sum(1 for f in job["files"] if f["status"] in FINISHED_FILE_STATES)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "compliance_type": job["compliance_type"],
+        "progress": {"processed": finished, "total": len(job["files"])},
+        "files": [
+            {"filename": f["filename"], "status": f["status"], "message": f["message"]}
+            for f in job["files"]
+        ],
+        "error": job["error"],
+    }
+
+
+class JobWorkerPool:
+    """Threads pulling job ids off a queue and running every file through the pipeline.
+
+    process_file(input_path, compliance_type, work_dir) must return
+    (output_path, audit_path), or (None, None) when nothing was redacted.
+    """
+
+    def __init__(self, store: JobStore, process_file: Callable, jobs_folder: str, workers: int = 2):
+        self.store = store
+        self.process_file = process_file
+        self.jobs_folder = jobs_folder
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+
+    def job_dir(self, job_id: str) -> str:
+        path = os.path.join(self.jobs_folder, job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def start(self):
+        # Pick up anything a previous process left unfinished
+        for job_id in self.store.unfinished_jobs():
+            self._queue.put(job_id)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"✅ Job worker pool started with {self.workers} workers")
+
+    def submit(self, job_id: str):
+        self._queue.put(job_id)
+
+    def stop(self, timeout: float = 5.0):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            try:
+                self.run_job(job_id)
+            except Exception as e:
+                self.store.mark_job(job_id, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def run_job(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] in ("completed", "failed"):
+            return
+        self.store.mark_job(job_id, "running")
+        work_dir = self.job_dir(job_id)
+
+        for f in job["files"]:
+            # Files finished before a restart are not processed again
+            if f["status"] in FINISHED_FILE_STATES:
+                continue
+            self.store.mark_file(job_id, f["idx"], "running")
+            try:
+                output_path, audit_path = self.process_file(f["input_path"], job["compliance_type"], work_dir)
+                if output_path:
+                    self.store.mark_file(job_id, f["idx"], "redacted", output_path, audit_path)
+                else:
+                    self.store.mark_file(job_id, f["idx"], "no_pii", message="No sensitive information detected")
+            except Exception as e:
+                self.store.mark_file(job_id, f["idx"], "error", message=str(e))
+
+        result_path = self._write_result_zip(job_id, work_dir)
+        self.store.mark_job(job_id, "completed", result_path=result_path)
+
+    def _write_result_zip(self, job_id: str, work_dir: str) -> Optional[str]:
+        job = self.store.get_job(job_id)
+        redacted = [f for f in job["files"] if f["status"] == "redacted"]
+        if not redacted:
+            return None
+        zip_path = os.path.join(work_dir, "result.zip")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for f in redacted:
+                if f["output_path"] and os.path.exists(f["output_path"]):
+                    zipf.write(f["output_path"], f"redacted/{os.path.basename(f['output_path'])}")
+                if f["audit_path"] and os.path.exists(f["audit_path"]):
+                    zipf.write(f["audit_path"], f"audit_logs/{os.path.basename(f['audit_path'])}")
+            zipf.writestr("job.json", json.dumps(summarize_job(job), indent=2))
+        return zip_path
@@ -0,0 +1,238 @@
+"""Memory-aware admission control for the redaction pipeline.
+
+Each document gets an estimated peak memory cost from its format, size and (for PDFs)
+page count. A MemoryBudget admits documents while the sum of their reservations stays
+under a byte budget. Past that point they queue in arrival order, so a large PDF is
+not starved by a stream of small files. A document still waiting when its timeout
+runs out, or arriving at a full queue, is rejected with AdmissionRejected (503 plus
+Retry-After). A document larger than the whole budget runs once nothing else holds
+a reservation.
+
+Reservations and waiters are shared by threads (Flask, job and bulk workers) and
+coroutines (FastAPI). stats() reports what is reserved next to the resident memory
+actually in use by this process and its worker processes.
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+from app.utils.executors import AdmissionRejected
+
+MB = 1024 * 1024
+# format -> (fixed bytes, bytes per input byte, bytes per page), fitted to peak RSS of the
+# regex pipeline: a 16 MB TXT peaked ~80 MB (raw, str and redacted copies), a 14 MB JSON
+# ~200 MB (the parsed tree on top), a 90 KB DOCX ~40 MB (zipped XML inflates and python-docx
+# builds an object per run) and a 300-page 2.5 MB PDF ~45 MB.
+COST_MODEL = {
+    "txt": (8 * MB, 6, 0),
+    "json": (8 * MB, 16, 0),
+    "docx": (16 * MB, 300, 0),
+    "pdf": (24 * MB, 3, 64 * 1024),
+}
+# Assumed page density when a PDF's page count cannot be read
+PDF_BYTES_PER_PAGE = 50 * 1024
+
+
+def pdf_page_count(file_path: str) -> Optional[int]:
+    try:
+        import fitz
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    except Exception:
+        return None
+
+
+def estimate_cost(file_path: str, size: int = None, pages: int = None) -> int:
+    """Estimated peak bytes to process a document, from its format, size and page count"""
+    fmt = os.path.splitext(file_path)[1].lower().lstrip(".")
+    base, per_byte, per_page = COST_MODEL.get(fmt, COST_MODEL["txt"])
+    size = os.path.getsize(file_path) if size is None else size
+    if per_page and pages is None:
+        pages = pdf_page_count(file_path) or max(1, size // PDF_BYTES_PER_PAGE)
+    return base + size * per_byte + (pages or 0) * per_page
+
+
+def current_rss(pid: int = None) -> Optional[int]:
+    """Resident bytes of a process (default: this one); None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def worker_rss() -> int:
+    """Resident bytes of this process's direct children, such as process-pool workers"""
+    total, me = 0, os.getpid()
+    try:
+        pids = [name for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # ppid is the second field after the parenthesised command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == me:
+            total += current_rss(int(pid)) or 0
+    return total
+
+
+def physical_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _Waiter:
+    __slots__ = ("cost", "granted", "event", "loop", "future")
+
+    def __init__(self, cost: int, loop: asyncio.AbstractEventLoop = None):
+        self.cost = cost
+        self.granted = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class MemoryBudget:
+    """FIFO admission of documents against a byte budget of estimated peak memory"""
+
+    def __init__(self, budget_bytes: int, timeout: float = 30.0, max_waiting: int = 64, retry_after: int = 5):
+        self.budget_bytes = budget_bytes
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.retry_after = retry_after
+        self.reserved = 0
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._queue = deque()
+        self._lock = threading.Lock()
+
+    def _fits(self, cost: int) -> bool:
+        return self.running == 0 or self.reserved + cost <= self.budget_bytes
+
+    def _take(self, cost: int):
+        self.reserved += cost
+        self.running += 1
+        self.admitted += 1
+
+    def _grant(self):
+        """Admit queued waiters from the head while they fit; caller holds the lock"""
+        while self._queue and self._fits(self._queue[0].cost):
+            waiter = self._queue.popleft()
+            self._take(waiter.cost)
+            waiter.granted = True
+            waiter.wake()
+
+    def _enter(self, cost: int, loop: asyncio.AbstractEventLoop = None) -> Optional[_Waiter]:
+        """Reserve at once if nothing is queued and cost fits, else enqueue; None means admitted"""
+        with self._lock:
+            if not self._queue and self._fits(cost):
+                self._take(cost)
+                return None
+            if len(self._queue) >= self.max_waiting:
+                self.rejected += 1
+                raise AdmissionRejected(self.retry_after)
+            waiter = _Waiter(cost, loop)
+            self._queue.append(waiter)
+            return waiter
+
+    def _give_up(self, waiter: _Waiter) -> bool:
+        """Leave the queue after a timeout; False if the waiter was admitted in the meantime"""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._queue.remove(waiter)
+            self.rejected += 1
+            # The head may have been what held the others back
+            self._grant()
+            return True
+
+    def release(self, cost: int):
+        with self._lock:
+            self.reserved -= cost
+            self.running -= 1
+            self._grant()
+
+    @contextmanager
+    def reserve(self, cost: int, timeout: float = None):
+        """Hold cost bytes of the budget; waits up to timeout (default self.timeout, inf for no limit)"""
+        waiter = self._enter(cost)
+        if waiter is not None:
+            timeout = self.timeout if timeout is None else timeout
+            waiter.event.wait(None if timeout == float("inf") else timeout)
+            if not waiter.granted and self._give_up(waiter):
+                raise AdmissionRejected(self.retry_after)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    @asynccontextmanager
+    async def areserve(self, cost: int, timeout: float = None):
+        """reserve() for coroutines; waiting does not block the event loop"""
+        waiter = self._enter(cost, asyncio.get_running_loop())
+        if waiter is not None:
+            timeout = self.timeout if timeout is None else timeout
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future),
+                                       None if timeout == float("inf") else timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if self._give_up(waiter):
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    raise AdmissionRejected(self.retry_after)
+                if isinstance(e, asyncio.CancelledError):
+                    self.release(cost)
+                    raise
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"budget_bytes": self.budget_bytes, "reserved_bytes": self.reserved, "running": self.running,
+                     "waiting": len(self._queue), "admitted": self.admitted, "rejected": self.rejected}
+        rss = current_rss()
+        stats["rss_bytes"] = rss
+        stats["worker_rss_bytes"] = worker_rss() if rss is not None else None
+        return stats
+
+
+_memory_budget = None
+_memory_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> Optional[MemoryBudget]:
+    """Process-wide budget configured from Config; None when MEMORY_BUDGET_ENABLED is off"""
+    global _memory_budget
+    from config import Config
+    if not Config.MEMORY_BUDGET_ENABLED:
+        return None
+    if _memory_budget is None:
+        with _memory_budget_lock:
+            if _memory_budget is None:
+                # Default to half of physical memory, leaving room for the models themselves
+                budget = Config.MEMORY_BUDGET_BYTES or (physical_memory() or 4 * 1024 * MB) // 2
+                _memory_budget = MemoryBudget(budget, Config.MEMORY_QUEUE_TIMEOUT_SECONDS,
+                                              Config.MEMORY_MAX_WAITING, Config.ADMISSION_RETRY_AFTER_SECONDS)
+    return _memory_budget
@@ -0,0 +1,118 @@
+import os
+import time
+import threading
+from dotenv import load_dotenv
+from config import Config
+
+load_dotenv()
+
+WARMUP_TEXT = "John Smith from Acme Corp emailed john.smith@example.com about the Paris office on Monday."
+
+
+class ModelRegistry:
+    """Loads GLiNER and the LLM client once per process and hands the same instances to every coordinator"""
+
+    def __init__(self, gliner_model_name: str = None, llm_model_name: str = None):
+        self.gliner_model_name = gliner_model_name or Config.GLINER_MODEL
+        self.llm_model_name = llm_model_name or Config.LLM_MODEL
+        self._lock = threading.Lock()
+        self._gliner = None
+        self._gliner_loaded = False
+        self._llm = None
+        self._llm_loaded = False
+        self._warmup_thread = None
+        self.ready = False
+        self.warmup_seconds = None
+        self.errors = {}
+
+    def get_gliner(self):
+        """GLiNER model, loaded on first use; None if it cannot be loaded"""
+        if not self._gliner_loaded:
+            with self._lock:
+                if not self._gliner_loaded:
+                    try:
+                        from gliner import GLiNER
+                        self._gliner = GLiNER.from_pretrained(self.gliner_model_name)
+                        print("✅ GLiNER NER model loaded")
+                    except Exception as e:
+                        print(f"❌ Failed to load GLiNER model: {e}")
+                        self.errors["gliner"] = str(e)
+                        self._gliner = None
+                    self._gliner_loaded = True
+        return self._gliner
+
+    def get_llm(self):
+        """Gemini client for compliance validation; None without an API key"""
+        if not self._llm_loaded:
+            with self._lock:
+                if not self._llm_loaded:
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        print("⚠️ GEMINI_API_KEY not found, LLM features disabled")
+                        self.errors["llm"] = "GEMINI_API_KEY not set"
+                    else:
+                        try:
+                            from langchain_google_genai import ChatGoogleGenerativeAI
+                            self._llm = ChatGoogleGenerativeAI(
+                                model=self.llm_model_name,
+                                temperature=0,
+                                google_api_key=api_key,
+                                timeout=30
+                            )
+                            print("✅ LLM loaded for compliance validation")
+                        except Exception as e:
+                            print(f"❌ Failed to load Gemini LLM: {e}")
+                            self.errors["llm"] = str(e)
+                    self._llm_loaded = True
+        return self._llm
+
+    def warmup(self):
+        """Load both models and run one small inference so the first real request is not slow"""
+        start = time.perf_counter()
+        gliner_model = self.get_gliner()
+        self.get_llm()
+        if gliner_model is not None:
+            try:
+                gliner_model.predict_entities(WARMUP_TEXT, labels=["Person", "Organization", "Email", "Location"], threshold=0.5)
+            except Exception as e:
+                self.errors["warmup"] = str(e)
+        try:
+            # Compile (or map the cached) name lists and dictionaries off the request path as well
+            from app.utils.gazetteer import get_gazetteer
+            get_gazetteer()
+        except Exception as e:
+            self.errors["gazetteer"] = str(e)
+        try:
+            from app.utils.dictionary import get_dictionary
+            dictionary = get_dictionary()
+            if dictionary is not None:
+                # Warmup may wait for the compile; requests never do
+                dictionary.reload()
+        except Exception as e:
+            self.errors["dictionary"] = str(e)
+        self.warmup_seconds = round(time.perf_counter() - start, 3)
+        self.ready = True
+        print(f"🔥 Models warmed up in {self.warmup_seconds}s")
+
+    def start_warmup(self):
+        """Warm up on a background thread so the server can accept health checks meanwhile"""
+        with self._lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(target=self.warmup, name="model-warmup", daemon=True)
+                self._warmup_thread.start()
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "gliner_loaded": self._gliner is not None,
+            "llm_loaded": self._llm is not None,
+            "warmup_seconds": self.warmup_seconds,
+            "errors": self.errors,
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    return registry
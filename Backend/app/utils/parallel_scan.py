@@ -0,0 +1,157 @@
+"""Regex detection of very large texts across a process pool.
+
+scan_spans_parallel() gives the same spans as detectors.scan_spans(), using every core
+for texts of at least PARALLEL_SCAN_MIN_CHARS:
+
+  - The text is cut into shards of about PARALLEL_SCAN_SHARD_CHARS at safe boundaries,
+    just after whitespace, so no word is split. Each shard is scanned
+    PARALLEL_SCAN_OVERLAP_CHARS past its end, so entities that contain spaces (phones,
+    card numbers) and cross the boundary are still seen whole. The overlap must be
+    longer than any such entity; the default is far longer than the detectors' patterns.
+  - The text is encoded once into a shared memory block. Workers receive its name and
+    their byte range, not a pickled copy of the text, and decode only their shard.
+  - Each shard reports the matches of every pattern in its scanned range. The merge
+    keeps, per pattern, the matches that start in the shard's own range. Where a
+    shard's first match overlaps the previous shard's last match, or a match runs into
+    the end of the overlap, that stretch is rescanned here, so results equal a serial
+    finditer.
+
+Small texts, single-worker setups and calls from inside pool workers (which must not
+start pools of their own) scan serially.
+"""
+import multiprocessing
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from app.agents.detectors import REGEX_DETECTORS, REGEX_TYPES, scan_spans
+from app.agents.entities import EntitySet
+
+# Matches of one pattern in one shard: (starts, ends, validator passed), shard-relative
+ShardMatches = Tuple[array, array, bytes]
+
+
+def shard_bounds(text: str, shard_chars: int) -> List[int]:
+    """Shard start offsets (plus len(text)), each just after whitespace near a multiple of shard_chars"""
+    bounds = [0]
+    length = len(text)
+    while bounds[-1] + shard_chars < length:
+        target = bounds[-1] + shard_chars
+        # Back up to the last whitespace; a shard with none is cut where it is
+        cut = max(text.rfind(" ", bounds[-1] + 1, target), text.rfind("\n", bounds[-1] + 1, target))
+        bounds.append(cut + 1 if cut > bounds[-1] else target)
+    bounds.append(length)
+    return bounds
+
+
+def _detectors(types: Optional[List[str]]) -> List[Tuple[str, int]]:
+    """(entity type, index into REGEX_DETECTORS[type]) for every pattern to run, in scan_spans order"""
+    return [(t, i) for t in REGEX_TYPES if types is None or t in types for i in range(len(REGEX_DETECTORS[t]))]
+
+
+def _scan_shard(shm_name: str, byte_start: int, byte_end: int, types: Optional[List[str]]) -> List[ShardMatches]:
+    """Worker: decode one shard from shared memory and run every pattern over it"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        shard = str(shm.buf[byte_start:byte_end], "utf-8")
+    finally:
+        shm.close()
+    results = []
+    for entity_type, index in _detectors(types):
+        pattern, check = REGEX_DETECTORS[entity_type][index]
+        starts, ends, passed = array("q"), array("q"), bytearray()
+        for match in pattern.finditer(shard):
+            starts.append(match.start())
+            ends.append(match.end())
+            passed.append(check is None or check(match.group()))
+        results.append((starts, ends, bytes(passed)))
+    return results
+
+
+def _merge_pattern(text: str, entities: EntitySet, entity_type: str, pattern, check,
+                   bounds: List[int], scanned_ends: List[int], shards: List[ShardMatches]):
+    """Stitch one pattern's shard matches into entities as a serial finditer would have found them"""
+    resume = 0  # where a serial scan would continue: the end of the last accepted match
+    for shard, (starts, ends, passed) in enumerate(shards):
+        own_start, own_end, scanned_end = bounds[shard], bounds[shard + 1], scanned_ends[shard]
+        shard_resume = resume
+        accepted = []
+        for start, end, ok in zip(starts, ends, passed):
+            start, end = start + own_start, end + own_start
+            if start >= own_end:
+                break
+            if start < resume or (end >= scanned_end and scanned_end < len(text)):
+                # Overlaps the previous shard's match, or may be cut off where the scan stopped:
+                # redo this shard's range the way a serial scan reaches it
+                accepted = []
+                resume = shard_resume
+                for match in pattern.finditer(text, resume):
+                    if match.start() >= own_end:
+                        break
+                    accepted.append((match.start(), match.end(), check is None or check(match.group())))
+                    resume = match.end()
+                break
+            accepted.append((start, end, ok))
+            resume = end
+        for start, end, ok in accepted:
+            if ok:
+                entities.add(start, end, entity_type)
+
+
+def scan_spans_parallel(text: str, types: List[str] = None, entities: EntitySet = None,
+                        workers: int = None, shard_chars: int = None, overlap_chars: int = None,
+                        min_chars: int = None) -> EntitySet:
+    """scan_spans() over shards of text in a process pool; serial for small texts or one worker"""
+    from config import Config
+    workers = workers or Config.PARALLEL_SCAN_WORKERS
+    shard_chars = shard_chars or Config.PARALLEL_SCAN_SHARD_CHARS
+    overlap_chars = overlap_chars or Config.PARALLEL_SCAN_OVERLAP_CHARS
+    min_chars = Config.PARALLEL_SCAN_MIN_CHARS if min_chars is None else min_chars
+    if (workers < 2 or len(text) < max(min_chars, 2 * shard_chars)
+            or multiprocessing.parent_process() is not None):
+        return scan_spans(text, types, entities)
+
+    entities = EntitySet(text) if entities is None else entities
+    bounds = shard_bounds(text, shard_chars)
+    scanned_ends = [min(end + overlap_chars, len(text)) for end in bounds[1:]]
+    # Byte offset of every shard start and scanned end; ASCII text needs no encoding to know them
+    cuts = sorted(set(bounds) | set(scanned_ends))
+    ascii_text = text.isascii()
+    byte_offsets = {0: 0}
+    for start, end in zip(cuts, cuts[1:]):
+        size = end - start if ascii_text else len(text[start:end].encode("utf-8"))
+        byte_offsets[end] = byte_offsets[start] + size
+
+    shm = shared_memory.SharedMemory(create=True, size=max(byte_offsets[len(text)], 1))
+    try:
+        # Encoded piece by piece, so only one piece is ever held outside the shared block
+        for start, end in zip(cuts, cuts[1:]):
+            shm.buf[byte_offsets[start]:byte_offsets[end]] = text[start:end].encode("utf-8")
+        pool = get_scan_pool(workers)
+        futures = [
+            pool.submit(_scan_shard, shm.name, byte_offsets[start], byte_offsets[scanned_end], types)
+            for start, scanned_end in zip(bounds, scanned_ends)
+        ]
+        results = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for index, (entity_type, pattern_index) in enumerate(_detectors(types)):
+        pattern, check = REGEX_DETECTORS[entity_type][pattern_index]
+        _merge_pattern(text, entities, entity_type, pattern, check, bounds, scanned_ends,
+                       [shard[index] for shard in results])
+    return entities.dedup()
+
+
+_scan_pools: Dict[int, ProcessPoolExecutor] = {}
+_scan_pools_lock = threading.Lock()
+
+
+def get_scan_pool(workers: int) -> ProcessPoolExecutor:
+    """Process-wide pool of the given size, started on first use and kept for later scans"""
+    with _scan_pools_lock:
+        if workers not in _scan_pools:
+            _scan_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return _scan_pools[workers]
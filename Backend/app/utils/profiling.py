@@ -0,0 +1,122 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import List
+
+
+# tracemalloc is process-wide: keep it running while any profiled stage is active
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_owns_tracing = False
+
+
+def _start_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _owns_tracing = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+
+def _hot_functions(profile: cProfile.Profile, top_n: int) -> List[dict]:
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    stats.sort_stats("cumulative")
+    hot = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        hot.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    hot.sort(key=lambda f: f["cumulative_ms"], reverse=True)
+    return hot[:top_n]
+
+
+class StageProfiler:
+    """Per-document profile: wall time, CPU time, peak traced memory and optional hot functions per stage.
+
+    Disabled profilers cost one attribute check per stage, so coordinators always take one.
+    CPU time is the calling thread's, so stages must run on a single thread each.
+    tracemalloc is process-wide: concurrent requests inflate each other's peaks.
+    """
+
+    def __init__(self, enabled: bool = False, top_n: int = 0, stages: dict = None):
+        self.enabled = enabled
+        self.top_n = top_n
+        # Carries stages over when a document moves between workers (e.g. CPU pool then I/O pool)
+        self.stages = dict(stages or {})
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        _start_tracing()
+        tracemalloc.reset_peak()
+        base_memory = tracemalloc.get_traced_memory()[0]
+
+        profile = None
+        if self.top_n > 0:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (e.g. a concurrent request's) is already active
+                profile = None
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            if profile is not None:
+                profile.disable()
+            peak = tracemalloc.get_traced_memory()[1] - base_memory
+            _stop_tracing()
+
+            record = {
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "peak_memory_kb": round(max(peak, 0) / 1024, 1),
+            }
+            if profile is not None:
+                record["hot_functions"] = _hot_functions(profile, self.top_n)
+            self.stages[name] = record
+
+    def report(self) -> dict:
+        """Profile for the audit metadata; None when profiling is off"""
+        if not self.enabled:
+            return None
+        return {
+            "stages": self.stages,
+            "total_wall_ms": round(sum(s["wall_ms"] for s in self.stages.values()), 3),
+            "total_cpu_ms": round(sum(s["cpu_ms"] for s in self.stages.values()), 3),
+        }
+
+
+def profile_options(flag, top_n=None) -> dict:
+    """Parse the request's profile/profileTop fields into StageProfiler keyword arguments"""
+    enabled = str(flag or "").strip().lower() in ("1", "true", "yes", "on")
+    try:
+        top = int(top_n) if top_n not in (None, "") else 0
+    except (TypeError, ValueError):
+        top = 0
+    return {"enabled": enabled, "top_n": max(top, 0) if enabled else 0}
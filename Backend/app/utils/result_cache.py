@@ -0,0 +1,225 @@
+"""Whole-document result cache in front of the redaction pipeline.
+
+An entry is keyed by the SHA-256 of the uploaded bytes, the compliance type and the
+pipeline version, so the same document redacted under the same rules is only run
+through the pipeline once. Each entry is a directory holding the redacted artifact (if
+anything was redacted) and meta.json with the audit summary. Entries expire after
+ttl_seconds, and least recently used entries are evicted once the cache holds more than
+max_bytes.
+
+Concurrent requests for the same key are coalesced (single flight): the first computes
+while the others wait on the key's lock and then find the entry. This holds within one
+process; separate worker processes may each compute once before the entry lands.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+META_NAME = "meta.json"
+ARTIFACT_NAME = "artifact"
+# Audit fields that describe one request rather than the document's result
+REQUEST_FIELDS = ("record_id", "timestamp", "logged_at", "file_path", "processing_ms", "profile", "cache_hit",
+                  "incremental")
+
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hex SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(content_digest: str, compliance_type: str, pipeline_version: str) -> str:
+    return hashlib.sha256(f"{content_digest}\0{compliance_type}\0{pipeline_version}".encode("utf-8")).hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class ResultCache:
+    """Redacted artifacts and audit summaries on disk, with TTL, a byte quota and single-flight"""
+
+    def __init__(self, directory: str, ttl_seconds: float = 24 * 3600, max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> {"size", "created_at", "last_used"}; rebuilt from disk on start
+        self._entries: Dict[str, dict] = {}
+        self._size = 0
+        self._flights: Dict[str, list] = {}
+        self._async_flights: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            meta_path = os.path.join(path, META_NAME)
+            if name.startswith(".tmp-"):
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    created_at = json.load(f)["created_at"]
+                last_used = os.path.getmtime(meta_path)
+            except (OSError, ValueError, KeyError):
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            self._track(name, _dir_size(path), created_at, last_used)
+
+    def _track(self, key: str, size: int, created_at: float, last_used: float):
+        self._entries[key] = {"size": size, "created_at": created_at, "last_used": last_used}
+        self._size += size
+
+    def _drop(self, key: str):
+        """Forget and delete one entry; caller holds the lock"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry["size"]
+        shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached result: {"artifact_path", "artifact_ext", "audit", "created_at"}, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry["created_at"] > self.ttl_seconds:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entry["last_used"] = now
+            self.hits += 1
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, META_NAME), encoding="utf-8") as f:
+                meta = json.load(f)
+            # Persist recency so LRU order survives a restart
+            os.utime(os.path.join(path, META_NAME))
+        except (OSError, ValueError):
+            with self._lock:
+                self._drop(key)
+                self.hits -= 1
+                self.misses += 1
+            return None
+        ext = meta.get("artifact_ext")
+        meta["artifact_path"] = os.path.join(path, ARTIFACT_NAME + ext) if ext is not None else None
+        return meta
+
+    def put(self, key: str, output_path: Optional[str], audit: Optional[dict]) -> None:
+        """Store a result; output_path None records that nothing needed redacting"""
+        ext = os.path.splitext(output_path)[1] if output_path else None
+        meta = {
+            "created_at": time.time(),
+            "artifact_ext": ext,
+            "audit": {k: v for k, v in audit.items() if k not in REQUEST_FIELDS} if audit else None,
+        }
+        # Build the entry beside the cache and rename it into place so readers never see half of it
+        tmp_path = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_path)
+        try:
+            if output_path:
+                shutil.copyfile(output_path, os.path.join(tmp_path, ARTIFACT_NAME + ext))
+            with open(os.path.join(tmp_path, META_NAME), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            size = _dir_size(tmp_path)
+            if size > self.max_bytes:
+                return
+            with self._lock:
+                self._drop(key)
+                os.rename(tmp_path, os.path.join(self.directory, key))
+                self._track(key, size, meta["created_at"], meta["created_at"])
+                self._evict()
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under quota; caller holds the lock"""
+        now = time.time()
+        for key in [k for k, e in self._entries.items() if now - e["created_at"] > self.ttl_seconds]:
+            self._drop(key)
+            self.evictions += 1
+        if self._size <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["last_used"]):
+            if self._size <= self.max_bytes:
+                break
+            self._drop(key)
+            self.evictions += 1
+
+    def materialize(self, entry: dict, output_dir: str) -> Optional[str]:
+        """Give the caller its own copy of a cached artifact (a hard link where possible)"""
+        if not entry.get("artifact_path"):
+            return None
+        output_path = os.path.join(output_dir, f"{uuid.uuid4()}_redacted{entry['artifact_ext']}")
+        try:
+            os.link(entry["artifact_path"], output_path)
+        except OSError:
+            shutil.copyfile(entry["artifact_path"], output_path)
+        return output_path
+
+    @contextmanager
+    def flight(self, key: str):
+        """Hold the key's lock so only one thread computes a given result at a time"""
+        with self._lock:
+            flight = self._flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+    @asynccontextmanager
+    async def async_flight(self, key: str):
+        """flight() for coroutines on one event loop; waiting does not block the loop"""
+        flight = self._async_flights.setdefault(key, [asyncio.Lock(), 0])
+        flight[1] += 1
+        try:
+            async with flight[0]:
+                yield
+        finally:
+            flight[1] -= 1
+            if not flight[1]:
+                del self._async_flights[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Process-wide cache configured from Config; None when RESULT_CACHE_ENABLED is off"""
+    global _result_cache
+    from config import Config
+    if not Config.RESULT_CACHE_ENABLED:
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(Config.RESULT_CACHE_FOLDER, Config.RESULT_CACHE_TTL_SECONDS,
+                                            Config.RESULT_CACHE_MAX_BYTES)
+    return _result_cache
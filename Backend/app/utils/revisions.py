@@ -0,0 +1,141 @@
+"""Incremental re-redaction of document revisions.
+
+A caller that sends successive revisions of a document under one document id gets
+detection re-run only where the text changed. The text is cut into chunks of whole
+lines at content-defined boundaries: a chunk ends after a line whose CRC is divisible
+by BOUNDARY_MODULUS, once it holds at least CHUNK_MIN_CHARS, or when it reaches
+CHUNK_MAX_CHARS. Because boundaries follow the content rather than offsets, an edit
+only changes the chunks around it, and the rest of the document hashes the same as in
+the previous revision.
+
+For each document the store keeps the last revision's chunk hashes, spans and detected
+entity spans relative to each chunk, never the text itself. Chunks whose hash was seen in
+the previous revision reuse its detections, and only new chunks go through the detector.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from typing import Callable, Iterable, List, Optional, Tuple
+from app.agents.entities import EntitySet
+
+CHUNK_MIN_CHARS = 512
+CHUNK_MAX_CHARS = 4000
+BOUNDARY_MODULUS = 8
+
+
+def split_chunks(text: str, min_chars: int = CHUNK_MIN_CHARS, max_chars: int = CHUNK_MAX_CHARS) -> List[Tuple[int, int]]:
+    """(start, end) spans of whole-line chunks with content-defined boundaries"""
+    spans = []
+    start = pos = 0
+    length = len(text)
+    while pos < length:
+        newline = text.find("\n", pos)
+        line_end = length if newline == -1 else newline + 1
+        size = line_end - start
+        boundary = zlib.crc32(text[pos:line_end].encode("utf-8")) % BOUNDARY_MODULUS == 0
+        if size >= max_chars or (boundary and size >= min_chars):
+            spans.append((start, line_end))
+            start = line_end
+        pos = line_end
+    if start < length:
+        spans.append((start, length))
+    return spans
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def revision_key(document_id: str, compliance_type: str, pipeline_version: str) -> str:
+    return hashlib.sha256(f"{document_id}\0{compliance_type}\0{pipeline_version}".encode("utf-8")).hexdigest()
+
+
+def detect_incremental(detect: Callable[[str], Iterable[dict]], text: str,
+                       previous: dict = None) -> Tuple[EntitySet, dict, dict]:
+    """Run detect on changed chunks only; returns (entities of the whole text, state to store, work report)"""
+    # Chunks stored before entities were kept as spans carry no "entities" and are rescanned
+    known = {chunk["hash"]: chunk["entities"] for chunk in previous["chunks"] if "entities" in chunk} if previous else {}
+    entities = EntitySet(text)
+    chunks = []
+    chars_reused = chunks_reused = 0
+    detect_seconds = 0.0
+    for start, end in split_chunks(text):
+        chunk_text = text[start:end]
+        digest = chunk_hash(chunk_text)
+        if digest in known:
+            chunk_state = known[digest]
+            chunks_reused += 1
+            chars_reused += end - start
+        else:
+            started = time.perf_counter()
+            chunk_state = EntitySet.from_items(chunk_text, detect(chunk_text)).to_state()
+            detect_seconds += time.perf_counter() - started
+            # A chunk repeated later in the same revision is only scanned once
+            known[digest] = chunk_state
+        entities.merge(EntitySet.from_state(chunk_text, chunk_state), offset=start)
+        chunks.append({"hash": digest, "start": start, "end": end, "entities": chunk_state})
+
+    # A name found in one chunk is redacted wherever it occurs, as with whole-document detection
+    entities.spread()
+
+    revision = (previous or {}).get("revision", 0) + 1
+    state = {"revision": revision, "length": len(text), "updated_at": time.time(), "chunks": chunks}
+    chars_scanned = len(text) - chars_reused
+    report = {
+        "revision": revision,
+        "chunks": len(chunks),
+        "chunks_reused": chunks_reused,
+        "chars_scanned": chars_scanned,
+        "chars_reused": chars_reused,
+        "detect_ms": round(detect_seconds * 1000, 1),
+        # Detection time the reused chunks would have cost at this revision's rate
+        "detect_ms_saved": round(detect_seconds * 1000 * chars_reused / chars_scanned, 1) if chars_scanned else None,
+    }
+    return entities, state, report
+
+
+class RevisionStore:
+    """Last revision's chunk state per document, one JSON file each, replaced atomically"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, state: dict):
+        tmp_path = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp_path, self._path(key))
+
+    def delete(self, key: str):
+        if os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+
+_revision_store = None
+_revision_store_lock = threading.Lock()
+
+
+def get_revision_store() -> RevisionStore:
+    """Process-wide store under Config.REVISIONS_FOLDER"""
+    global _revision_store
+    if _revision_store is None:
+        with _revision_store_lock:
+            if _revision_store is None:
+                from config import Config
+                _revision_store = RevisionStore(Config.REVISIONS_FOLDER)
+    return _revision_store
@@ -0,0 +1,86 @@
+import io
+import os
+import time
+import zipfile
+from typing import AsyncIterator, Iterable, Iterator, Tuple, Union
+from app.utils.metrics import STAGE_SECONDS
+
+CHUNK_SIZE = 64 * 1024
+
+# (name inside the archive, path on disk or in-memory bytes)
+ZipEntry = Tuple[str, Union[str, bytes]]
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that zipfile treats as unseekable, so it streams entries with data descriptors"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _write_entry(zipf: zipfile.ZipFile, buffer: _ChunkBuffer, arcname: str, source: Union[str, bytes]) -> Iterator[bytes]:
+    # Only compression counts towards the zip stage, not the time the consumer holds a chunk
+    if isinstance(source, bytes):
+        start = time.perf_counter()
+        zipf.writestr(arcname, source)
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="zip")
+        yield buffer.drain()
+        return
+    elapsed = 0.0
+    force_zip64 = os.path.getsize(source) >= zipfile.ZIP64_LIMIT
+    with open(source, "rb") as src, zipf.open(arcname, "w", force_zip64=force_zip64) as dst:
+        while True:
+            start = time.perf_counter()
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            dst.write(chunk)
+            elapsed += time.perf_counter() - start
+            data = buffer.drain()
+            if data:
+                yield data
+    STAGE_SECONDS.observe(elapsed, stage="zip")
+    yield buffer.drain()
+
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """Yield a ZIP archive chunk by chunk, pulling each entry only when the previous one is sent.
+
+    entries is usually a generator that produces a file, yields it and deletes it once
+    it resumes, so at most one output is held on disk or in memory at a time.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for arcname, source in entries:
+            for data in _write_entry(zipf, buffer, arcname, source):
+                if data:
+                    yield data
+    yield buffer.drain()
+
+
+async def astream_zip(entries: AsyncIterator[ZipEntry]) -> AsyncIterator[bytes]:
+    """Async variant of stream_zip for entries produced by an async pipeline"""
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        async for arcname, source in entries:
+            for data in _write_entry(zipf, buffer, arcname, source):
+                if data:
+                    yield data
+    yield buffer.drain()
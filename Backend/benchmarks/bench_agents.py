@@ -0,0 +1,134 @@
+"""Microbenchmarks for the agent methods on the hot path, across document sizes.
+
+Generates a seeded corpus (benchmarks.corpus) in a scratch directory, then times:
+RunnerAgent.load_text (per format), RedactorAgent._regex_fallback,
+RedactorAgent._detect_with_gliner (only with --with-gliner), RedactorAgent.redact,
+RedactorAgent.redact_pdf_pymupdf, RunnerAgent.save_redacted_text (per format) and
+AuditAgent.log_metadata (including the write and fsync of the record).
+
+Run from Backend/:
+
+    python -m benchmarks.bench_agents --sizes 2000 20000 200000 --repeat 5 --output results.json
+
+Compare two runs with any JSON diff; every timing is in milliseconds.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from app.agents.runner_agent import RunnerAgent
+from app.agents.redactor_agent import RedactorAgent
+from app.agents.audit_agent import AuditAgent
+from app.utils.audit_log import AuditLogWriter
+from benchmarks.corpus import generate_corpus
+
+LOAD_FORMATS = ["txt", "json", "docx", "pdf"]
+
+
+def measure(fn, repeat: int) -> dict:
+    """Run fn repeat times with agent output silenced; summary in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "min_ms": round(timings[0], 3),
+        "repeat": repeat,
+    }
+
+
+def bench_size(work_dir: str, size: int, repeat: int, gliner_model=None, seed: int = 0) -> dict:
+    corpus_dir = os.path.join(work_dir, f"corpus_{size}")
+    manifest = generate_corpus(corpus_dir, [size], LOAD_FORMATS, seed=seed)
+    paths = {d["format"]: os.path.join(corpus_dir, d["path"]) for d in manifest["documents"]}
+    items = [{"type": e["type"], "value": e["value"]} for e in manifest["documents"][0]["entities"]]
+
+    runner = RunnerAgent()
+    redactor = RedactorAgent(gliner_model)
+    # A writer of its own under the scratch dir, rather than the process-wide one under ./audit_logs
+    writer = AuditLogWriter(os.path.join(work_dir, f"audit_logs_{size}"))
+    audit = AuditAgent(writer)
+    text = runner.load_text(paths["txt"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        redacted_text = redactor.redact(text, items) if items else text
+    out_dir = os.path.join(work_dir, f"out_{size}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    results = {"chars": len(text), "entities": len(items), "methods": {}}
+    methods = results["methods"]
+    for fmt in LOAD_FORMATS:
+        methods[f"RunnerAgent.load_text[{fmt}]"] = measure(lambda: runner.load_text(paths[fmt]), repeat)
+    methods["RedactorAgent._regex_fallback"] = measure(lambda: redactor._regex_fallback(text), repeat)
+    if gliner_model is not None:
+        methods["RedactorAgent._detect_with_gliner"] = measure(lambda: redactor._detect_with_gliner(text), repeat)
+    else:
+        methods["RedactorAgent._detect_with_gliner"] = {"skipped": "run with --with-gliner to load the model"}
+    methods["RedactorAgent.redact"] = measure(lambda: redactor.redact(text, items), repeat)
+    methods["RedactorAgent.redact_pdf_pymupdf"] = measure(
+        lambda: redactor.redact_pdf_pymupdf(paths["pdf"], items, os.path.join(out_dir, "redacted.pdf")), repeat)
+    for fmt in LOAD_FORMATS:
+        output_path = os.path.join(out_dir, f"redacted.{fmt}")
+        methods[f"RunnerAgent.save_redacted_text[{fmt}]"] = measure(
+            lambda: runner.save_redacted_text(redacted_text, paths[fmt], output_path), repeat)
+    # log_metadata only queues the record, so each call waits for it to be written and synced too
+
+    def log_and_flush():
+        audit.log_metadata(text, redacted_text, items, "benchmark", paths["txt"])
+        writer.flush()
+    try:
+        methods["AuditAgent.log_metadata"] = measure(log_and_flush, repeat)
+    finally:
+        writer.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000, 200000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--with-gliner", action="store_true", help="load GLiNER and time _detect_with_gliner")
+    parser.add_argument("--output", help="write results to this JSON file instead of stdout")
+    args = parser.parse_args()
+
+    gliner_model = None
+    if args.with_gliner:
+        from app.utils.model_registry import get_registry
+        gliner_model = get_registry().get_gliner()
+
+    results = {
+        "benchmark": "agents",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "gliner": gliner_model is not None,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            results["sizes"][str(size)] = bench_size(work_dir, size, args.repeat, gliner_model, args.seed)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"📊 Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Time audit store queries and rollups over a large synthetic index.
+
+Run from Backend/:  python -m benchmarks.bench_audit_store [--records 1000000]
+
+Rows go straight into the SQLite index (no segment files), spread over 90 days,
+three compliance regimes and the entity types the detectors emit.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from app.utils.audit_store import AuditStore
+
+REGIMES = ["GDPR", "HIPAA", "DPDP"]
+ENTITY_TYPES = ["name", "email", "phone", "ssn", "credit_card", "ip_address", "url", "organization"]
+DAY = 86400
+
+
+def populate(store: AuditStore, records: int, seed: int = 0, batch_size: int = 20000):
+    rng = random.Random(seed)
+    now = time.time()
+    batch = []
+    for i in range(records):
+        counts = {t: rng.randint(1, 4) for t in rng.sample(ENTITY_TYPES, rng.randint(1, 3))}
+        record = {
+            "record_id": f"r{i:09d}",
+            "logged_at": now - rng.random() * 90 * DAY,
+            "compliance_type": rng.choice(REGIMES),
+            "file_path": f"/tmp/upload_{i}.{rng.choice(['txt', 'pdf', 'docx', 'json'])}",
+            "total_redacted_items": sum(counts.values()),
+            "redacted_items_by_type": counts,
+            "processing_status": "completed",
+        }
+        batch.append((record, "audit-00000001.jsonl", i * 400, 400))
+        if len(batch) >= batch_size:
+            store.add_records(batch)
+            batch = []
+    if batch:
+        store.add_records(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1000000)
+    args = parser.parse_args()
+
+    week_ago = time.time() - 7 * DAY
+    queries = {
+        "ssn_under_hipaa_last_week": dict(since=week_ago, compliance_type="HIPAA", entity_type="ssn"),
+        "last_week_by_day": dict(since=week_ago, group_by="day"),
+        "all_by_entity_type": dict(group_by="entity_type"),
+        "gdpr_by_file_type": dict(compliance_type="GDPR", group_by="file_type"),
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        store = AuditStore(os.path.join(work_dir, "index.db"), work_dir)
+        start = time.perf_counter()
+        populate(store, args.records)
+        results = {"records": args.records, "populate_s": round(time.perf_counter() - start, 2), "queries_ms": {}}
+        for name, kwargs in queries.items():
+            start = time.perf_counter()
+            store.query(**kwargs)
+            results["queries_ms"][name] = round((time.perf_counter() - start) * 1000, 1)
+        for name, kwargs in (("rollups_all_by_day", dict(bucket="day")),
+                             ("rollups_last_week_by_hour", dict(since=week_ago, bucket="hour"))):
+            start = time.perf_counter()
+            store.rollups(**kwargs)
+            results["queries_ms"][name] = round((time.perf_counter() - start) * 1000, 1)
+        store.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
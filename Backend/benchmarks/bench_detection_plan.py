@@ -0,0 +1,73 @@
+"""Measure detection time per compliance regime against the unplanned (run-everything) baseline.
+
+Regex-only by default. --with-gliner loads the NER model as well, so the timings include the
+cost of the GLiNER labels each plan drops (GLiNER reads only the first 5000 characters).
+
+Run from Backend/:  python -m benchmarks.bench_detection_plan [--repeat 20] [--paragraphs 200] [--with-gliner]
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from app.agents.redactor_agent import RedactorAgent
+from app.agents.compliance_agent import ComplianceAgent, COMPLIANCE_POLICIES
+
+SAMPLE_PARAGRAPH = (
+    "Patient John Smith (SSN 123-45-6789) can be reached at john.smith@example.com "
+    "or 555-123-4567. Records are mirrored at https://records.example.org/p/42 from "
+    "host 192.168.10.20 and billed to card 4111 1111 1111 1111 on behalf of Acme Health.\n"
+)
+
+
+def time_detection(redactor: RedactorAgent, text: str, plan: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            redactor.detect_sensitive_info(text, plan)
+            timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--with-gliner", action="store_true", help="load GLiNER and include it in every run")
+    args = parser.parse_args()
+
+    gliner_model = None
+    if args.with_gliner:
+        from app.utils.model_registry import get_registry
+        gliner_model = get_registry().get_gliner()
+        if gliner_model is None:
+            parser.error("GLiNER could not be loaded")
+
+    text = SAMPLE_PARAGRAPH * args.paragraphs
+    redactor = RedactorAgent(gliner_model)
+    compliance = ComplianceAgent()
+
+    time_detection(redactor, text, None, 1)  # warm up
+    baseline = time_detection(redactor, text, None, args.repeat)
+    results = {
+        "text_chars": len(text),
+        "gliner": gliner_model is not None,
+        "baseline_ms": round(baseline * 1000, 3),
+        "regimes": {},
+    }
+    for compliance_type in COMPLIANCE_POLICIES:
+        plan = compliance.plan_detection(compliance_type)
+        median = time_detection(redactor, text, plan, args.repeat)
+        results["regimes"][compliance_type] = {
+            "regex_types": plan["regex_types"],
+            "gliner_labels": plan["gliner_labels"],
+            "median_ms": round(median * 1000, 3),
+            "speedup": round(baseline / median, 2) if median else None,
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
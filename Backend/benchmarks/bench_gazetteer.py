@@ -0,0 +1,83 @@
+"""Person-name filtering against growing allow/deny lists: compile, cached load and per-candidate cost.
+
+Run from Backend/:  python -m benchmarks.bench_gazetteer [--sizes 1000,100000,500000]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+
+from app.utils.gazetteer import load_gazetteer
+
+CANDIDATES = ["Jane Roe", "Dr. John Smith", "Acme Health Inc", "Maria del Carmen Lopez", "New York", "Ocean Drive"]
+
+
+def write_list(path: str, size: int, seed: int):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            f.write(f"{rng.choice(['Ada', 'Alan', 'Grace', 'Linus'])}{i} Surname{rng.randrange(10 ** 6)}\n")
+
+
+def previous_filter(name: str, exclusions: set) -> bool:
+    """The check the gazetteer replaced: set membership, then four regexes compiled per call"""
+    name_lower = name.lower()
+    if name_lower in exclusions:
+        return False
+    for pattern in [r'\b(mr|mrs|ms|dr|prof|sir|madam)\b', r'\b(inc|llc|corp|ltd|co)\b',
+                    r'\b(street|avenue|road|drive|lane)\b',
+                    r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\b']:
+        if re.search(pattern, name_lower):
+            return False
+    return True
+
+
+def per_candidate_us(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(CANDIDATES)
+    return round((time.perf_counter() - start) / (repeat * len(CANDIDATES)) * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,100000,500000")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    results = []
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            allow, deny = os.path.join(temp_dir, f"allow-{size}.txt"), os.path.join(temp_dir, f"deny-{size}.txt")
+            write_list(allow, size // 2, 1)
+            write_list(deny, size - size // 2, 2)
+            sources, cache_dir = {"allow": [allow], "deny": [deny]}, os.path.join(temp_dir, f"cache-{size}")
+            start = time.perf_counter()
+            load_gazetteer(sources, cache_dir).close()
+            compile_s = time.perf_counter() - start
+            start = time.perf_counter()
+            gazetteer = load_gazetteer(sources, cache_dir)
+            load_ms = (time.perf_counter() - start) * 1000
+            exclusions = {line.strip().lower() for line in open(deny, encoding="utf-8")}
+            results.append({
+                "entries": size,
+                "compile_s": round(compile_s, 2),
+                "cached_load_ms": round(load_ms, 2),
+                "file_mb": round(os.path.getsize(gazetteer.path) / 2 ** 20, 1),
+                "gazetteer_us_per_candidate": per_candidate_us(gazetteer.verdicts, args.repeat),
+                "previous_us_per_candidate": per_candidate_us(
+                    lambda names: [previous_filter(n, exclusions) for n in names], args.repeat),
+            })
+            gazetteer.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
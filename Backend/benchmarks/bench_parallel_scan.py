@@ -0,0 +1,77 @@
+"""Regex detection of one huge text: serial scan_spans() against scan_spans_parallel() at 1..N workers.
+
+Every parallel run is checked to give exactly the serial spans.
+
+Run from Backend/:  python -m benchmarks.bench_parallel_scan [--mb 64] [--shard-mb 4] [--max-workers 8]
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from app.agents.detectors import scan_spans
+from app.utils.parallel_scan import get_scan_pool, scan_spans_parallel
+from benchmarks.corpus import generate_text
+
+
+def timed(scan, text: str, repeat: int):
+    """Best of repeat runs: (seconds, spans)"""
+    best, spans = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        spans = list(scan(text).spans())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=int, default=64)
+    parser.add_argument("--shard-mb", type=float, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    sentences, _ = generate_text(random.Random(5), args.mb * 2 ** 20, density=0.2)
+    text = "\n".join(sentences)
+    shard_chars = int(args.shard_mb * 2 ** 20)
+    mb = len(text) / 2 ** 20
+
+    serial_s, expected = timed(scan_spans, text, args.repeat)
+    runs = []
+    workers = 1
+    while True:
+        if workers > 1:
+            # Start the pool outside the timing, as a server would have done already
+            get_scan_pool(workers)
+
+        def scan(t, workers=workers):
+            return scan_spans_parallel(t, workers=workers, shard_chars=shard_chars, min_chars=0)
+
+        elapsed, spans = timed(scan, text, args.repeat)
+        runs.append({
+            "workers": workers,
+            "seconds": round(elapsed, 2),
+            "mb_per_s": round(mb / elapsed, 1),
+            "speedup": round(serial_s / elapsed, 2),
+            "identical": spans == expected,
+        })
+        if workers >= args.max_workers:
+            break
+        workers = min(workers * 2, args.max_workers)
+
+    print(json.dumps({
+        "text_mb": round(mb, 1),
+        "shard_mb": args.shard_mb,
+        "cpus": os.cpu_count(),
+        "entities": len(expected),
+        "serial_seconds": round(serial_s, 2),
+        "serial_mb_per_s": round(mb / serial_s, 1),
+        "parallel": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Cold-start benchmark: import time and time-to-first-redaction of each entry point.
+
+Every sample runs in a fresh interpreter so nothing is cached between runs. The
+first redaction uses a small .txt file without models, which is the path that
+must not pay for torch, GLiNER, langchain or the PDF/DOCX backends.
+
+Run from Backend/:  python -m benchmarks.bench_startup [--repeat 5] [--import-budget 1.5]
+
+Exits with status 1 when a median exceeds its budget or a target fails to run, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+
+IMPORT_BUDGET_SECONDS = 1.5
+FIRST_REDACTION_BUDGET_SECONDS = 2.0
+
+HEAVY_MODULES = ["torch", "gliner", "langchain_google_genai", "fitz", "PyPDF2", "reportlab", "docx"]
+
+SAMPLE_TEXT = "Contact John Smith at john.smith@example.com or 555-123-4567.\n"
+
+# name -> (directory put on sys.path, import statement, first redaction using `m`, `path` and `out`)
+TARGETS = {
+    "flask": (BACKEND_DIR, "import routes as m",
+              "m.CoordinatorAgent().handle_file(path, 'GDPR', out)"),
+    "fastapi": (BACKEND_DIR, "import fast_api_test as m",
+                "m.CoordinatorAgent().redact_path(path, out)"),
+    "cli": (REPO_DIR, "import main as m",
+            "m.CoordinatorAgent().handle_files([path], 'GDPR')"),
+    "test_11": (os.path.join(REPO_DIR, "test_11"), "import main; import agents as m",
+                "m.CoordinatorAgent().process_single_file(path, 'GDPR')"),
+}
+
+PROBE = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    {import_stmt}
+imported = time.perf_counter()
+path, out = sys.argv[1], sys.argv[2]
+with contextlib.redirect_stdout(io.StringIO()):
+    {redaction}
+done = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "first_redaction_s": done - start,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_probe(directory: str, import_stmt: str, redaction: str) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "sample.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SAMPLE_TEXT)
+        code = PROBE.format(import_stmt=import_stmt, redaction=redaction, heavy=HEAVY_MODULES)
+        env = dict(os.environ, PYTHONPATH=directory, MODEL_WARMUP_ON_STARTUP="0")
+        # cwd is the scratch dir so audit logs and outputs land there
+        result = subprocess.run(
+            [sys.executable, "-c", code, path, work_dir],
+            cwd=work_dir, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_target(name: str, repeat: int) -> dict:
+    directory, import_stmt, redaction = TARGETS[name]
+    samples = [run_probe(directory, import_stmt, redaction) for _ in range(repeat)]
+    errors = [s["error"] for s in samples if "error" in s]
+    if errors:
+        return {"error": errors[0]}
+    return {
+        "import_s": round(statistics.median(s["import_s"] for s in samples), 3),
+        "first_redaction_s": round(statistics.median(s["first_redaction_s"] for s in samples), 3),
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_SECONDS)
+    parser.add_argument("--first-redaction-budget", type=float, default=FIRST_REDACTION_BUDGET_SECONDS)
+    args = parser.parse_args()
+
+    results = {}
+    over_budget = []
+    failed = []
+    for name in args.targets:
+        result = bench_target(name, args.repeat)
+        results[name] = result
+        if "error" in result:
+            # A target that no longer imports is a regression, not something to skip
+            failed.append(f"{name}: {result['error']}")
+            continue
+        if result["import_s"] > args.import_budget:
+            over_budget.append(f"{name}: import {result['import_s']}s > {args.import_budget}s")
+        if result["first_redaction_s"] > args.first_redaction_budget:
+            over_budget.append(
+                f"{name}: first redaction {result['first_redaction_s']}s > {args.first_redaction_budget}s"
+            )
+
+    print(json.dumps({
+        "budget": {"import_s": args.import_budget, "first_redaction_s": args.first_redaction_budget},
+        "targets": results,
+        "over_budget": over_budget,
+        "failed": failed,
+    }, indent=2))
+    sys.exit(1 if over_budget or failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Seeded synthetic PII corpus with ground-truth spans.
+
+Run from Backend/:
+
+    python -m benchmarks.corpus --out corpus --sizes 2000 20000 --formats txt json ndjson docx pdf --density 0.4
+
+Writes one file per (size, format, copy) plus manifest.json. Each document is a
+list of short sentences; with probability `density` a sentence carries one PII
+value. Ground-truth spans index into the document's source text, which is the
+sentences joined by newlines (the TXT body; JSON/NDJSON/DOCX/PDF store the same
+sentences as paragraphs, records or lines). The same seed always gives the same
+corpus.
+"""
+import argparse
+import json
+import os
+import random
+from typing import List, Tuple
+
+FORMATS = ["txt", "json", "ndjson", "docx", "pdf"]
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "Michael", "Linda", "David", "Elena",
+               "Priya", "Arjun", "Sofia", "Mateo", "Aisha", "Kenji", "Olivia", "Lucas"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez", "Patel",
+              "Sharma", "Nguyen", "Kim", "Okafor", "Silva", "Novak", "Fischer", "Tanaka"]
+DOMAINS = ["example.com", "mail.example.org", "corp.example.net", "clinic.example.io"]
+FILLER = [
+    "The quarterly review covered staffing, budgets and the migration timeline.",
+    "Please keep this record with the rest of the case notes.",
+    "No further action is required until the next scheduled audit.",
+    "The committee approved the revised procedure without changes.",
+    "Attendance at the onboarding session was higher than expected.",
+    "The attached summary reflects the status as of last Friday.",
+    "Several follow-up items were assigned to the operations team.",
+    "This section intentionally contains no personal information.",
+]
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _email(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{rng.randint(1, 99)}@{rng.choice(DOMAINS)}"
+
+
+def _phone(rng: random.Random) -> str:
+    area, prefix, line = rng.randint(200, 989), rng.randint(200, 999), rng.randint(1000, 9999)
+    return rng.choice([f"{area}-{prefix}-{line}", f"({area}) {prefix}-{line}", f"{area}.{prefix}.{line}"])
+
+
+def _ssn(rng: random.Random) -> str:
+    return f"{rng.randint(100, 665)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}"
+
+
+def _credit_card(rng: random.Random) -> str:
+    groups = [str(rng.randint(4000, 4999))] + [f"{rng.randint(0, 9999):04d}" for _ in range(3)]
+    return rng.choice([" ", "-"]).join(groups)
+
+
+def _ip_address(rng: random.Random) -> str:
+    return f"{rng.randint(10, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+
+
+def _url(rng: random.Random) -> str:
+    return f"https://{rng.choice(DOMAINS)}/records/{rng.randint(1000, 99999)}"
+
+
+# entity type -> (value generator, sentence templates with one {} slot)
+ENTITY_TEMPLATES = {
+    "name": (_name, ["The request was filed by {} last week.", "Please forward the notes to {} today."]),
+    "email": (_email, ["Send the signed copy to {} by Monday.", "Replies should go to {} only."]),
+    "phone": (_phone, ["The applicant can be reached at {} after noon.", "Call {} to confirm."]),
+    "ssn": (_ssn, ["The SSN on file is {} per the intake form.", "Verify SSN {} before release."]),
+    "credit_card": (_credit_card, ["The invoice was charged to card {} on receipt.", "Charged to card {} in full."]),
+    "ip_address": (_ip_address, ["The login came from {} at midnight.", "Traffic was traced to host {} again."]),
+    "url": (_url, ["The full record is at {} for reviewers.", "See {} for the signed consent."]),
+}
+ENTITY_TYPES = list(ENTITY_TEMPLATES)
+
+
+def generate_text(rng: random.Random, target_chars: int, density: float,
+                  entity_types: List[str] = None) -> Tuple[List[str], List[dict]]:
+    """Sentences of roughly target_chars in total, plus spans over "\\n".join(sentences)"""
+    entity_types = entity_types or ENTITY_TYPES
+    sentences, spans = [], []
+    offset = 0
+    while offset < target_chars:
+        if rng.random() < density:
+            entity_type = rng.choice(entity_types)
+            make_value, templates = ENTITY_TEMPLATES[entity_type]
+            value = make_value(rng)
+            prefix, suffix = rng.choice(templates).split("{}")
+            sentence = prefix + value + suffix
+            start = offset + len(prefix)
+            spans.append({"type": entity_type, "value": value, "start": start, "end": start + len(value)})
+        else:
+            sentence = rng.choice(FILLER)
+        sentences.append(sentence)
+        offset += len(sentence) + 1
+    return sentences, spans
+
+
+def write_txt(path: str, sentences: List[str]):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(sentences))
+
+
+def write_json(path: str, sentences: List[str]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"document_id": os.path.basename(path), "paragraphs": sentences}, f, indent=2)
+
+
+def write_ndjson(path: str, sentences: List[str]):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, sentence in enumerate(sentences):
+            f.write(json.dumps({"id": i, "text": sentence}) + "\n")
+
+
+def write_docx(path: str, sentences: List[str]):
+    from docx import Document
+    doc = Document()
+    for sentence in sentences:
+        doc.add_paragraph(sentence)
+    doc.save(path)
+
+
+def write_pdf(path: str, sentences: List[str]):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    c = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+    y = height - 40
+    # One sentence per line so no PII value is split by wrapping
+    for sentence in sentences:
+        if y < 40:
+            c.showPage()
+            y = height - 40
+        c.drawString(40, y, sentence)
+        y -= 15
+    c.save()
+
+
+WRITERS = {"txt": write_txt, "json": write_json, "ndjson": write_ndjson, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate_corpus(output_dir: str, sizes: List[int], formats: List[str] = None, density: float = 0.3,
+                    docs_per_size: int = 1, seed: int = 0, entity_types: List[str] = None) -> dict:
+    """Write the corpus and its manifest.json; returns the manifest"""
+    formats = formats or FORMATS
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    documents = []
+    for size in sizes:
+        for copy in range(docs_per_size):
+            sentences, spans = generate_text(rng, size, density, entity_types)
+            for file_format in formats:
+                filename = f"doc_{size}_{copy}.{file_format}"
+                WRITERS[file_format](os.path.join(output_dir, filename), sentences)
+                documents.append({
+                    "path": filename,
+                    "format": file_format,
+                    "chars": sum(len(s) + 1 for s in sentences) - 1,
+                    "entities": spans,
+                })
+    manifest = {"seed": seed, "density": density, "sizes": sizes, "formats": formats, "documents": documents}
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(corpus_dir: str) -> dict:
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000], help="approximate characters per document")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--density", type=float, default=0.3, help="probability that a sentence contains PII")
+    parser.add_argument("--docs-per-size", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    manifest = generate_corpus(args.out, args.sizes, args.formats, args.density, args.docs_per_size, args.seed)
+    entities = sum(len(d["entities"]) for d in manifest["documents"])
+    print(json.dumps({"documents": len(manifest["documents"]), "entities": entities, "out": args.out}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Accuracy and throughput of detector configurations over a labelled corpus, in one report.
+
+Each configuration is run over every document in a corpus made by benchmarks.corpus.
+The report gives precision, recall and F1 per entity type, plus documents per second
+and p50/p95 detection latency, so a speed change can be judged against what it costs
+in recall.
+
+Run from Backend/:
+
+    python -m benchmarks.evaluate --configs regex regex+plan:HIPAA --sizes 2000 20000 --output eval.json
+    python -m benchmarks.evaluate --corpus corpus --configs regex gliner
+    python -m benchmarks.evaluate --configs mymodule:make_detector
+
+A configuration is a name from CONFIGURATIONS, optionally followed by "+plan:<regime>"
+to limit detection to that compliance regime's plan. It can also be "module:function",
+where function(gliner_model, plan) returns a detect(text) -> List[dict] callable.
+
+Matching is by value: a detection is a true positive when the document's ground truth
+has the same type and value, ignoring case. This works for every format because it
+does not depend on character offsets. With a plan, ground truth of types the regime
+does not cover is left out, since skipping those is the point of the plan.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+
+from app.agents.runner_agent import RunnerAgent
+from app.agents.redactor_agent import RedactorAgent
+from app.agents.compliance_agent import build_detection_plan
+from benchmarks.corpus import generate_corpus, load_manifest
+
+# Formats RunnerAgent.load_text can read
+EVAL_FORMATS = ["txt", "json", "docx", "pdf"]
+
+
+def _redactor_detector(gliner_model=None, plan: dict = None) -> Callable[[str], List[dict]]:
+    redactor = RedactorAgent(gliner_model)
+    return lambda text: redactor.detect_sensitive_info(text, plan)
+
+
+# name -> factory(gliner_model, plan) returning detect(text) -> List[dict]
+CONFIGURATIONS = {
+    "regex": lambda gliner_model, plan: _redactor_detector(None, plan),
+    "gliner": lambda gliner_model, plan: _redactor_detector(gliner_model, plan),
+}
+
+
+def load_detector(spec: str, gliner_model=None):
+    """Resolve a configuration spec to (detect(text) callable, detection plan or None)"""
+    name, _, plan_regime = spec.partition("+plan:")
+    plan = build_detection_plan(plan_regime) if plan_regime else None
+    if name in CONFIGURATIONS:
+        factory = CONFIGURATIONS[name]
+    elif ":" in name:
+        module_name, attr = name.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), attr)
+    else:
+        raise ValueError(f"Unknown configuration: {spec}")
+    return factory(gliner_model, plan), plan
+
+
+def _key(item: dict) -> tuple:
+    return item["type"], item["value"].strip().lower()
+
+
+def score_document(detected: List[dict], truth: List[dict]) -> Dict[str, Counter]:
+    """Per-type tp/fp/fn counts for one document, matching values case-insensitively"""
+    detected_keys = {_key(item) for item in detected}
+    truth_keys = {_key(item) for item in truth}
+    counts = {}
+    for entity_type, _ in detected_keys | truth_keys:
+        counts.setdefault(entity_type, Counter())
+    for entity_type, _ in detected_keys & truth_keys:
+        counts[entity_type]["tp"] += 1
+    for entity_type, _ in detected_keys - truth_keys:
+        counts[entity_type]["fp"] += 1
+    for entity_type, _ in truth_keys - detected_keys:
+        counts[entity_type]["fn"] += 1
+    return counts
+
+
+def _prf(counts: Counter) -> dict:
+    tp, fp, fn = counts["tp"], counts["fp"], counts["fn"]
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"tp": tp, "fp": fp, "fn": fn,
+            "precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def evaluate(detect: Callable[[str], List[dict]], documents: List[dict], plan: dict = None) -> dict:
+    """Run detect over loaded documents ({"text", "entities"}); accuracy and throughput report"""
+    per_type = {}
+    latencies = []
+    for document in documents:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            detected = detect(document["text"])
+            latencies.append(time.perf_counter() - start)
+        truth = document["entities"]
+        if plan:
+            truth = [item for item in truth if item["type"] in plan["entity_types"]]
+        for entity_type, counts in score_document(detected, truth).items():
+            per_type.setdefault(entity_type, Counter()).update(counts)
+
+    overall = Counter()
+    for counts in per_type.values():
+        overall.update(counts)
+    latencies.sort()
+    total_seconds = sum(latencies)
+    return {
+        "documents": len(documents),
+        "overall": _prf(overall),
+        "per_type": {entity_type: _prf(per_type[entity_type]) for entity_type in sorted(per_type)},
+        "docs_per_second": round(len(documents) / total_seconds, 2) if total_seconds else None,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 3) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+    }
+
+
+def load_documents(corpus_dir: str, formats: List[str] = None) -> List[dict]:
+    """Extract text from each manifest document the runner can read"""
+    formats = formats or EVAL_FORMATS
+    runner = RunnerAgent()
+    documents = []
+    for entry in load_manifest(corpus_dir)["documents"]:
+        if entry["format"] not in formats:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            text = runner.load_text(os.path.join(corpus_dir, entry["path"]))
+        documents.append({"path": entry["path"], "format": entry["format"],
+                          "text": text, "entities": entry["entities"]})
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", nargs="+", default=["regex"], help="configurations to evaluate")
+    parser.add_argument("--corpus", help="existing corpus directory (default: generate one)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--docs-per-size", type=int, default=5)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--formats", nargs="+", choices=EVAL_FORMATS, default=["txt"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file instead of stdout")
+    args = parser.parse_args()
+
+    gliner_model = None
+    if any(spec.split("+")[0] != "regex" for spec in args.configs):
+        from app.utils.model_registry import get_registry
+        gliner_model = get_registry().get_gliner()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            corpus_dir = os.path.join(work_dir, "corpus")
+            generate_corpus(corpus_dir, args.sizes, args.formats, args.density,
+                            args.docs_per_size, args.seed)
+        documents = load_documents(corpus_dir, args.formats)
+
+    results = {
+        "benchmark": "evaluate",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "corpus": args.corpus or {"sizes": args.sizes, "docs_per_size": args.docs_per_size,
+                                  "density": args.density, "seed": args.seed},
+        "formats": args.formats,
+        "configs": {},
+    }
+    for spec in args.configs:
+        detect, plan = load_detector(spec, gliner_model)
+        results["configs"][spec] = evaluate(detect, documents, plan)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"📊 Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Load test: concurrent /redact/single uploads while polling /health.
+
+Start a service first (e.g. `uvicorn fast_api_test:app --port 8000` from Backend/, or
+test_11's `python main.py`), then run from Backend/:
+
+    python -m benchmarks.load_test_api --url http://localhost:8000 --concurrency 8 --duration 20
+
+With pipeline work off the event loop, /health latency should stay in the low
+milliseconds while uploads are in flight. Requires httpx.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+SAMPLE_LINE = "Contact John Smith at john.smith@example.com or 555-123-4567, SSN 123-45-6789.\n"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def upload_loop(client, url, payload, compliance_num, deadline, stats):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{url}/redact/single",
+                files={"file": ("load_test.txt", payload, "text/plain")},
+                data={"complianceNum": compliance_num},
+            )
+            code = str(response.status_code)
+        except httpx.HTTPError as e:
+            code = type(e).__name__
+        stats["upload_latencies"].append(time.perf_counter() - start)
+        stats["status_codes"][code] = stats["status_codes"].get(code, 0) + 1
+
+
+async def health_loop(client, url, interval, deadline, stats):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            await client.get(f"{url}/health")
+            stats["health_latencies"].append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            stats["health_failures"] += 1
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    payload = (SAMPLE_LINE * args.lines).encode("utf-8")
+    stats = {"upload_latencies": [], "health_latencies": [], "health_failures": 0, "status_codes": {}}
+    deadline = time.perf_counter() + args.duration
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        await asyncio.gather(
+            health_loop(client, args.url, args.health_interval, deadline, stats),
+            *(upload_loop(client, args.url, payload, args.compliance, deadline, stats)
+              for _ in range(args.concurrency)),
+        )
+
+    to_ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "concurrency": args.concurrency,
+        "payload_bytes": len(payload),
+        "uploads": len(stats["upload_latencies"]),
+        "uploads_per_sec": round(len(stats["upload_latencies"]) / args.duration, 2),
+        "status_codes": stats["status_codes"],
+        "upload_p50_ms": to_ms(percentile(stats["upload_latencies"], 50)),
+        "upload_p95_ms": to_ms(percentile(stats["upload_latencies"], 95)),
+        "health_checks": len(stats["health_latencies"]),
+        "health_failures": stats["health_failures"],
+        "health_p50_ms": to_ms(percentile(stats["health_latencies"], 50)),
+        "health_p95_ms": to_ms(percentile(stats["health_latencies"], 95)),
+        "health_max_ms": to_ms(max(stats["health_latencies"], default=None)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--lines", type=int, default=20000, help="sample lines per uploaded document")
+    parser.add_argument("--compliance", default="1")
+    parser.add_argument("--health-interval", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
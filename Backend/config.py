@@ -4,4 +4,74 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'a_default_secret_key'
     DEBUG = os.environ.get('DEBUG', 'False').lower() in ['true', '1']
     TESTING = os.environ.get('TESTING', 'False').lower() in ['true', '1']
-    # Add other configuration variables as needed, such as database URIs, etc.
\ No newline at end of file
+    # Add other configuration variables as needed, such as database URIs, etc.
+
+    # Asynchronous job API
+    JOBS_FOLDER = os.environ.get('JOBS_FOLDER', 'jobs')
+    JOBS_DB_PATH = os.environ.get('JOBS_DB_PATH', os.path.join(JOBS_FOLDER, 'jobs.db'))
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+
+    # Pipeline executor for the FastAPI service: "thread" or "process" for CPU stages
+    PIPELINE_EXECUTOR = os.environ.get('PIPELINE_EXECUTOR', 'thread')
+    PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', str(os.cpu_count() or 2)))
+    PIPELINE_IO_WORKERS = int(os.environ.get('PIPELINE_IO_WORKERS', '8'))
+    MAX_PENDING_REQUESTS = int(os.environ.get('MAX_PENDING_REQUESTS', '16'))
+
+
+    # Models are loaded once per process by app.utils.model_registry
+    GLINER_MODEL = os.environ.get('GLINER_MODEL', 'urchade/gliner_medium-v2.1')
+    LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.5-flash')
+    MODEL_WARMUP_ON_STARTUP = os.environ.get('MODEL_WARMUP_ON_STARTUP', 'True').lower() in ['true', '1']
+
+    # Audit records are appended to rotating JSON-lines segments by app.utils.audit_log
+    AUDIT_LOG_FOLDER = os.environ.get('AUDIT_LOG_FOLDER', 'audit_logs')
+    AUDIT_SEGMENT_MAX_BYTES = int(os.environ.get('AUDIT_SEGMENT_MAX_BYTES', str(64 * 1024 * 1024)))
+    AUDIT_FSYNC_POLICY = os.environ.get('AUDIT_FSYNC_POLICY', 'batch')  # record, batch or interval
+    AUDIT_FSYNC_INTERVAL = float(os.environ.get('AUDIT_FSYNC_INTERVAL', '1.0'))
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', '256'))
+    AUDIT_DB_PATH = os.environ.get('AUDIT_DB_PATH', os.path.join(AUDIT_LOG_FOLDER, 'audit_index.db'))
+
+    # Whole-document results are cached by app.utils.result_cache; bump PIPELINE_VERSION
+    # whenever detection or redaction output changes so older results are not served
+    PIPELINE_VERSION = os.environ.get('PIPELINE_VERSION', '2')
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'True').lower() in ['true', '1']
+    RESULT_CACHE_FOLDER = os.environ.get('RESULT_CACHE_FOLDER', 'result_cache')
+    RESULT_CACHE_TTL_SECONDS = float(os.environ.get('RESULT_CACHE_TTL_SECONDS', str(24 * 3600)))
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+    # Chunk state of the last revision per document id, for incremental re-redaction
+    REVISIONS_FOLDER = os.environ.get('REVISIONS_FOLDER', 'revisions')
+
+    # Uploads are spooled, hashed and sniffed in one pass by app.utils.ingest
+    MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(50 * 1024 * 1024)))
+    INGEST_CHUNK_BYTES = int(os.environ.get('INGEST_CHUNK_BYTES', str(1024 * 1024)))
+
+    # Archive uploads (POST /redact/archive, python -m app.utils.bulk)
+    BULK_WORKERS = int(os.environ.get('BULK_WORKERS', str(os.cpu_count() or 2)))
+    BULK_MAX_MEMBERS = int(os.environ.get('BULK_MAX_MEMBERS', '100000'))
+
+    # Memory-aware admission (app.utils.memory_budget): documents are admitted while their
+    # estimated peak memory fits the budget, then queue; 0 means half of physical memory
+    MEMORY_BUDGET_ENABLED = os.environ.get('MEMORY_BUDGET_ENABLED', 'True').lower() in ['true', '1']
+    MEMORY_BUDGET_BYTES = int(os.environ.get('MEMORY_BUDGET_BYTES', '0'))
+    MEMORY_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('MEMORY_QUEUE_TIMEOUT_SECONDS', '30'))
+    MEMORY_MAX_WAITING = int(os.environ.get('MEMORY_MAX_WAITING', '64'))
+    ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', '5'))
+
+    # Person-name allow/deny lists (app.utils.gazetteer), os.pathsep-separated text files with
+    # one entry per line; compiled once into a trie file under GAZETTEER_CACHE_DIR (a temp
+    # directory when none are set, since the built-in lists alone need no persistent cache)
+    NAME_ALLOWLIST_PATHS = os.environ.get('NAME_ALLOWLIST_PATHS', '')
+    NAME_DENYLIST_PATHS = os.environ.get('NAME_DENYLIST_PATHS', '')
+    NAME_DENY_TERM_PATHS = os.environ.get('NAME_DENY_TERM_PATHS', '')
+    GAZETTEER_CACHE_DIR = os.environ.get('GAZETTEER_CACHE_DIR', 'gazetteer_cache')
+    # Known-identifier dictionaries (app.utils.dictionary): "type<TAB>value" lines compiled into a
+    # shared memory-mapped automaton, recompiled and swapped in when the files change
+    DICTIONARY_PATHS = os.environ.get('DICTIONARY_PATHS', '')
+    DICTIONARY_CHECK_SECONDS = float(os.environ.get('DICTIONARY_CHECK_SECONDS', '30'))
+
+    # Regex detection of huge texts in shards across a process pool (app.utils.parallel_scan)
+    PARALLEL_SCAN_WORKERS = int(os.environ.get('PARALLEL_SCAN_WORKERS', str(os.cpu_count() or 1)))
+    PARALLEL_SCAN_MIN_CHARS = int(os.environ.get('PARALLEL_SCAN_MIN_CHARS', str(16 * 1024 * 1024)))
+    PARALLEL_SCAN_SHARD_CHARS = int(os.environ.get('PARALLEL_SCAN_SHARD_CHARS', str(4 * 1024 * 1024)))
+    PARALLEL_SCAN_OVERLAP_CHARS = int(os.environ.get('PARALLEL_SCAN_OVERLAP_CHARS', '4096'))
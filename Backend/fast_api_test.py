@@ -1,49 +1,82 @@
 import os
 import json
-import docx
-from PyPDF2 import PdfReader
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from docx import Document
 import re
 from typing import List
-import fitz
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
 import time
-from gliner import GLiNER
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
 import shutil
 import tempfile
+import zipfile
 from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool
 import uuid
 import uvicorn
+from contextlib import asynccontextmanager, AsyncExitStack, nullcontext
+from config import Config
+from app.utils.jobs import JobStore, JobWorkerPool, summarize_job
+from app.utils.executors import PipelineExecutor, AdmissionRejected
+from app.utils.memory_budget import estimate_cost, get_memory_budget
+from app.utils.zip_stream import astream_zip, stream_zip
+from app.utils.bulk import BulkRedactor, archive_kind, iter_members
+from app.utils.ingest import IngestError, aspool_upload, is_supported
+from app.utils.audit_log import get_audit_log, get_audit_store, audit_entry
+from app.utils.result_cache import cache_key, get_result_cache
+from app.agents.detectors import GLINER_LABELS, has_phone_digits
+from app.agents.entities import EntitySet, unique_items
+from app.agents.compliance_agent import build_detection_plan, format_verdict, verify_locally
+from app.utils.gazetteer import filter_person_names
+from app.utils.dictionary import get_dictionary, lists_version
+from app.utils.parallel_scan import scan_spans_parallel
+from app.utils.revisions import detect_incremental, get_revision_store, revision_key
+from app.utils.model_registry import ModelRegistry
+from app.utils.profiling import StageProfiler, profile_options
+from app.utils.metrics import (
+    LOAD_SECONDS, STAGE_SECONDS, DOCUMENTS, BYTES, ENTITIES, CACHE_HITS, ERRORS, CONTENT_TYPE, file_format,
+    render_metrics
+)
 
-app = FastAPI()
+job_store = None
+job_pool = None
+pipeline = None
 
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global job_store, job_pool, pipeline
+    pipeline = PipelineExecutor(
+        mode=Config.PIPELINE_EXECUTOR,
+        workers=Config.PIPELINE_WORKERS,
+        io_workers=Config.PIPELINE_IO_WORKERS,
+        max_pending=Config.MAX_PENDING_REQUESTS
+    )
+    job_store = JobStore(Config.JOBS_DB_PATH)
+    job_pool = JobWorkerPool(job_store, process_job_file, Config.JOBS_FOLDER, Config.JOB_WORKERS)
+    job_pool.start()
+    if Config.MODEL_WARMUP_ON_STARTUP:
+        models.start_warmup()
+    yield
+    job_pool.stop()
+    job_store.close()
+    pipeline.shutdown()
+    get_audit_log().close()
 
-try:
-    gliner = GLiNER.from_pretrained("./model/gliner_model")
-except Exception:
-    gliner = None
+app = FastAPI(lifespan=lifespan)
 
-try:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0,
-        google_api_key=GEMINI_API_KEY,
-        timeout=30
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
     )
-except Exception:
-    llm = None
+
+# Loaded lazily (or by the startup warmup) once per process, including pool workers
+models = ModelRegistry(gliner_model_name=os.getenv("GLINER_MODEL", "./model/gliner_model"))
 
 class RunnerAgent:
     def load_text(self, file_path: str) -> str:
         if file_path.endswith(".pdf"):
+            from PyPDF2 import PdfReader
             reader = PdfReader(file_path)
             text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
         elif file_path.endswith(".txt"):
@@ -54,6 +87,7 @@ class RunnerAgent:
                 self.json_data = json.load(f)
                 text = json.dumps(self.json_data, indent=2)
         elif file_path.endswith(".docx"):
+            import docx
             doc = docx.Document(file_path)
             text = "\n".join([para.text for para in doc.paragraphs])
         else:
@@ -86,11 +120,14 @@ class RunnerAgent:
                 with open(output_path, "w", encoding="utf-8") as f:
                     f.write(redacted_text)
         elif file_type == "docx":
+            from docx import Document
             doc = Document()
             for paragraph in redacted_text.split("\n"):
                 doc.add_paragraph(paragraph)
             doc.save(output_path)
         elif file_type == "pdf":
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.pagesizes import letter
             c = canvas.Canvas(output_path, pagesize=letter)
             lines = redacted_text.split("\n")
             width, height = letter
@@ -104,147 +141,86 @@ class RunnerAgent:
             c.save()
 
 class RedactorAgent:
-    def __init__(self):
-        self.name_exclusions = {
-            'united states', 'new york', 'los angeles', 'san francisco',
-            'machine learning', 'data science', 'artificial intelligence',
-            'google drive', 'microsoft office', 'adobe acrobat', 'dear sir',
-            'dear madam', 'yours truly', 'best regards', 'thank you',
-            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'
-        }
+    def __init__(self, gliner_model=None):
+        self.gliner = gliner_model
 
-    def detect_sensitive_info(self, text: str) -> List[dict]:
-        all_results = []
-        if gliner is not None:
+    def detect_sensitive_info(self, text: str, plan: dict = None) -> EntitySet:
+        entities = EntitySet(text)
+        labels = plan["gliner_labels"] if plan else GLINER_LABELS
+        if self.gliner is not None and labels:
             try:
-                gliner_results = self._detect_with_gliner(text)
-                all_results.extend(gliner_results)
+                with STAGE_SECONDS.time(stage="gliner"):
+                    gliner_results = self._detect_with_gliner(text, labels)
+                entities.merge(gliner_results.spread())
             except:
-                pass
-        regex_results = self._regex_fallback(text)
-        all_results.extend(regex_results)
-        unique_items = {}
-        for item in all_results:
-            key = f"{item['type']}_{item['value'].lower()}"
-            unique_items[key] = item
-        return list(unique_items.values())
-
-    def _detect_with_gliner(self, text: str) -> List[dict]:
-        labels = ["Person", "Organization", "Date", "Email", "Phone", "Location", "URL", "Money", "Time"]
+                ERRORS.inc(stage="gliner")
+        with STAGE_SECONDS.time(stage="regex"):
+            scan_spans_parallel(text, plan["regex_types"] if plan else None, entities)
+        if plan:
+            entities.keep_types(plan["entity_types"])
+        # Known identifiers are redacted whatever the regime
+        dictionary = get_dictionary()
+        if dictionary is not None:
+            try:
+                automaton = dictionary.get()
+                if automaton is not None:
+                    with STAGE_SECONDS.time(stage="dictionary"):
+                        automaton.scan(text, entities)
+            except Exception:
+                ERRORS.inc(stage="dictionary")
+        return entities.dedup()
+
+    def _detect_with_gliner(self, text: str, labels: List[str] = None) -> EntitySet:
+        labels = labels or GLINER_LABELS
+        results = EntitySet(text)
         try:
             text_chunk = text[:5000]
-            entities = gliner.predict_entities(text_chunk, labels=labels, threshold=0.4)
-            results = []
+            entities = self.gliner.predict_entities(text_chunk, labels=labels, threshold=0.4)
+            person_spans = []
             for ent in entities:
                 entity_type = ent["label"].lower()
-                entity_value = ent["text"].strip()
+                raw_value = text_chunk[ent["start"]:ent["end"]]
+                entity_value = raw_value.strip()
+                if not entity_value:
+                    continue
+                start = ent["start"] + len(raw_value) - len(raw_value.lstrip())
+                end = start + len(entity_value)
                 if entity_type == "person":
-                    if self._is_likely_person_name(entity_value):
-                        results.append({"type": "name", "value": entity_value})
+                    person_spans.append((start, end))
                 elif entity_type == "organization":
-                    results.append({"type": "organization", "value": entity_value})
-                elif entity_type in ["email", "phone", "url"]:
-                    results.append({"type": entity_type, "value": entity_value})
+                    results.add(start, end, "organization")
+                elif entity_type == "phone":
+                    if has_phone_digits(entity_value):
+                        results.add(start, end, "phone")
+                elif entity_type in ["email", "url"]:
+                    results.add(start, end, entity_type)
                 elif entity_type == "location":
-                    results.append({"type": "location", "value": entity_value})
+                    results.add(start, end, "location")
                 elif entity_type in ["date", "time"]:
-                    results.append({"type": "date", "value": entity_value})
+                    results.add(start, end, "date")
                 elif entity_type == "money":
-                    results.append({"type": "financial", "value": entity_value})
+                    results.add(start, end, "financial")
+            names = [text_chunk[start:end] for start, end in person_spans]
+            for (start, end), is_name in zip(person_spans, self._filter_person_names(names)):
+                if is_name:
+                    results.add(start, end, "name")
             return results
         except:
-            return []
+            return EntitySet(text)
 
-    def _regex_fallback(self, text: str) -> List[dict]:
-        patterns = {
-            "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            "phone": [
-                r'\b\d{3}-\d{3}-\d{4}\b',
-                r'\b\(\d{3}\)\s*\d{3}-\d{4}\b',
-                r'\b\d{10}\b',
-                r'\b\d{3}\.\d{3}\.\d{4}\b',
-                r'\+\d{1,3}[\s-]?\d{3,4}[\s-]?\d{3,4}[\s-]?\d{3,4}\b'
-            ],
-            "url": r'https?://[^\s<>"{}|\\^`\[\]]+',
-            "ssn": r'\b\d{3}-\d{2}-\d{4}\b',
-            "credit_card": r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b',
-            "ip_address": r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
-        }
-        found = []
-        emails = re.findall(patterns["email"], text, re.IGNORECASE)
-        for email in emails:
-            found.append({"type": "email", "value": email})
-        for pattern in patterns["phone"]:
-            phones = re.findall(pattern, text)
-            for phone in phones:
-                digits_only = re.sub(r'\D', '', phone)
-                if len(digits_only) >= 10:
-                    found.append({"type": "phone", "value": phone})
-        urls = re.findall(patterns["url"], text)
-        for url in urls:
-            found.append({"type": "url", "value": url})
-        ssns = re.findall(patterns["ssn"], text)
-        for ssn in ssns:
-            found.append({"type": "ssn", "value": ssn})
-        cards = re.findall(patterns["credit_card"], text)
-        for card in cards:
-            digits_only = re.sub(r'\D', '', card)
-            if len(digits_only) == 16:
-                found.append({"type": "credit_card", "value": card})
-        ips = re.findall(patterns["ip_address"], text)
-        for ip in ips:
-            octets = ip.split('.')
-            if all(0 <= int(octet) <= 255 for octet in octets):
-                found.append({"type": "ip_address", "value": ip})
-        return found
+    def _regex_fallback(self, text: str) -> EntitySet:
+        return scan_spans_parallel(text)
+
+    def _filter_person_names(self, names: List[str]) -> List[bool]:
+        return filter_person_names(names)
 
     def _is_likely_person_name(self, name: str) -> bool:
-        name_lower = name.lower()
-        if name_lower in self.name_exclusions:
-            return False
-        non_name_patterns = [
-            r'\b(mr|mrs|ms|dr|prof|sir|madam)\b',
-            r'\b(inc|llc|corp|ltd|co)\b',
-            r'\b(street|avenue|road|drive|lane)\b',
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\b'
-        ]
-        for pattern in non_name_patterns:
-            if re.search(pattern, name_lower):
-                return False
-        words = name.split()
-        if len(words) < 2 or len(words) > 4:
-            return False
-        if any(len(word) < 2 or len(word) > 20 for word in words):
-            return False
-        return True
-
-    def redact(self, text: str, sensitive_items: List[dict]) -> str:
-        redacted_text = text
-        sorted_items = sorted(sensitive_items, key=lambda x: len(x["value"]), reverse=True)
-        for item in sorted_items:
-            original_value = item["value"]
-            item_type = item["type"].upper()
-            redaction_tag = f"[REDACTED_{item_type}]"
-            if item["type"] in ["email", "url", "ssn", "credit_card", "ip_address"]:
-                pattern = re.escape(original_value)
-            elif item["type"] in ["name", "person", "organization", "location"]:
-                escaped_value = re.escape(original_value)
-                pattern = r'\b' + escaped_value + r'\b'
-            elif item["type"] == "phone":
-                clean_phone = re.sub(r'[\s\-\(\)]', '', original_value)
-                if len(clean_phone) >= 10:
-                    pattern = re.escape(original_value)
-                else:
-                    continue
-            else:
-                pattern = r'\b' + re.escape(original_value) + r'\b'
-            try:
-                redacted_text = re.sub(pattern, redaction_tag, redacted_text, flags=re.IGNORECASE)
-            except:
-                redacted_text = redacted_text.replace(original_value, redaction_tag)
-        return redacted_text
+        return self._filter_person_names([name])[0]
+
+    def redact(self, text: str, sensitive_items) -> str:
+        return EntitySet.from_items(text, sensitive_items).redact()
 
-    def redact_json(self, data: dict, sensitive_items: List[dict]) -> dict:
+    def redact_json(self, data: dict, sensitive_items) -> dict:
         redacted_data = json.dumps(data, indent=2)
         redacted_data = self.redact(redacted_data, sensitive_items)
         try:
@@ -252,9 +228,11 @@ class RedactorAgent:
         except json.JSONDecodeError:
             return {"redacted_content": redacted_data}
 
-    def redact_pdf_pymupdf(self, file_path: str, sensitive_items: List[dict], output_path: str):
+    def redact_pdf_pymupdf(self, file_path: str, sensitive_items, output_path: str):
         try:
+            import fitz  # PyMuPDF
             doc = fitz.open(file_path)
+            sensitive_items = unique_items(sensitive_items)
             for page_num in range(len(doc)):
                 page = doc[page_num]
                 for item in sensitive_items:
@@ -265,6 +243,7 @@ class RedactorAgent:
             doc.save(output_path)
             doc.close()
         except:
+            ERRORS.inc(stage="pdf_apply")
             try:
                 doc.close()
             except:
@@ -287,9 +266,12 @@ class PIIAgent:
         return matches
 
 class ComplianceAgent:
+    def __init__(self, llm=None):
+        self.llm = llm
+
     def apply_policy(self, pii_items: list, compliance_type: str) -> list:
         redactions = []
-        for item in pii_items:
+        for item in unique_items(pii_items):
             if compliance_type == "GDPR":
                 redactions.append(item["value"])
             elif compliance_type == "HIPAA":
@@ -301,8 +283,12 @@ class ComplianceAgent:
         return redactions
 
     def validate_redaction(self, redacted_text: str, compliance_type: str) -> str:
-        if llm is None:
-            return f"Compliance validation skipped - LLM not available. Processed with {compliance_type} standards."
+        # The local verifier settles most documents; only possible names left over need the LLM
+        verdict = verify_locally(redacted_text, compliance_type)
+        if verdict["status"] != "uncertain":
+            return format_verdict(verdict)
+        if self.llm is None:
+            return f"{format_verdict(verdict)} LLM not available. Processed with {compliance_type} standards."
         try:
             prompt = (
                 f"You are a compliance officer validating text redactions for {compliance_type}. "
@@ -313,19 +299,24 @@ class ComplianceAgent:
                 f"Return a brief assessment (2-3 sentences) of compliance status.\n\n"
                 f"Redacted Text:\n{redacted_text[:1000]}"
             )
-            result = llm.invoke(prompt)
+            result = self.llm.invoke(prompt)
             return result.content if hasattr(result, 'content') else str(result)
         except Exception as e:
-            return f"Compliance validation completed with basic standards. Error: {str(e)}"
+            ERRORS.inc(stage="llm_validate")
+            return f"{format_verdict(verdict)} Compliance validation completed with basic standards. Error: {str(e)}"
 
 class AuditAgent:
-    def log_metadata(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str) -> str:
+    def log_record(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str, profile: dict = None, compliance_type: str = None, processing_ms: float = None, incremental: dict = None) -> dict:
+        """Queue the metadata on the segmented audit log; returns it with its record_id"""
+        sensitive_items = unique_items(sensitive_items)
         item_counts = {}
         for item in sensitive_items:
             item_type = item['type']
             item_counts[item_type] = item_counts.get(item_type, 0) + 1
         metadata = {
             "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "logged_at": time.time(),
+            "compliance_type": compliance_type,
             "file_path": file_path,
             "file_size": os.path.getsize(file_path) if os.path.exists(file_path) else 0,
             "original_length": len(original_text),
@@ -339,53 +330,235 @@ class AuditAgent:
             "compliance_notes": str(compliance_feedback),
             "processing_status": "completed"
         }
-        os.makedirs("audit_logs", exist_ok=True)
-        log_file = f"audit_logs/audit_log_{os.path.basename(file_path)}_{int(time.time())}.json"
-        with open(log_file, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2)
-        return log_file
+        if processing_ms is not None:
+            metadata["processing_ms"] = round(processing_ms, 1)
+        if profile:
+            metadata["profile"] = profile
+        if incremental:
+            metadata["incremental"] = incremental
+        metadata["record_id"] = get_audit_log().append(metadata)
+        return metadata
+
+    def log_cached(self, summary: dict, file_path: str, processing_ms: float = None) -> dict:
+        """Audit a result served from the result cache: the cached summary, stamped for this request"""
+        metadata = dict(summary)
+        metadata.update({
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "logged_at": time.time(),
+            "file_path": file_path,
+            "cache_hit": True,
+        })
+        if processing_ms is not None:
+            metadata["processing_ms"] = round(processing_ms, 1)
+        metadata["record_id"] = get_audit_log().append(metadata)
+        return metadata
+
+def pipeline_version() -> str:
+    """Result cache version: the pipeline code plus the models and word lists the workers run with"""
+    gliner = "regex" if "gliner" in models.errors else models.gliner_model_name
+    return "/".join([Config.PIPELINE_VERSION, gliner, "llm" if os.getenv("GEMINI_API_KEY") else "no-llm", lists_version()])
 
 class CoordinatorAgent:
-    def __init__(self):
+    def __init__(self, gliner_model=None, llm=None):
         self.runner = RunnerAgent()
-        self.redactor = RedactorAgent()
-        self.compliance = ComplianceAgent()
+        self.redactor = RedactorAgent(gliner_model)
+        self.compliance = ComplianceAgent(llm)
         self.audit = AuditAgent()
 
-    async def handle_file(self, file: UploadFile, compliance_type: str, temp_dir: str) -> tuple:
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in [".pdf", ".txt", ".json", ".docx"]:
-            raise HTTPException(status_code=400, detail="Unsupported file type. Use PDF, TXT, JSON, or DOCX.")
-        
-        temp_file_path = os.path.join(temp_dir, f"{uuid.uuid4()}{file_ext}")
-        with open(temp_file_path, "wb") as f:
-            f.write(await file.read())
+    async def handle_file(self, file: UploadFile, compliance_type: str, temp_dir: str, profile: dict = None,
+                          document_id: str = None) -> tuple:
+        # Streamed to disk in chunks, hashed and format-checked on the way
+        try:
+            upload = await aspool_upload(file, temp_dir, Config.MAX_UPLOAD_BYTES, Config.INGEST_CHUNK_BYTES)
+        except IngestError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        temp_file_path = upload["path"]
         
         try:
-            original_text = self.runner.load_text(temp_file_path)
-            pii_items = self.redactor.detect_sensitive_info(original_text)
-            if not pii_items:
-                return None, None, file.filename
-            
-            redacted_text = self.redactor.redact(original_text, pii_items)
-            output_path = os.path.join(temp_dir, f"{uuid.uuid4()}_redacted{file_ext}")
-            if file_ext == ".pdf":
-                self.redactor.redact_pdf_pymupdf(temp_file_path, pii_items, output_path)
-            else:
-                self.runner.save_redacted_text(redacted_text, temp_file_path, output_path)
-            
-            feedback = self.compliance.validate_redaction(redacted_text, compliance_type)
-            audit_path = self.audit.log_metadata(original_text, redacted_text, pii_items, feedback, temp_file_path)
-            return output_path, audit_path, file.filename
+            cache = get_result_cache()
+            # Profiled requests always run the pipeline, since there is nothing to profile in a hit,
+            # and so do revisions, whose state must advance and whose audit reports the chunk work
+            if cache is None or profile or document_id:
+                result = await self._run_pipeline(temp_file_path, compliance_type, temp_dir, profile, document_id)
+                return result + (file.filename,)
+            started = time.perf_counter()
+            # Off the event loop: the version maps (or first compiles) the word lists
+            key = cache_key(upload["sha256"], compliance_type, await pipeline.run_io(pipeline_version))
+            # Identical uploads in flight wait for the first one's result instead of recomputing it
+            async with cache.async_flight(key):
+                entry = await pipeline.run_io(cache.get, key)
+                if entry is None:
+                    result = await self._run_pipeline(temp_file_path, compliance_type, temp_dir, profile, document_id)
+                    try:
+                        await pipeline.run_io(cache.put, key, *result)
+                    except OSError as e:
+                        ERRORS.inc(stage="result_cache")
+                        print(f"⚠️ Could not cache result: {e}")
+                    return result + (file.filename,)
+            output_path, audit_record = await pipeline.run_io(
+                self.from_cache, cache, entry, temp_file_path, temp_dir, started
+            )
+            return output_path, audit_record, file.filename
         finally:
             if os.path.exists(temp_file_path):
                 os.remove(temp_file_path)
 
-class SingleFileRequest(BaseModel):
-    complianceNum: str
+    async def _run_pipeline(self, file_path: str, compliance_type: str, temp_dir: str, profile: dict = None,
+                            document_id: str = None) -> tuple:
+        # Queued (or refused with a 503) until the document's estimated memory fits the budget
+        memory = get_memory_budget()
+        admission = nullcontext() if memory is None else memory.areserve(await pipeline.run_io(estimate_cost, file_path))
+        async with admission:
+            # Parsing, NER and redaction hold the CPU; the LLM check only waits on the network
+            redaction = await pipeline.run_cpu(redact_file_path, file_path, temp_dir, profile, compliance_type, document_id)
+            if redaction is None:
+                return None, None
+            audit_record = await pipeline.run_io(finalize_file, redaction, compliance_type, file_path, profile)
+        return redaction["output_path"], audit_record
+
+    def from_cache(self, cache, entry: dict, file_path: str, output_dir: str, started: float) -> tuple:
+        """Serve a cached result: a private copy of the artifact and a fresh audit record"""
+        CACHE_HITS.inc(cache="result")
+        DOCUMENTS.inc(format=file_format(file_path), status="cached")
+        output_path = cache.materialize(entry, output_dir)
+        if output_path is None:
+            return None, None
+        with STAGE_SECONDS.time(stage="audit_write"):
+            audit_record = self.audit.log_cached(
+                entry["audit"], file_path, processing_ms=(time.perf_counter() - started) * 1000
+            )
+        return output_path, audit_record
+
+    def redact_path(self, file_path: str, output_dir: str, profile: dict = None, compliance_type: str = None,
+                    document_id: str = None) -> dict:
+        """CPU stage: load, detect and write the redacted file; None when nothing was found.
+
+        Only the detectors the compliance regime needs are run. With a document_id, detection only
+        runs on the chunks changed since that document's last revision.
+        """
+        file_fmt = file_format(file_path)
+        profiler = StageProfiler(**(profile or {}))
+        started_at = time.time()
+        try:
+            plan = build_detection_plan(compliance_type) if compliance_type else None
+            revision = revision_key(document_id, compliance_type, pipeline_version()) if document_id else None
+            redaction = self._redact_stages(file_path, output_dir, profiler, revision, plan)
+        except Exception:
+            ERRORS.inc(stage="pipeline")
+            DOCUMENTS.inc(format=file_fmt, status="error")
+            raise
+        DOCUMENTS.inc(format=file_fmt, status="redacted" if redaction else "no_pii")
+        BYTES.inc(os.path.getsize(file_path), format=file_fmt)
+        if redaction:
+            # Wall-clock, since finalize may run in another process than the CPU stage
+            redaction["started_at"] = started_at
+        return redaction
+
+    def _redact_stages(self, file_path: str, output_dir: str, profiler: StageProfiler, revision: str = None,
+                       plan: dict = None) -> dict:
+        file_ext = os.path.splitext(file_path)[1].lower()
+        with LOAD_SECONDS.time(format=file_format(file_path)), profiler.stage("load"):
+            original_text = self.runner.load_text(file_path)
+        incremental = None
+        with profiler.stage("detect"):
+            if revision:
+                # The store is file-based, so process-pool workers share revisions
+                store = get_revision_store()
+                pii_items, state, incremental = detect_incremental(
+                    lambda chunk: self.redactor.detect_sensitive_info(chunk, plan), original_text, store.get(revision)
+                )
+                store.put(revision, state)
+            else:
+                pii_items = self.redactor.detect_sensitive_info(original_text, plan)
+        for item in unique_items(pii_items):
+            ENTITIES.inc(type=item["type"])
+        if not pii_items:
+            return None
+        
+        with STAGE_SECONDS.time(stage="redact"), profiler.stage("redact"):
+            redacted_text = self.redactor.redact(original_text, pii_items)
+        output_path = os.path.join(output_dir, f"{uuid.uuid4()}_redacted{file_ext}")
+        if file_ext == ".pdf":
+            with STAGE_SECONDS.time(stage="pdf_apply"), profiler.stage("pdf_apply"):
+                self.redactor.redact_pdf_pymupdf(file_path, pii_items, output_path)
+        else:
+            with profiler.stage("save"):
+                self.runner.save_redacted_text(redacted_text, file_path, output_path)
+        return {
+            "output_path": output_path,
+            "original_text": original_text,
+            "redacted_text": redacted_text,
+            "pii_items": pii_items,
+            "profile_stages": profiler.stages,
+            "incremental": incremental
+        }
+
+    def finalize(self, redaction: dict, compliance_type: str, file_path: str, profile: dict = None) -> dict:
+        """I/O stage: compliance validation and audit log; returns the audit record"""
+        profiler = StageProfiler(**(profile or {}), stages=redaction.get("profile_stages"))
+        with STAGE_SECONDS.time(stage="llm_validate"), profiler.stage("llm_validate"):
+            feedback = self.compliance.validate_redaction(redaction["redacted_text"], compliance_type)
+        with STAGE_SECONDS.time(stage="audit_write"):
+            return self.audit.log_record(
+                redaction["original_text"], redaction["redacted_text"], redaction["pii_items"], feedback, file_path,
+                profile=profiler.report(), compliance_type=compliance_type,
+                processing_ms=(time.time() - redaction["started_at"]) * 1000 if "started_at" in redaction else None,
+                incremental=redaction.get("incremental")
+            )
+
+    def process_record(self, file_path: str, compliance_type: str, output_dir: str) -> tuple:
+        """Run the pipeline on a file already on disk; returns (output_path, audit_record).
+
+        Used by background jobs, which wait for memory rather than fail.
+        """
+        memory = get_memory_budget()
+        with nullcontext() if memory is None else memory.reserve(estimate_cost(file_path), float("inf")):
+            redaction = self.redact_path(file_path, output_dir, compliance_type=compliance_type)
+            if redaction is None:
+                return None, None
+            return redaction["output_path"], self.finalize(redaction, compliance_type, file_path)
+
+    def process_path(self, file_path: str, compliance_type: str, output_dir: str) -> tuple:
+        """Run the pipeline on a file already on disk; returns (output_path, audit_path)"""
+        output_path, audit_record = self.process_record(file_path, compliance_type, output_dir)
+        if output_path is None:
+            return None, None
+        # The job's result ZIP bundles a copy of the record next to the redacted file
+        audit_name, audit_bytes = audit_entry(audit_record)
+        audit_path = os.path.join(output_dir, os.path.basename(audit_name))
+        with open(audit_path, "wb") as f:
+            f.write(audit_bytes)
+        return output_path, audit_path
+
+_coordinator = None
+
+def get_coordinator() -> CoordinatorAgent:
+    """Per-process coordinator sharing the registry's models; the agents hold no request state"""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = CoordinatorAgent(models.get_gliner(), models.get_llm())
+    return _coordinator
+
+# Module-level so they can be pickled into a process pool
+def redact_file_path(file_path: str, output_dir: str, profile: dict = None, compliance_type: str = None,
+                     document_id: str = None) -> dict:
+    return get_coordinator().redact_path(file_path, output_dir, profile, compliance_type, document_id)
+
+def finalize_file(redaction: dict, compliance_type: str, file_path: str, profile: dict = None) -> dict:
+    return get_coordinator().finalize(redaction, compliance_type, file_path, profile)
+
+def process_job_file(file_path: str, compliance_type: str, work_dir: str) -> tuple:
+    return get_coordinator().process_path(file_path, compliance_type, work_dir)
 
-class MultipleFileRequest(BaseModel):
-    complianceNum: str
+def redact_member(file_path: str, compliance_type: str, output_dir: str) -> tuple:
+    """Archive member, called on a BulkRedactor thread: the pipeline pools' CPU then I/O stage, as for
+    uploads, after waiting for memory rather than failing; returns (output_path, audit_record)"""
+    memory = get_memory_budget()
+    with nullcontext() if memory is None else memory.reserve(estimate_cost(file_path), float("inf")):
+        redaction = pipeline.submit_cpu(redact_file_path, file_path, output_dir, None, compliance_type).result()
+        if redaction is None:
+            return None, None
+        return redaction["output_path"], pipeline.submit_io(finalize_file, redaction, compliance_type, file_path).result()
 
 def cleanup_files(*file_paths):
     for file_path in file_paths:
@@ -395,66 +568,237 @@ def cleanup_files(*file_paths):
             except:
                 pass
 
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "models": models.status(),
+        "pipeline": pipeline.stats() if pipeline else None,
+        "memory": get_memory_budget().stats() if get_memory_budget() else None,
+        "dictionary": get_dictionary().status() if get_dictionary() else None
+    }
+
+@app.post("/dictionary/reload")
+async def dictionary_reload():
+    """Recompile the known-identifier dictionaries if their files changed and swap them in.
+
+    In process-executor mode the pool workers pick the new file up on their next check.
+    """
+    dictionary = get_dictionary()
+    if dictionary is None:
+        raise HTTPException(status_code=404, detail="No dictionaries configured (DICTIONARY_PATHS)")
+    reloaded = await pipeline.run_io(dictionary.reload)
+    status = dictionary.status()
+    return JSONResponse(status_code=500 if status["error"] else 200, content={"reloaded": reloaded, **status})
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint; in process-executor mode it only sees this process's stages"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+@app.get("/ready")
+async def readiness_check():
+    status = models.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/audit/query")
+async def audit_query(since: str = None, until: str = None, compliance_type: str = None,
+                      entity_type: str = None, status: str = None, group_by: str = None, limit: int = 50):
+    """Filter and aggregate audit records from the indexed audit store"""
+    try:
+        return get_audit_store().query(since, until, compliance_type, entity_type, status, group_by, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/audit/rollups")
+async def audit_rollups(since: str = None, until: str = None, bucket: str = "day",
+                        compliance_type: str = None, file_type: str = None):
+    """Dashboard rollups maintained as audit records are written"""
+    try:
+        return get_audit_store().rollups(since, until, bucket, compliance_type, file_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/audit/records/{record_id}")
+async def audit_record(record_id: str):
+    record = get_audit_store().get_record(record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Audit record not found")
+    return record
+
 @app.post("/redact/single")
-async def redact_single_file(file: UploadFile = File(...), request: SingleFileRequest = None):
-    print(f"Received request: {request}")
+async def redact_single_file(file: UploadFile = File(...), complianceNum: str = Form(...),
+                             profile: str = Form(None), profileTop: str = Form(None), documentId: str = Form(None)):
     compliance_map = {"1": "GDPR", "2": "HIPAA", "3": "DPDP"}
-    compliance_type = compliance_map.get(request.complianceNum)
+    compliance_type = compliance_map.get(complianceNum)
     if not compliance_type:
         raise HTTPException(status_code=400, detail="Invalid compliance number. Use 1 (GDPR), 2 (HIPAA), or 3 (DPDP).")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
+    # Admission and the temp dir are held until the response has been sent
+    stack = AsyncExitStack()
+    await stack.enter_async_context(pipeline.admit())
+    try:
+        temp_dir = stack.enter_context(tempfile.TemporaryDirectory())
         coordinator = CoordinatorAgent()
-        output_path, audit_path, _ = await coordinator.handle_file(file, compliance_type, temp_dir)
-        
-        if not output_path:
-            return {"message": "No sensitive information detected", "audit_log": None}
-        
-        return FileResponse(
-            path=output_path,
-            filename=os.path.basename(output_path),
-            background=BackgroundTask(cleanup_files, output_path, audit_path),
-            headers={"X-Audit-Log": audit_path}
+        output_path, audit_record, _ = await coordinator.handle_file(
+            file, compliance_type, temp_dir, profile_options(profile, profileTop), documentId
         )
+    except BaseException:
+        await stack.aclose()
+        raise
+    
+    if not output_path:
+        await stack.aclose()
+        return {"message": "No sensitive information detected", "audit_log": None}
+    
+    return FileResponse(
+        path=output_path,
+        filename=os.path.basename(output_path),
+        background=BackgroundTask(stack.aclose),
+        headers={"X-Audit-Log": audit_record["record_id"]}
+    )
 
 @app.post("/redact/multiple")
-async def redact_multiple_files(files: List[UploadFile] = File(...), request: MultipleFileRequest = None):
+async def redact_multiple_files(files: List[UploadFile] = File(...), complianceNum: str = Form(...),
+                                profile: str = Form(None), profileTop: str = Form(None)):
     compliance_map = {"1": "GDPR", "2": "HIPAA", "3": "DPDP"}
-    compliance_type = compliance_map.get(request.complianceNum)
+    compliance_type = compliance_map.get(complianceNum)
     if not compliance_type:
         raise HTTPException(status_code=400, detail="Invalid compliance number. Use 1 (GDPR), 2 (HIPAA), or 3 (DPDP).")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        coordinator = CoordinatorAgent()
-        results = []
-        files_to_cleanup = []
-        
+    stack = AsyncExitStack()
+    await stack.enter_async_context(pipeline.admit())
+    temp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+    coordinator = CoordinatorAgent()
+    profile_opts = profile_options(profile, profileTop)
+
+    async def redacted_entries():
+        """Each file is zipped into the response as soon as it finishes, then removed"""
         for file in files:
-            output_path, audit_path, filename = await coordinator.handle_file(file, compliance_type, temp_dir)
+            output_path, audit_record, _ = await coordinator.handle_file(file, compliance_type, temp_dir, profile_opts)
             if output_path:
-                results.append({
-                    "filename": filename,
-                    "redacted_file": os.path.basename(output_path),
-                    "audit_log": os.path.basename(audit_path)
-                })
-                files_to_cleanup.extend([output_path, audit_path])
-        
-        if not results:
-            return {"message": "No sensitive information detected in any files", "files": []}
-        
-        # Create a zip file containing all redacted files and audit logs
-        zip_path = os.path.join(temp_dir, f"redacted_files_{int(time.time())}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for result in results:
-                zipf.write(result["redacted_file"], f"redacted/{result['redacted_file']}")
-                zipf.write(result["audit_log"], f"audit_logs/{result['audit_log']}")
-        
-        return FileResponse(
-            path=zip_path,
-            filename=os.path.basename(zip_path),
-            background=BackgroundTask(cleanup_files, zip_path, *files_to_cleanup),
-            headers={"Content-Disposition": f"attachment; filename={os.path.basename(zip_path)}"}
-        )
-    
+                yield f"redacted/{os.path.basename(output_path)}", output_path
+                yield audit_entry(audit_record)
+                cleanup_files(output_path)
+
+    # Run until the first redacted file so an all-clean batch still gets a JSON answer
+    entries = redacted_entries()
+    try:
+        first = await anext(entries, None)
+    except BaseException:
+        await stack.aclose()
+        raise
+    if first is None:
+        await stack.aclose()
+        return {"message": "No sensitive information detected in any files", "files": []}
+
+    async def chained_entries():
+        yield first
+        async for entry in entries:
+            yield entry
+
+    async def body():
+        try:
+            async for chunk in astream_zip(chained_entries()):
+                yield chunk
+        finally:
+            await entries.aclose()
+            await stack.aclose()
+
+    zip_name = f"redacted_files_{int(time.time())}.zip"
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={zip_name}"}
+    )
+
+@app.post("/redact/archive")
+async def redact_archive(archive: UploadFile = File(...), complianceNum: str = Form(...)):
+    """Redact every document in a ZIP or TAR upload; streams back a ZIP of outputs plus audit_manifest.json"""
+    compliance_map = {"1": "GDPR", "2": "HIPAA", "3": "DPDP"}
+    compliance_type = compliance_map.get(complianceNum)
+    if not compliance_type:
+        raise HTTPException(status_code=400, detail="Invalid compliance number. Use 1 (GDPR), 2 (HIPAA), or 3 (DPDP).")
+    kind = archive_kind(archive.filename)
+    if kind is None:
+        raise HTTPException(status_code=400, detail="Unsupported archive type. Use ZIP or TAR (.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz).")
+    if kind == "zip":
+        valid = zipfile.is_zipfile(archive.file)
+        archive.file.seek(0)
+        if not valid:
+            raise HTTPException(status_code=400, detail="Invalid ZIP archive")
+
+    stack = AsyncExitStack()
+    await stack.enter_async_context(pipeline.admit())
+    temp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+    # Members go through the pipeline pools, which build the coordinator (and load models) off the loop
+    bulk = BulkRedactor(
+        lambda path, digest: redact_member(path, compliance_type, temp_dir),
+        temp_dir, Config.BULK_WORKERS, Config.MAX_UPLOAD_BYTES, Config.BULK_MAX_MEMBERS
+    )
+    info = {"archive": archive.filename, "compliance_type": compliance_type}
+    # Extraction and zipping block, so the archive is walked on a worker thread
+    chunks = stream_zip(bulk.run(iter_members(archive.file, kind), info))
+
+    async def body():
+        try:
+            async for chunk in iterate_in_threadpool(chunks):
+                yield chunk
+        finally:
+            try:
+                chunks.close()
+            except ValueError:
+                pass  # still running on the worker thread after a disconnect; closed once collected
+            await stack.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=redacted_archive.zip"}
+    )
+
+@app.post("/jobs", status_code=202)
+async def create_job(files: List[UploadFile] = File(...), complianceNum: str = Form(...)):
+    compliance_map = {"1": "GDPR", "2": "HIPAA", "3": "DPDP"}
+    compliance_type = compliance_map.get(complianceNum)
+    if not compliance_type:
+        raise HTTPException(status_code=400, detail="Invalid compliance number. Use 1 (GDPR), 2 (HIPAA), or 3 (DPDP).")
+    for file in files:
+        if not is_supported(file.filename):
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file.filename}. Use PDF, TXT, JSON, or DOCX.")
+
+    job_id = str(uuid.uuid4())
+    job_dir = job_pool.job_dir(job_id)
+    saved = []
+    for file in files:
+        try:
+            upload = await aspool_upload(file, job_dir, Config.MAX_UPLOAD_BYTES, Config.INGEST_CHUNK_BYTES)
+        except IngestError as e:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise HTTPException(status_code=e.status_code, detail=f"{file.filename}: {e}")
+        saved.append((file.filename, upload["path"]))
+
+    job_store.create_job(job_id, compliance_type, saved)
+    job_pool.submit(job_id)
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    summary = summarize_job(job)
+    summary["download_url"] = f"/jobs/{job_id}/download" if job["result_path"] else None
+    return summary
+
+@app.get("/jobs/{job_id}/download")
+async def download_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed" or not job["result_path"] or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=409, detail=f"Job result not available (status: {job['status']})")
+    return FileResponse(path=job["result_path"], filename=f"redacted_job_{job_id}.zip", media_type="application/zip")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,39 +1,242 @@
 import os
+import time
+import shutil
 import tempfile
 import uuid
+import itertools
 import zipfile
-import io
-from flask import Blueprint, request, send_file, jsonify
+from contextlib import nullcontext
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 from app.agents.runner_agent import RunnerAgent
 from app.agents.redactor_agent import RedactorAgent
 from app.agents.compliance_agent import ComplianceAgent
 from app.agents.audit_agent import AuditAgent
+from app.agents.entities import unique_items
+from app.utils.zip_stream import stream_zip
+from app.utils.ingest import IngestError, is_supported, spool_stream
+from app.utils.bulk import BulkRedactor, archive_kind, iter_members
+from app.utils.audit_log import audit_entry, get_audit_store
+from app.utils.result_cache import ResultCache, cache_key, file_digest, get_result_cache
+from app.utils.revisions import RevisionStore, detect_incremental, get_revision_store, revision_key
+from app.utils.model_registry import get_registry
+from app.utils.executors import AdmissionRejected
+from app.utils.memory_budget import MemoryBudget, estimate_cost, get_memory_budget
+from app.utils.dictionary import get_dictionary, lists_version
+from app.utils.profiling import StageProfiler, profile_options
+from app.utils.metrics import (
+    LOAD_SECONDS, STAGE_SECONDS, DOCUMENTS, BYTES, ENTITIES, CACHE_HITS, ERRORS, CONTENT_TYPE, file_format,
+    render_metrics
+)
+from config import Config
 
 bp = Blueprint('redact', __name__)
 
+def build_coordinator():
+    """Coordinator wired to the process-wide models, so no request reloads them"""
+    registry = get_registry()
+    return CoordinatorAgent(registry.get_gliner(), registry.get_llm(), get_result_cache(), memory=get_memory_budget())
+
 class CoordinatorAgent:
-    def __init__(self):
+    def __init__(self, gliner_model=None, llm=None, cache: ResultCache = None, revisions: RevisionStore = None,
+                 memory: MemoryBudget = None):
         self.runner = RunnerAgent()
-        self.redactor = RedactorAgent()
-        self.compliance = ComplianceAgent()
+        self.redactor = RedactorAgent(gliner_model)
+        self.compliance = ComplianceAgent(llm)
         self.audit = AuditAgent()
+        self.cache = cache
+        # Previous revisions' chunk state; the process-wide store unless one is injected
+        self.revisions = revisions
+        # Pipeline runs are admitted against the memory budget; None waits the budget's default
+        # timeout before a 503, float("inf") makes batch callers wait for as long as it takes
+        self.memory = memory
+        self.admission_timeout = None
+        # Results also differ with the models in play, so they are part of the cache key
+        self._pipeline_version = "/".join([
+            Config.PIPELINE_VERSION,
+            "gliner" if gliner_model is not None else "regex",
+            "llm" if llm is not None else "no-llm",
+        ])
+
+    @property
+    def pipeline_version(self):
+        """Cache and revision version: pipeline code, models, and the word lists in force right now"""
+        return f"{self._pipeline_version}/{lists_version(self.redactor.gazetteer, self.redactor.dictionary)}"
+
+    def handle_file(self, file_path, compliance_type, temp_dir, profile=None, document_id=None, content_digest=None):
+        """Redact one file; profile holds StageProfiler options when the request asked for a profile.
+
+        With a document_id the file is treated as a revision of that document, and detection
+        only runs on the chunks that changed since the previous revision. content_digest is
+        the file's SHA-256 when ingest already computed it.
+
+        With a result cache, a file already redacted under this compliance type and pipeline
+        version is served from the cache, and concurrent identical uploads are computed once.
+        Profiled requests always run the pipeline, since there is nothing to profile in a hit,
+        and so do revisions, whose state must advance and whose audit record reports the chunk work.
+        """
+        if self.cache is None or profile or document_id:
+            return self._handle_uncached(file_path, compliance_type, temp_dir, profile, document_id)
+        started = time.perf_counter()
+        key = cache_key(content_digest or file_digest(file_path), compliance_type, self.pipeline_version)
+        with self.cache.flight(key):
+            entry = self.cache.get(key)
+            if entry is None:
+                result = self._handle_uncached(file_path, compliance_type, temp_dir, profile, document_id)
+                try:
+                    self.cache.put(key, *result)
+                except OSError as e:
+                    ERRORS.inc(stage="result_cache")
+                    print(f"⚠️ Could not cache result: {e}")
+                return result
+        return self._from_cache(entry, file_path, temp_dir, started)
+
+    def _from_cache(self, entry, file_path, temp_dir, started):
+        CACHE_HITS.inc(cache="result")
+        DOCUMENTS.inc(format=file_format(file_path), status="cached")
+        output_path = self.cache.materialize(entry, temp_dir)
+        if output_path is None:
+            return None, None
+        with STAGE_SECONDS.time(stage="audit_write"):
+            audit_record = self.audit.log_cached(
+                entry["audit"], file_path, processing_ms=(time.perf_counter() - started) * 1000
+            )
+        return output_path, audit_record
+
+    def _handle_uncached(self, file_path, compliance_type, temp_dir, profile=None, document_id=None):
+        file_fmt = file_format(file_path)
+        profiler = StageProfiler(**(profile or {}))
+        try:
+            with self._admit(file_path):
+                result = self._run_stages(file_path, compliance_type, temp_dir, file_fmt, profiler, document_id)
+        except AdmissionRejected:
+            raise
+        except Exception:
+            ERRORS.inc(stage="pipeline")
+            DOCUMENTS.inc(format=file_fmt, status="error")
+            raise
+        DOCUMENTS.inc(format=file_fmt, status="redacted" if result[0] else "no_pii")
+        BYTES.inc(os.path.getsize(file_path), format=file_fmt)
+        return result
 
-    def handle_file(self, file_path, compliance_type, temp_dir):
-        original_text = self.runner.load_text(file_path)
-        pii_items = self.redactor.detect_sensitive_info(original_text)
+    def _admit(self, file_path):
+        """Hold the file's estimated memory cost in the budget while its pipeline runs"""
+        if self.memory is None:
+            return nullcontext()
+        return self.memory.reserve(estimate_cost(file_path), self.admission_timeout)
+
+    def _detect_revision(self, text, plan, compliance_type, document_id):
+        """Detect over the chunks changed since the document's last revision; returns (entities, work report)"""
+        store = self.revisions or get_revision_store()
+        key = revision_key(document_id, compliance_type, self.pipeline_version)
+        pii_items, state, report = detect_incremental(
+            lambda chunk: self.redactor.detect_sensitive_info(chunk, plan), text, store.get(key)
+        )
+        store.put(key, state)
+        return pii_items, report
+
+    def _run_stages(self, file_path, compliance_type, temp_dir, file_fmt, profiler, document_id=None):
+        started = time.perf_counter()
+        with LOAD_SECONDS.time(format=file_fmt), profiler.stage("load"):
+            original_text = self.runner.load_text(file_path)
+        plan = self.compliance.plan_detection(compliance_type)
+        with profiler.stage("detect"):
+            if document_id:
+                pii_items, incremental = self._detect_revision(original_text, plan, compliance_type, document_id)
+            else:
+                pii_items, incremental = self.redactor.detect_sensitive_info(original_text, plan), None
+        for item in unique_items(pii_items):
+            ENTITIES.inc(type=item["type"])
         if not pii_items:
             return None, None
-        redacted_text = self.redactor.redact(original_text, pii_items)
+        with STAGE_SECONDS.time(stage="redact"), profiler.stage("redact"):
+            redacted_text = self.redactor.redact(original_text, pii_items)
         file_ext = os.path.splitext(file_path)[1]
         output_path = os.path.join(temp_dir, f"{uuid.uuid4()}_redacted{file_ext}")
         if file_ext == ".pdf":
-            self.redactor.redact_pdf_pymupdf(file_path, pii_items, output_path)
+            with STAGE_SECONDS.time(stage="pdf_apply"), profiler.stage("pdf_apply"):
+                self.redactor.redact_pdf_pymupdf(file_path, pii_items, output_path)
         else:
-            self.runner.save_redacted_text(redacted_text, file_path, output_path)
-        feedback = self.compliance.validate_redaction(redacted_text, compliance_type)
-        audit_path = self.audit.log_metadata(original_text, redacted_text, pii_items, feedback, file_path)
-        return output_path, audit_path
+            with profiler.stage("save"):
+                self.runner.save_redacted_text(redacted_text, file_path, output_path)
+        with STAGE_SECONDS.time(stage="llm_validate"), profiler.stage("llm_validate"):
+            feedback = self.compliance.validate_redaction(redacted_text, compliance_type)
+        with STAGE_SECONDS.time(stage="audit_write"):
+            audit_record = self.audit.log_record(
+                original_text, redacted_text, pii_items, feedback, file_path,
+                profile=profiler.report(), compliance_type=compliance_type,
+                processing_ms=(time.perf_counter() - started) * 1000, incremental=incremental
+            )
+        return output_path, audit_record
+
+@bp.app_errorhandler(AdmissionRejected)
+def admission_rejected(e):
+    response = jsonify({"error": str(e)})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 503
+
+@bp.route('/health', methods=['GET'])
+def health():
+    """Liveness plus memory admission: reserved budget next to actual resident memory"""
+    memory = get_memory_budget()
+    dictionary = get_dictionary()
+    return jsonify({"status": "healthy", "memory": memory.stats() if memory else None,
+                    "dictionary": dictionary.status() if dictionary else None})
+
+@bp.route('/dictionary/reload', methods=['POST'])
+def dictionary_reload():
+    """Recompile the known-identifier dictionaries if their files changed and swap them in"""
+    dictionary = get_dictionary()
+    if dictionary is None:
+        return jsonify({"error": "No dictionaries configured (DICTIONARY_PATHS)"}), 404
+    reloaded = dictionary.reload()
+    status = dictionary.status()
+    return jsonify({"reloaded": reloaded, **status}), (500 if status["error"] else 200)
+
+@bp.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once the models are loaded and warmed up"""
+    status = get_registry().status()
+    return jsonify(status), (200 if status["ready"] else 503)
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+@bp.route('/audit/query', methods=['GET'])
+def audit_query():
+    """Filter and aggregate audit records: since, until, compliance_type, entity_type, status, group_by, limit"""
+    args = request.args
+    try:
+        result = get_audit_store().query(
+            since=args.get('since'), until=args.get('until'),
+            compliance_type=args.get('compliance_type'), entity_type=args.get('entity_type'),
+            status=args.get('status'), group_by=args.get('group_by'), limit=args.get('limit', 50)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+@bp.route('/audit/rollups', methods=['GET'])
+def audit_rollups():
+    """Dashboard rollups: since, until, bucket (hour or day), compliance_type, file_type"""
+    args = request.args
+    try:
+        result = get_audit_store().rollups(
+            since=args.get('since'), until=args.get('until'), bucket=args.get('bucket', 'day'),
+            compliance_type=args.get('compliance_type'), file_type=args.get('file_type')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+@bp.route('/audit/records/<record_id>', methods=['GET'])
+def audit_record(record_id):
+    record = get_audit_store().get_record(record_id)
+    if record is None:
+        return jsonify({"error": "Audit record not found"}), 404
+    return jsonify(record)
 
 @bp.route('/redact/single', methods=['POST'])
 def redact_single_file():
@@ -47,32 +250,33 @@ def redact_single_file():
         return jsonify({"error": "No file provided"}), 400
 
     file = request.files['file']
-    filename = secure_filename(file.filename)
-    file_ext = os.path.splitext(filename)[1].lower()
-    if file_ext not in [".pdf", ".txt", ".json", ".docx"]:
-        return jsonify({"error": "Unsupported file type. Use PDF, TXT, JSON, or DOCX."}), 400
-
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_file_path = os.path.join(temp_dir, f"{uuid.uuid4()}{file_ext}")
-        file.save(temp_file_path)
-        coordinator = CoordinatorAgent()
-        output_path, audit_path = coordinator.handle_file(temp_file_path, compliance_type, temp_dir)
-        if not output_path:
-            return jsonify({"message": "No sensitive information detected", "audit_log": None})
-        # Return both files as a zip
-        zip_path = os.path.join(temp_dir, f"result_{uuid.uuid4()}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(output_path, f"redacted/{os.path.basename(output_path)}")
-            zipf.write(audit_path, f"audit_logs/{os.path.basename(audit_path)}")
-        with open(zip_path, "rb") as f:
-            zip_bytes = io.BytesIO(f.read())
-            zip_bytes.seek(0)
-            return send_file(
-                zip_bytes,
-                mimetype="application/zip",
-                as_attachment=True,
-                download_name="redacted_result.zip"
-            )
+    # Removed by the streamed response once it is sent, and here on every earlier way out
+    temp_dir = tempfile.mkdtemp()
+    try:
+        try:
+            upload = spool_stream(file.stream, temp_dir, secure_filename(file.filename),
+                                  Config.MAX_UPLOAD_BYTES, Config.INGEST_CHUNK_BYTES)
+        except IngestError as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return jsonify({"error": str(e)}), e.status_code
+        profile = profile_options(request.form.get('profile'), request.form.get('profileTop'))
+        coordinator = build_coordinator()
+        output_path, audit_record = coordinator.handle_file(
+            upload["path"], compliance_type, temp_dir, profile, request.form.get('documentId'), upload["sha256"]
+        )
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    if not output_path:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return jsonify({"message": "No sensitive information detected", "audit_log": None})
+
+    # Return both files as a zip, streamed straight into the response
+    entries = [
+        (f"redacted/{os.path.basename(output_path)}", output_path),
+        audit_entry(audit_record),
+    ]
+    return _zip_response(stream_zip(entries), "redacted_result.zip", temp_dir)
 
 @bp.route('/redact/multiple', methods=['POST'])
 def redact_multiple_files():
@@ -86,32 +290,101 @@ def redact_multiple_files():
     if not files:
         return jsonify({"error": "No files provided"}), 400
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        coordinator = CoordinatorAgent()
-        results = []
+    # Uploads are closed when the view returns, so spool them before streaming starts
+    temp_dir = tempfile.mkdtemp()
+    try:
+        uploads = []
         for file in files:
             filename = secure_filename(file.filename)
-            file_ext = os.path.splitext(filename)[1].lower()
-            if file_ext not in [".pdf", ".txt", ".json", ".docx"]:
+            if not is_supported(filename):
                 continue
-            temp_file_path = os.path.join(temp_dir, f"{uuid.uuid4()}{file_ext}")
-            file.save(temp_file_path)
-            output_path, audit_path = coordinator.handle_file(temp_file_path, compliance_type, temp_dir)
+            try:
+                uploads.append(spool_stream(file.stream, temp_dir, filename,
+                                            Config.MAX_UPLOAD_BYTES, Config.INGEST_CHUNK_BYTES))
+            except IngestError as e:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return jsonify({"error": f"{filename}: {e}"}), e.status_code
+        profile = profile_options(request.form.get('profile'), request.form.get('profileTop'))
+        coordinator = build_coordinator()
+        # Later files run while the ZIP streams, when a 503 can no longer be sent
+        coordinator.admission_timeout = float("inf")
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    def redacted_entries():
+        """Process one upload at a time; its output is deleted once it has been zipped"""
+        for upload in uploads:
+            try:
+                output_path, audit_record = coordinator.handle_file(
+                    upload["path"], compliance_type, temp_dir, profile, content_digest=upload["sha256"]
+                )
+            finally:
+                os.remove(upload["path"])
             if output_path:
-                results.append((output_path, audit_path))
-        if not results:
-            return jsonify({"message": "No sensitive information detected in any files", "files": []})
-        zip_path = os.path.join(temp_dir, f"redacted_files_{uuid.uuid4()}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for output_path, audit_path in results:
-                zipf.write(output_path, f"redacted/{os.path.basename(output_path)}")
-                zipf.write(audit_path, f"audit_logs/{os.path.basename(audit_path)}")
-        with open(zip_path, "rb") as f:
-            zip_bytes = io.BytesIO(f.read())
-            zip_bytes.seek(0)
-            return send_file(
-                zip_bytes,
-                mimetype="application/zip",
-                as_attachment=True,
-                download_name="redacted_batch.zip"
-            )
\ No newline at end of file
+                yield f"redacted/{os.path.basename(output_path)}", output_path
+                yield audit_entry(audit_record)
+                os.remove(output_path)
+
+    # Run until the first redacted file so an all-clean batch still gets a JSON answer
+    entries = redacted_entries()
+    try:
+        first = next(entries, None)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    if first is None:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return jsonify({"message": "No sensitive information detected in any files", "files": []})
+    return _zip_response(stream_zip(itertools.chain([first], entries)), "redacted_batch.zip", temp_dir)
+
+@bp.route('/redact/archive', methods=['POST'])
+def redact_archive():
+    """Redact every document in a ZIP or TAR upload; streams back a ZIP of outputs plus audit_manifest.json"""
+    compliance_map = {"1": "GDPR", "2": "HIPAA", "3": "DPDP"}
+    compliance_type = compliance_map.get(request.form.get('complianceNum'))
+    if not compliance_type:
+        return jsonify({"error": "Invalid compliance number. Use 1 (GDPR), 2 (HIPAA), or 3 (DPDP)."}), 400
+
+    if 'archive' not in request.files:
+        return jsonify({"error": "No archive provided"}), 400
+    archive = request.files['archive']
+    kind = archive_kind(archive.filename)
+    if kind is None:
+        return jsonify({"error": "Unsupported archive type. Use ZIP or TAR (.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz)."}), 400
+
+    # Uploads are closed when the view returns, so keep the archive itself (not its members) on disk
+    temp_dir = tempfile.mkdtemp()
+    archive_path = os.path.join(temp_dir, f"{uuid.uuid4()}.archive")
+    archive.save(archive_path)
+    if kind == "zip" and not zipfile.is_zipfile(archive_path):
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return jsonify({"error": "Invalid ZIP archive"}), 400
+
+    def members():
+        """Members are extracted one at a time while the response streams"""
+        with open(archive_path, "rb") as source:
+            yield from iter_members(source, kind)
+
+    coordinator = build_coordinator()
+    # Members queue for memory rather than failing the archive half-way through
+    coordinator.admission_timeout = float("inf")
+    bulk = BulkRedactor(
+        lambda path, digest: coordinator.handle_file(path, compliance_type, temp_dir, content_digest=digest),
+        temp_dir, Config.BULK_WORKERS, Config.MAX_UPLOAD_BYTES, Config.BULK_MAX_MEMBERS
+    )
+    info = {"archive": secure_filename(archive.filename), "compliance_type": compliance_type}
+    return _zip_response(stream_zip(bulk.run(members(), info)), "redacted_archive.zip", temp_dir)
+
+def _zip_response(chunks, download_name, temp_dir):
+    def generate():
+        try:
+            yield from chunks
+        finally:
+            chunks.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={download_name}"}
+    )
@@ -12,6 +12,11 @@ def create_app():
     from routes import bp as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    # Load and warm up the shared models once, off the request path
+    if app.config.get('MODEL_WARMUP_ON_STARTUP'):
+        from app.utils.model_registry import get_registry
+        get_registry().start_warmup()
+
     return app
 
 if __name__ == "__main__":
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 from app.agents.runner_agent import RunnerAgent
 from app.agents.redactor_agent import RedactorAgent
@@ -44,9 +47,67 @@ class TestAgents(unittest.TestCase):
         redactions = self.compliance_agent.apply_policy(pii_items, "GDPR")
         self.assertIn("john.doe@example.com", redactions)
 
+    def test_verify_locally_flags_residual_items(self):
+        verdict = self.compliance_agent.verify_locally("Reach me at jane@example.com or 123-45-6789.", "HIPAA")
+        self.assertEqual(verdict["status"], "fail")
+        self.assertEqual(verdict["residual_counts"], {"email": 1, "ssn": 1})
+
+    def test_verify_locally_respects_policy(self):
+        verdict = self.compliance_agent.verify_locally("See https://example.com for details.", "DPDP")
+        self.assertEqual(verdict["status"], "pass")
+
+    def test_verify_locally_uncertain_on_possible_names(self):
+        verdict = self.compliance_agent.verify_locally("Signed by Jane Doe, [REDACTED_EMAIL].", "GDPR")
+        self.assertEqual(verdict["status"], "uncertain")
+
+    def test_verify_locally_uncertain_on_names_at_sentence_start(self):
+        for text in ["John Smith approved the contract.", "Rahul Sharma called.",
+                     "Patient: John Smith was admitted."]:
+            verdict = self.compliance_agent.verify_locally(text, "GDPR")
+            self.assertEqual(verdict["status"], "uncertain", text)
+            self.assertEqual(verdict["name_candidates"], 1, text)
+
+    def test_verify_locally_ignores_capitalised_non_names(self):
+        for text in ["The Operations Team approved the plan.", "Quarterly Review notes are attached."]:
+            for regime in ["GDPR", "HIPAA", "DPDP"]:
+                verdict = self.compliance_agent.verify_locally(text, regime)
+                self.assertEqual(verdict["status"], "pass", (text, regime))
+
+    def test_plan_detection_limits_detectors(self):
+        plan = self.compliance_agent.plan_detection("HIPAA")
+        self.assertEqual(plan["regex_types"], ["email", "phone", "ssn"])
+        self.assertNotIn("URL", plan["gliner_labels"])
+        sample_text = "Mail jane@example.com, see https://example.com, SSN 123-45-6789."
+        types = {item["type"] for item in self.redactor_agent.detect_sensitive_info(sample_text, plan)}
+        self.assertEqual(types, {"email", "ssn"})
+
+    def test_fastapi_redactor_follows_plan(self):
+        import fast_api_test
+        plan = self.compliance_agent.plan_detection("HIPAA")
+        sample_text = "Mail jane@example.com, see https://example.com, SSN 123-45-6789."
+        types = {item["type"] for item in fast_api_test.RedactorAgent().detect_sensitive_info(sample_text, plan)}
+        self.assertEqual(types, {"email", "ssn"})
+
     def test_log_metadata(self):
-        metadata = self.audit_agent.log_metadata("original text", "redacted text", [], "feedback", "file_path")
-        self.assertIsInstance(metadata, str)
+        from config import Config
+        from app.utils import audit_log
+
+        # The process-wide log and index are opened under a temp dir, not Backend/audit_logs
+        temp_dir = tempfile.mkdtemp()
+        original = Config.AUDIT_LOG_FOLDER, Config.AUDIT_DB_PATH, audit_log._audit_log, audit_log._audit_store
+        Config.AUDIT_LOG_FOLDER = temp_dir
+        Config.AUDIT_DB_PATH = os.path.join(temp_dir, "audit_index.db")
+        audit_log._audit_log = audit_log._audit_store = None
+        try:
+            metadata = self.audit_agent.log_metadata("original text", "redacted text", [], "feedback", "file_path")
+            self.assertIsInstance(metadata, str)
+        finally:
+            if audit_log._audit_log is not None:
+                audit_log._audit_log.close()
+            if audit_log._audit_store is not None:
+                audit_log._audit_store.close()
+            Config.AUDIT_LOG_FOLDER, Config.AUDIT_DB_PATH, audit_log._audit_log, audit_log._audit_store = original
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from app.utils.audit_log import AuditLogWriter, iter_records, read_record, segment_paths
+
+
+class TestAuditLog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_append_returns_ids_and_keeps_order(self):
+        writer = AuditLogWriter(self.temp_dir)
+        ids = [writer.append({"file_path": f"doc_{i}.txt"}) for i in range(50)]
+        self.assertTrue(writer.flush(timeout=5))
+        records = list(iter_records(self.temp_dir))
+        self.assertEqual([r["record_id"] for r in records], ids)
+        self.assertEqual(read_record(self.temp_dir, ids[7])["file_path"], "doc_7.txt")
+        writer.close()
+
+    def test_segments_rotate_and_resume_after_restart(self):
+        writer = AuditLogWriter(self.temp_dir, segment_max_bytes=200, fsync_policy="record")
+        for i in range(10):
+            writer.append({"n": i, "padding": "x" * 40}, wait=True)
+        writer.close()
+        segments = segment_paths(self.temp_dir)
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(os.path.getsize(p) <= 200 for p in segments))
+
+        writer = AuditLogWriter(self.temp_dir, segment_max_bytes=200)
+        writer.append({"n": 10}, wait=True)
+        writer.close()
+        self.assertEqual([r["n"] for r in iter_records(self.temp_dir)], list(range(11)))
+
+    def test_torn_last_line_is_skipped(self):
+        writer = AuditLogWriter(self.temp_dir, fsync_policy="interval", fsync_interval=0.01)
+        writer.append({"n": 1})
+        writer.close()
+        with open(segment_paths(self.temp_dir)[-1], "ab") as f:
+            f.write(b'{"n": 2, "record')
+        self.assertEqual([r["n"] for r in iter_records(self.temp_dir)], [1])
+
+    def test_append_after_torn_last_line_starts_a_new_line(self):
+        writer = AuditLogWriter(self.temp_dir)
+        writer.append({"n": 1}, wait=True)
+        writer.close()
+        with open(segment_paths(self.temp_dir)[-1], "ab") as f:
+            f.write(b'{"n": 2, "record')
+        writer = AuditLogWriter(self.temp_dir)
+        writer.append({"n": 3}, wait=True)
+        writer.close()
+        self.assertEqual([r["n"] for r in iter_records(self.temp_dir)], [1, 3])
+
+    def test_writers_sharing_a_directory_keep_their_own_segments(self):
+        # As under gunicorn/uvicorn workers: several writers on one directory
+        committed = []
+        writers = [AuditLogWriter(self.temp_dir, on_commit=committed.extend) for _ in range(2)]
+        for i in range(6):
+            writers[i % 2].append({"n": i}, wait=True)
+        for writer in writers:
+            writer.close()
+        self.assertEqual(len(segment_paths(self.temp_dir)), 2)
+        self.assertEqual(sorted(r["n"] for r in iter_records(self.temp_dir)), list(range(6)))
+        for record, segment, offset, length in committed:
+            with open(os.path.join(self.temp_dir, segment), "rb") as f:
+                f.seek(offset)
+                self.assertEqual(f.read(length).rstrip(b"\n"), json.dumps(record, separators=(",", ":")).encode())
+
+    def test_failed_write_is_reported_to_the_waiter(self):
+        # A regular file where the segment directory should be
+        blocked = os.path.join(self.temp_dir, "blocked")
+        open(blocked, "w").close()
+        writer = AuditLogWriter(blocked)
+        with self.assertRaises(OSError):
+            writer.append({"n": 1}, wait=True)
+        writer.append({"n": 2})
+        self.assertFalse(writer.flush(timeout=5))
+        self.assertIsNotNone(writer.last_error)
+        writer.close()
+
+    def test_unknown_fsync_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            AuditLogWriter(self.temp_dir, fsync_policy="never")
+
+
+if __name__ == '__main__':
+    unittest.main()
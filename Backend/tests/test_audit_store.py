@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.utils.audit_log import AuditLogWriter
+from app.utils.audit_store import AuditStore
+
+
+def _record(compliance_type, entities, logged_at, status="completed", processing_ms=None):
+    counts = {}
+    for entity_type in entities:
+        counts[entity_type] = counts.get(entity_type, 0) + 1
+    return {
+        "logged_at": logged_at,
+        "compliance_type": compliance_type,
+        "file_path": "/tmp/upload.txt",
+        "total_redacted_items": len(entities),
+        "redacted_items_by_type": counts,
+        "processing_status": status,
+        "processing_ms": processing_ms,
+    }
+
+
+class TestAuditStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.temp_dir, "audit_logs")
+        self.db_path = os.path.join(self.temp_dir, "index.db")
+        self.store = AuditStore(self.db_path, self.log_dir)
+        writer = AuditLogWriter(self.log_dir, on_commit=self.store.add_records)
+        day = 86400
+        self.ids = [
+            writer.append(_record("HIPAA", ["ssn", "ssn", "email"], 10 * day, processing_ms=40)),
+            writer.append(_record("HIPAA", ["phone"], 11 * day, processing_ms=400)),
+            writer.append(_record("GDPR", ["ssn", "name"], 11 * day, processing_ms=90)),
+            writer.append(_record("HIPAA", ["ssn"], 20 * day)),
+        ]
+        writer.close()
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_query_filters_by_compliance_entity_and_time(self):
+        result = self.store.query(since=9 * 86400, until=15 * 86400, compliance_type="HIPAA", entity_type="ssn")
+        self.assertEqual(result["total_records"], 1)
+        self.assertEqual(result["entities_by_type"], {"ssn": 2})
+        self.assertEqual(result["records"][0]["record_id"], self.ids[0])
+
+    def test_group_by_entity_type_and_compliance(self):
+        by_entity = self.store.query(group_by="entity_type")["groups"]
+        self.assertEqual({g["key"]: g["entities"] for g in by_entity},
+                         {"email": 1, "name": 1, "phone": 1, "ssn": 4})
+        by_regime = self.store.query(group_by="compliance_type")["groups"]
+        self.assertEqual({g["key"]: g["records"] for g in by_regime}, {"GDPR": 1, "HIPAA": 3})
+        with self.assertRaises(ValueError):
+            self.store.query(group_by="file_path")
+
+    def test_get_record_and_catch_up_after_lost_index(self):
+        self.assertEqual(self.store.get_record(self.ids[2])["compliance_type"], "GDPR")
+        fresh = AuditStore(os.path.join(self.temp_dir, "fresh.db"), self.log_dir)
+        self.assertEqual(fresh.catch_up(), 4)
+        self.assertEqual(fresh.catch_up(), 0)
+        self.assertEqual(fresh.query()["total_records"], 4)
+        fresh.close()
+
+    def test_get_record_checks_the_id_at_the_indexed_offset(self):
+        record = self.store.get_record(self.ids[1])
+        # An offset pointing at another record, as a stale index would have it
+        self.store._conn.execute("UPDATE audit_records SET byte_offset = 0 WHERE record_id = ?", (self.ids[1],))
+        self.assertEqual(self.store.get_record(self.ids[1]), record)
+
+    def test_rollups_are_maintained_on_write_and_survive_rebuild(self):
+        rollups = self.store.rollups(until=15 * 86400)
+        self.assertEqual(len(rollups["series"]), 2)
+        self.assertEqual(rollups["totals"]["records"], 3)
+        self.assertEqual(rollups["totals"]["entities_by_type"]["ssn"], 3)
+        self.assertEqual(rollups["by_compliance_type"]["HIPAA"]["records"], 2)
+        latency = rollups["totals"]["latency"]
+        self.assertEqual((latency["count"], latency["p50_ms"], latency["max_ms"]), (3, 100, 400))
+
+        before = self.store.rollups(bucket="hour")
+        self.store.catch_up()
+        self.store.rebuild()
+        self.assertEqual(self.store.rollups(bucket="hour"), before)
+
+    def test_flask_endpoint_rejects_unknown_grouping(self):
+        from run import create_app
+        from config import Config
+        from app.utils import audit_log
+
+        # The process-wide store is rebuilt from the temp paths and never touches Backend/audit_logs
+        original = (Config.AUDIT_DB_PATH, Config.AUDIT_LOG_FOLDER, Config.MODEL_WARMUP_ON_STARTUP,
+                    audit_log._audit_store)
+        Config.AUDIT_DB_PATH, Config.AUDIT_LOG_FOLDER = self.db_path, self.log_dir
+        Config.MODEL_WARMUP_ON_STARTUP, audit_log._audit_store = False, None
+        try:
+            client = create_app().test_client()
+            self.assertEqual(client.get("/audit/query?group_by=file_path").status_code, 400)
+            response = client.get("/audit/query?group_by=day&limit=1")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["total_records"], 4)
+            self.assertEqual(client.get("/audit/rollups?bucket=week").status_code, 400)
+            self.assertIn("series", client.get("/audit/rollups?bucket=hour").get_json())
+        finally:
+            if audit_log._audit_store is not None:
+                audit_log._audit_store.close()
+            (Config.AUDIT_DB_PATH, Config.AUDIT_LOG_FOLDER, Config.MODEL_WARMUP_ON_STARTUP,
+             audit_log._audit_store) = original
+
+
+if __name__ == '__main__':
+    unittest.main()
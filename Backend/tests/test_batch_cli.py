@@ -0,0 +1,172 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_DIR)
+import main  # noqa: E402
+
+
+class TestBatchCli(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "in")
+        for rel in ["a.txt", "b.json", "notes.md", "old_redacted.txt", "sub/c.txt", "sub/deep/d.txt", "sub/skip.txt"]:
+            path = os.path.join(self.input_dir, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"email": "jane@example.com"}' if rel.endswith(".json") else f"Mail {rel} to jane@example.com")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _rel(self, inputs):
+        return sorted(os.path.relpath(path, self.input_dir).replace(os.sep, "/") for path, _ in inputs)
+
+    def test_collect_walks_directories_globs_and_filters(self):
+        inputs = main.collect_inputs([self.input_dir], exclude=["skip.txt"])
+        self.assertEqual(self._rel(inputs), ["a.txt", "b.json", "sub/c.txt", "sub/deep/d.txt"])
+        self.assertTrue(all(root == self.input_dir for _, root in inputs))
+
+        pattern = os.path.join(self.input_dir, "**", "*.txt")
+        inputs = main.collect_inputs([pattern, os.path.join(self.input_dir, "a.txt")], include=["sub/*"])
+        self.assertEqual(self._rel(inputs), ["sub/c.txt", "sub/deep/d.txt", "sub/skip.txt"])
+
+    def test_output_paths_mirror_tree_under_output_dir(self):
+        path = os.path.join(self.input_dir, "sub", "deep", "d.txt")
+        self.assertEqual(main.output_path_for(path), os.path.join(self.input_dir, "sub", "deep", "d_redacted.txt"))
+        self.assertEqual(main.output_path_for(path, self.input_dir, "/out"),
+                         os.path.join("/out", "sub", "deep", "d_redacted.txt"))
+
+    def test_run_batch_on_threads_and_summarize(self):
+        tasks = [(path, main.output_path_for(path, root, os.path.join(self.temp_dir, "out")))
+                 for path, root in main.collect_inputs([self.input_dir])]
+        tasks.append((os.path.join(self.input_dir, "missing.txt"), os.path.join(self.temp_dir, "x.txt")))
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = main.run_batch(tasks, "GDPR", jobs=3, coordinator=main.CoordinatorAgent())
+        finally:
+            os.chdir(cwd)
+
+        summary = main.summarize(results, 1.0)
+        self.assertEqual(summary["files"], 6)
+        self.assertEqual(summary["redacted"], 5)
+        self.assertEqual(summary["missing"], 1)
+        self.assertEqual(summary["files_per_second"], 6.0)
+        with open(os.path.join(self.temp_dir, "out", "sub", "deep", "d_redacted.txt"), encoding="utf-8") as f:
+            self.assertIn("[REDACTED_EMAIL]", f.read())
+
+    def test_duplicate_names_under_different_roots_get_separate_outputs(self):
+        roots = [os.path.join(self.temp_dir, "a"), os.path.join(self.temp_dir, "b")]
+        for root in roots:
+            os.makedirs(root)
+            with open(os.path.join(root, "note.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Mail {os.path.basename(root)}@example.com")
+        out_dir = os.path.join(self.temp_dir, "out")
+        tasks = main.plan_outputs(main.collect_inputs(roots), out_dir)
+        self.assertEqual(sorted(output for _, output in tasks),
+                         [os.path.join(out_dir, "a", "note_redacted.txt"), os.path.join(out_dir, "b", "note_redacted.txt")])
+        # Without a clash the root's own name stays out of the output path
+        self.assertEqual(main.plan_outputs(main.collect_inputs(roots[:1]), out_dir),
+                         [(os.path.join(roots[0], "note.txt"), os.path.join(out_dir, "note_redacted.txt"))])
+
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = main.run_batch(tasks, "GDPR", jobs=2, coordinator=main.CoordinatorAgent())
+        finally:
+            os.chdir(cwd)
+        self.assertEqual([r["status"] for r in results], ["redacted", "redacted"])
+        for _, output in tasks:
+            self.assertTrue(os.path.exists(output))
+        self.assertEqual(len(os.listdir(os.path.join(self.temp_dir, "audit_logs"))), 2)
+
+    def test_clashing_roots_with_the_same_name_are_rejected(self):
+        roots = [os.path.join(self.temp_dir, "x", "docs"), os.path.join(self.temp_dir, "y", "docs")]
+        for root in roots:
+            os.makedirs(root)
+            with open(os.path.join(root, "note.txt"), "w", encoding="utf-8") as f:
+                f.write("Mail jane@example.com")
+        with self.assertRaises(ValueError):
+            main.plan_outputs(main.collect_inputs(roots), os.path.join(self.temp_dir, "out"))
+
+    def _run(self, tasks, checkpoint):
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return main.run_batch(tasks, "GDPR", jobs=2, coordinator=main.CoordinatorAgent(), checkpoint=checkpoint)
+        finally:
+            os.chdir(cwd)
+
+    def test_checkpoint_skips_finished_files_and_retries_failures(self):
+        with open(os.path.join(self.input_dir, "bad.json"), "w", encoding="utf-8") as f:
+            f.write("not json")
+        tasks = [(path, main.output_path_for(path, root, os.path.join(self.temp_dir, "out")))
+                 for path, root in main.collect_inputs([self.input_dir])]
+        manifest = os.path.join(self.temp_dir, "checkpoint.jsonl")
+        checkpoint = main.Checkpoint(manifest)
+        statuses = {os.path.basename(r["path"]): r["status"] for r in self._run(tasks, checkpoint)}
+        checkpoint.close()
+        self.assertEqual(statuses["bad.json"], "error")
+        # A run killed mid-write leaves a torn last line behind
+        with open(manifest, "a", encoding="utf-8") as f:
+            f.write('{"path": "/half')
+
+        with open(os.path.join(self.input_dir, "sub", "c.txt"), "a", encoding="utf-8") as f:
+            f.write(" and bob@example.com")
+        os.utime(os.path.join(self.input_dir, "a.txt"))
+        checkpoint = main.Checkpoint(manifest)
+        pending = [task for task in tasks if not checkpoint.is_done(*task)]
+        self.assertEqual(sorted(os.path.basename(path) for path, _ in pending), ["bad.json", "c.txt"])
+        self._run(pending, checkpoint)
+        checkpoint.close()
+
+        entries = main.Checkpoint(manifest).entries
+        self.assertEqual(len(entries), 6)
+        self.assertEqual(entries[os.path.realpath(os.path.join(self.input_dir, "bad.json"))][3], "error")
+        entry = entries[os.path.realpath(os.path.join(self.input_dir, "sub", "c.txt"))]
+        self.assertEqual(entry[3], "redacted")
+        self.assertEqual(entry[4], os.path.join(self.temp_dir, "out", "sub", "c_redacted.txt"))
+
+    def test_file_changed_during_processing_is_not_checkpointed(self):
+        path = os.path.join(self.input_dir, "a.txt")
+        coordinator = main.CoordinatorAgent()
+        handle_file = coordinator.handle_file
+
+        def edited_while_running(*args):
+            result = handle_file(*args)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(" and bob@example.com")
+            return result
+
+        coordinator.handle_file = edited_while_running
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = main._process_task(coordinator, path, "GDPR", os.path.join(self.temp_dir, "a_redacted.txt"),
+                                            fingerprint=True)
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(result["status"], "redacted")
+        self.assertNotIn("sha256", result)
+
+    def test_cli_requires_compliance_with_paths(self):
+        result = subprocess.run([sys.executable, os.path.join(REPO_DIR, "main.py"), self.input_dir],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("--compliance is required", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
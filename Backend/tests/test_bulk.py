@@ -0,0 +1,175 @@
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from app.utils.bulk import BulkRedactor, MANIFEST_NAME, archive_kind, iter_members, safe_member_name
+from app.utils.zip_stream import stream_zip
+
+
+def build_zip(files: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    buffer.seek(0)
+    return buffer
+
+
+def build_tar(files: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, text in files.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+FILES = {f"docs/note_{i}.txt": (f"Contact user{i}@example.com" if i % 2 else f"Nothing sensitive in {i}")
+         for i in range(12)}
+FILES["docs/readme.md"] = "not a supported format"
+FILES["../../etc/escape.txt"] = "call 555-123-4567 now"
+
+
+class TestBulk(unittest.TestCase):
+
+    def setUp(self):
+        from routes import CoordinatorAgent
+        from app.agents.audit_agent import AuditAgent
+        from app.utils.audit_log import AuditLogWriter
+        self.temp_dir = tempfile.mkdtemp()
+        self.coordinator = CoordinatorAgent()
+        self.coordinator.audit = AuditAgent(AuditLogWriter(os.path.join(self.temp_dir, "audit")))
+
+    def tearDown(self):
+        self.coordinator.audit.writer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, source, kind) -> zipfile.ZipFile:
+        work_dir = os.path.join(self.temp_dir, "work")
+        os.makedirs(work_dir, exist_ok=True)
+        bulk = BulkRedactor(
+            lambda path, digest: self.coordinator.handle_file(path, "GDPR", work_dir, content_digest=digest),
+            work_dir, workers=3
+        )
+        output = b"".join(stream_zip(bulk.run(iter_members(source, kind), {"compliance_type": "GDPR"})))
+        self.assertEqual(os.listdir(work_dir), [])
+        return zipfile.ZipFile(io.BytesIO(output))
+
+    def test_archive_kinds_and_member_names(self):
+        self.assertEqual(archive_kind("batch.ZIP"), "zip")
+        self.assertEqual(archive_kind("batch.tar.gz"), "tar")
+        self.assertIsNone(archive_kind("batch.rar"))
+        self.assertEqual(safe_member_name("../../etc/escape.txt"), "etc/escape.txt")
+        self.assertEqual(safe_member_name("/abs/./a.txt"), "abs/a.txt")
+
+    def test_zip_and_tar_produce_outputs_and_manifest(self):
+        for source, kind in ((build_zip(FILES), "zip"), (build_tar(FILES), "tar")):
+            result = self._run(source, kind)
+            manifest = json.loads(result.read(MANIFEST_NAME))
+            summary = manifest["summary"]
+            self.assertEqual(summary["files"], 14, kind)
+            self.assertEqual(summary["redacted"], 7, kind)
+            self.assertEqual(summary["no_pii"], 6, kind)
+            self.assertEqual(summary["skipped"], 1, kind)
+            self.assertGreater(summary["files_per_second"], 0)
+            redacted = sorted(n for n in result.namelist() if n.startswith("redacted/"))
+            self.assertIn("redacted/etc/escape.txt", redacted)
+            self.assertEqual(len(redacted), 7)
+            self.assertIn("[REDACTED_EMAIL]", result.read("redacted/docs/note_1.txt").decode("utf-8"))
+            entry = next(f for f in manifest["files"] if f["name"] == "docs/note_1.txt")
+            self.assertEqual(entry["redacted_items_by_type"], {"email": 1})
+            self.assertTrue(entry["record_id"])
+
+    def test_corrupt_member_is_reported_in_manifest(self):
+        data = build_zip(FILES).getvalue().replace(b"user1@example.com", b"userX@example.com")
+        result = self._run(io.BytesIO(data), "zip")
+        manifest = json.loads(result.read(MANIFEST_NAME))
+        entry = next(f for f in manifest["files"] if f["name"] == "docs/note_1.txt")
+        self.assertEqual(entry["status"], "error")
+        self.assertIn("CRC", entry["error"])
+        self.assertEqual(manifest["summary"]["redacted"], 6)
+
+    def test_flask_archive_endpoint(self):
+        import routes
+        from run import create_app
+        from config import Config
+        from app.utils.revisions import RevisionStore
+
+        def build_coordinator():
+            # Regex-only and writing under the temp dir, so no model loads and nothing lands in the tree
+            coordinator = routes.CoordinatorAgent(revisions=RevisionStore(os.path.join(self.temp_dir, "revisions")))
+            coordinator.audit = self.coordinator.audit
+            return coordinator
+
+        original = routes.build_coordinator, Config.MODEL_WARMUP_ON_STARTUP
+        routes.build_coordinator, Config.MODEL_WARMUP_ON_STARTUP = build_coordinator, False
+        try:
+            client = create_app().test_client()
+            response = client.post("/redact/archive", data={
+                "complianceNum": "1", "archive": (build_zip(FILES), "batch.zip"),
+            }, content_type="multipart/form-data")
+            self.assertEqual(response.status_code, 200)
+            result = zipfile.ZipFile(io.BytesIO(response.get_data()))
+            self.assertEqual(json.loads(result.read(MANIFEST_NAME))["summary"]["redacted"], 7)
+
+            response = client.post("/redact/archive", data={
+                "complianceNum": "1", "archive": (io.BytesIO(b"not a zip"), "batch.zip"),
+            }, content_type="multipart/form-data")
+            self.assertEqual(response.status_code, 400)
+        finally:
+            routes.build_coordinator, Config.MODEL_WARMUP_ON_STARTUP = original
+
+    def test_fastapi_archive_members_run_on_the_pipeline_pools(self):
+        import threading
+        import fast_api_test
+        from fastapi.testclient import TestClient
+        from config import Config
+        from app.utils import audit_log
+
+        threads = []
+        redact_file_path = fast_api_test.redact_file_path
+
+        def recording_redact_file_path(*args):
+            threads.append(threading.current_thread().name)
+            return redact_file_path(*args)
+
+        # Regex-only and writing under the temp dir, so no model loads and nothing lands in the tree
+        coordinator = fast_api_test.CoordinatorAgent()
+        coordinator.audit = self.coordinator.audit
+        original = (fast_api_test._coordinator, fast_api_test.redact_file_path, Config.MODEL_WARMUP_ON_STARTUP,
+                    Config.JOBS_FOLDER, Config.JOBS_DB_PATH, Config.AUDIT_LOG_FOLDER, Config.AUDIT_DB_PATH,
+                    audit_log._audit_log, audit_log._audit_store)
+        fast_api_test._coordinator, fast_api_test.redact_file_path = coordinator, recording_redact_file_path
+        Config.MODEL_WARMUP_ON_STARTUP = False
+        Config.JOBS_FOLDER = os.path.join(self.temp_dir, "jobs")
+        Config.JOBS_DB_PATH = os.path.join(Config.JOBS_FOLDER, "jobs.db")
+        # The app's shutdown closes the process-wide audit log, which it opens first if need be
+        Config.AUDIT_LOG_FOLDER = os.path.join(self.temp_dir, "app_audit")
+        Config.AUDIT_DB_PATH = os.path.join(Config.AUDIT_LOG_FOLDER, "audit_index.db")
+        audit_log._audit_log = audit_log._audit_store = None
+        try:
+            with TestClient(fast_api_test.app) as client:
+                response = client.post("/redact/archive", data={"complianceNum": "1"},
+                                       files={"archive": ("batch.zip", build_zip(FILES), "application/zip")})
+        finally:
+            if audit_log._audit_store is not None:
+                audit_log._audit_store.close()
+            (fast_api_test._coordinator, fast_api_test.redact_file_path, Config.MODEL_WARMUP_ON_STARTUP,
+             Config.JOBS_FOLDER, Config.JOBS_DB_PATH, Config.AUDIT_LOG_FOLDER, Config.AUDIT_DB_PATH,
+             audit_log._audit_log, audit_log._audit_store) = original
+        self.assertEqual(response.status_code, 200)
+        result = zipfile.ZipFile(io.BytesIO(response.content))
+        self.assertEqual(json.loads(result.read(MANIFEST_NAME))["summary"]["redacted"], 7)
+        self.assertEqual(len(threads), len(FILES) - 1)  # all but the unsupported readme.md
+        self.assertTrue(all(name.startswith("pipeline-cpu") for name in threads), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from benchmarks.corpus import FORMATS, generate_corpus, generate_text, load_manifest
+
+
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_spans_index_the_joined_text(self):
+        sentences, spans = generate_text(random.Random(3), 5000, 0.5)
+        text = "\n".join(sentences)
+        self.assertGreater(len(spans), 0)
+        for span in spans:
+            self.assertEqual(text[span["start"]:span["end"]], span["value"])
+
+    def test_same_seed_gives_same_corpus(self):
+        first = generate_corpus(os.path.join(self.temp_dir, "a"), [1000], ["txt"], seed=11)
+        second = generate_corpus(os.path.join(self.temp_dir, "b"), [1000], ["txt"], seed=11)
+        self.assertEqual(first["documents"], second["documents"])
+
+    def test_writes_every_format_and_manifest(self):
+        manifest = generate_corpus(self.temp_dir, [800], density=0.5, seed=1)
+        self.assertEqual(load_manifest(self.temp_dir), manifest)
+        self.assertEqual([d["format"] for d in manifest["documents"]], FORMATS)
+        for document in manifest["documents"]:
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir, document["path"])))
+
+        with open(os.path.join(self.temp_dir, "doc_800_0.txt"), encoding="utf-8") as f:
+            text = f.read()
+        with open(os.path.join(self.temp_dir, "doc_800_0.ndjson"), encoding="utf-8") as f:
+            records = [json.loads(line)["text"] for line in f]
+        self.assertEqual("\n".join(records), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app.agents.compliance_agent import build_detection_plan
+from app.agents.redactor_agent import RedactorAgent
+from app.utils.dictionary import DictionaryAutomaton, DictionaryHandle, compile_dictionary
+
+
+class TestDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.source = os.path.join(self.temp_dir, "known.tsv")
+        self._write("# staff and customers\nemployee\tGrace Hopper\ncustomer_id\tCUST-00042\nOrion\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, content):
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_automaton_finds_overlapping_entries_on_word_boundaries(self):
+        path = os.path.join(self.temp_dir, "test.ac")
+        compile_dictionary([("place", "new york"), ("place", "york city"), ("project", "New York City Hall"),
+                            ("code", "a b"), ("code", "b a b c")], path)
+        automaton = DictionaryAutomaton(path)
+        try:
+            text = "At new  york city hall: a b a b c, not york cityscape."
+            found = [(t, text[s:e]) for s, e, t, _ in automaton.scan(text).dedup().spans()]
+        finally:
+            automaton.close()
+        self.assertEqual(found, [
+            ("place", "new  york"), ("project", "new  york city hall"), ("place", "york city"),
+            ("code", "a b"), ("code", "b a b c"), ("code", "a b"),
+        ])
+
+    def test_redactor_applies_dictionary_whatever_the_regime(self):
+        handle = DictionaryHandle([self.source], self.cache_dir)
+        handle.reload()
+        redactor = RedactorAgent(dictionary=handle)
+        text = "Grace Hopper opened CUST-00042 for project orion; CUST-000421 is unrelated."
+        entities = redactor.detect_sensitive_info(text, build_detection_plan("HIPAA"))
+        self.assertEqual(
+            redactor.redact(text, entities),
+            "[REDACTED_EMPLOYEE] opened [REDACTED_CUSTOMER_ID] for project [REDACTED_CUSTOM]; CUST-000421 is unrelated."
+        )
+
+    def test_changed_file_is_swapped_in_without_restart(self):
+        handle = DictionaryHandle([self.source], self.cache_dir, check_seconds=0)
+        self.assertTrue(handle.reload())
+        first = handle.get()
+        self.assertEqual(first.entries, 3)
+        self.assertEqual(handle.get(), first)
+        self._write("employee\tAlan Turing\n")
+        os.utime(self.source, ns=(0, os.stat(self.source).st_mtime_ns + 10 ** 9))
+        # The next check builds in the background and keeps serving the current automaton meanwhile
+        deadline = time.monotonic() + 30
+        second = handle.get()
+        while second is first and time.monotonic() < deadline:
+            time.sleep(0.01)
+            second = handle.get()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second.scan("Alan Turing met Grace Hopper")), 1)
+        self.assertEqual(handle.status()["reloads"], 2)
+        self.assertFalse(handle.reload())
+
+    def _wait_for_build(self, handle):
+        deadline = time.monotonic() + 30
+        while handle.status()["building"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_get_never_waits_and_backs_off_after_a_failed_build(self):
+        with open(self.source, "ab") as f:
+            f.write(b"employee\tBad \xff byte\n")
+        handle = DictionaryHandle([self.source], self.cache_dir, check_seconds=3600)
+        # The build runs in the background; the request path scans without a dictionary meanwhile
+        self.assertIsNone(handle.get())
+        self._wait_for_build(handle)
+        self.assertIsNone(handle.get())
+        self.assertIsNotNone(handle.status()["error"])
+        # Unchanged files are not rebuilt, even once the check interval has passed
+        handle.checked_at -= 7200
+        self.assertIsNone(handle.get())
+        self.assertFalse(handle.status()["building"])
+        # A fixed file is picked up by the next check
+        self._write("employee\tGrace Hopper\n")
+        os.utime(self.source, ns=(0, os.stat(self.source).st_mtime_ns + 10 ** 9))
+        handle.checked_at -= 7200
+        handle.get()
+        self._wait_for_build(handle)
+        self.assertEqual(handle.get().entries, 1)
+        self.assertIsNone(handle.status()["error"])
+
+    def test_compiled_file_is_mapped_without_a_build(self):
+        DictionaryHandle([self.source], self.cache_dir).reload()
+        handle = DictionaryHandle([self.source], self.cache_dir)
+        self.assertEqual(handle.get().entries, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import pickle
+import unittest
+from app.agents.detectors import scan_spans
+from app.agents.entities import EntitySet, unique_items
+from app.agents.redactor_agent import RedactorAgent
+from app.utils.revisions import detect_incremental
+
+SAMPLE = "Mail Jane.Doe@example.com or jane.doe@example.com, call 555-123-4567. Jane Doe signed."
+
+
+class TestEntitySet(unittest.TestCase):
+
+    def test_spans_iterate_as_items_and_dedup_by_value(self):
+        entities = scan_spans(SAMPLE)
+        self.assertEqual(len(entities), 3)
+        self.assertIn({"type": "phone", "value": "555-123-4567"}, list(entities))
+        self.assertEqual(entities.counts_by_type(), {"email": 2, "phone": 1})
+        self.assertEqual(len(unique_items(entities)), 2)
+        self.assertEqual(unique_items([{"type": "name", "value": "Jane"}]), [{"type": "name", "value": "Jane"}])
+
+    def test_redact_resolves_overlaps_in_one_pass(self):
+        text = "Jane Doe at jane@example.com"
+        entities = EntitySet(text)
+        entities.add(0, 8, "name")
+        entities.add(0, 4, "name")
+        entities.add(12, 28, "email")
+        entities.add(20, 27, "organization")
+        self.assertEqual(entities.redact(), "[REDACTED_NAME] at [REDACTED_EMAIL]")
+
+    def test_spread_marks_every_occurrence_on_word_boundaries(self):
+        text = "Jane Doe wrote this. JANE DOE signed; Jane Doex did not."
+        entities = EntitySet(text)
+        entities.add(0, 8, "name")
+        entities.spread()
+        self.assertEqual([(s, e) for s, e, _, _ in entities.spans()], [(0, 8), (21, 29)])
+
+    def test_from_items_matches_the_previous_redaction(self):
+        redactor = RedactorAgent()
+        items = [{"type": "email", "value": "jane.doe@example.com"}, {"type": "name", "value": "Jane Doe"}]
+        self.assertEqual(
+            redactor.redact(SAMPLE, items),
+            "Mail [REDACTED_EMAIL] or [REDACTED_EMAIL], call 555-123-4567. [REDACTED_NAME] signed."
+        )
+
+    def test_state_and_pickle_round_trip_by_type_name(self):
+        entities = scan_spans(SAMPLE)
+        restored = EntitySet.from_state(SAMPLE, entities.to_state())
+        self.assertEqual(list(restored), list(entities))
+        self.assertEqual(list(pickle.loads(pickle.dumps(entities))), list(entities))
+
+    def test_incremental_detection_returns_spans_of_the_whole_text(self):
+        text = ("filler line\n" * 60) + SAMPLE + "\n" + ("more filler\n" * 60) + "Write to Jane.Doe@example.com\n"
+        entities, state, _ = detect_incremental(scan_spans, text)
+        self.assertEqual(entities.counts_by_type(), {"email": 3, "phone": 1})
+        self.assertTrue(all(text[s:e].lower() == "jane.doe@example.com" for s, e, t, _ in entities.spans() if t == "email"))
+        again, _, report = detect_incremental(scan_spans, text, state)
+        self.assertEqual(report["chunks_reused"], report["chunks"])
+        self.assertEqual(list(again), list(entities))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+import unittest
+from benchmarks.corpus import generate_corpus
+from benchmarks.evaluate import evaluate, load_detector, load_documents, score_document
+
+
+class TestEvaluate(unittest.TestCase):
+
+    def test_score_document_matches_values_by_type(self):
+        truth = [{"type": "email", "value": "A@example.com"}, {"type": "ssn", "value": "123-45-6789"}]
+        detected = [{"type": "email", "value": "a@example.com"}, {"type": "phone", "value": "555-123-4567"}]
+        counts = score_document(detected, truth)
+        self.assertEqual(counts["email"]["tp"], 1)
+        self.assertEqual(counts["ssn"]["fn"], 1)
+        self.assertEqual(counts["phone"]["fp"], 1)
+
+    def test_regex_configuration_over_generated_corpus(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            generate_corpus(temp_dir, [1500], ["txt"], density=0.6, docs_per_size=3, seed=2)
+            documents = load_documents(temp_dir, ["txt"])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        detect, plan = load_detector("regex+plan:HIPAA")
+        report = evaluate(detect, documents, plan)
+        self.assertEqual(report["documents"], 3)
+        self.assertEqual(report["per_type"]["email"]["recall"], 1.0)
+        # Regimes skip types they do not cover, so those are neither hits nor misses
+        self.assertNotIn("url", report["per_type"])
+        self.assertGreater(report["docs_per_second"], 0)
+        self.assertLessEqual(report["p50_ms"], report["p95_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
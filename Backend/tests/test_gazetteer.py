@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.agents.redactor_agent import RedactorAgent
+from config import Config
+from app.utils.gazetteer import builtin_cache_dir, get_gazetteer, load_gazetteer
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.allow = self._write("allow.txt", "# known staff\nAda Lovelace\nCher\n")
+        self.deny = self._write("deny.txt", "Acme Health\nOcean Drive Partners\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def _load(self):
+        return load_gazetteer({"allow": [self.allow], "deny": [self.deny]}, self.cache_dir)
+
+    def test_verdicts_for_lists_and_builtin_terms(self):
+        gazetteer = self._load()
+        try:
+            self.assertEqual(
+                gazetteer.verdicts(["ada  LOVELACE", "Cher", "Acme Health", "New York", "Dr. Jane Roe",
+                                    "Jane Roe", "Jane Acme Health", "Thank you Jane"]),
+                [True, True, False, False, False, None, None, None]
+            )
+        finally:
+            gazetteer.close()
+
+    def test_compiled_file_is_reused_until_a_list_changes(self):
+        first = self._load()
+        first.close()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        second = self._load()
+        self.assertEqual(second.path, first.path)
+        second.close()
+        with open(self.deny, "a", encoding="utf-8") as f:
+            f.write("Jane Roe\n")
+        os.utime(self.deny, ns=(0, os.stat(self.deny).st_mtime_ns + 10 ** 9))
+        third = self._load()
+        try:
+            self.assertNotEqual(third.path, first.path)
+            self.assertEqual(third.verdicts(["Jane Roe"]), [False])
+        finally:
+            third.close()
+
+    def test_redactor_filters_person_candidates_in_bulk(self):
+        gazetteer = self._load()
+        try:
+            redactor = RedactorAgent(gazetteer=gazetteer)
+            self.assertEqual(
+                redactor._filter_person_names(["Cher", "Acme Health", "Jane Roe", "Roe", "Mr Roe"]),
+                [True, False, True, False, False]
+            )
+        finally:
+            gazetteer.close()
+
+    def test_verifier_words_do_not_change_the_redactor_filter(self):
+        from app.agents.compliance_agent import verify_locally
+        gazetteer = self._load()
+        try:
+            redactor = RedactorAgent(gazetteer=gazetteer)
+            self.assertEqual(redactor._filter_person_names(["Operations Team", "Quarterly Review"]), [True, True])
+            verdict = verify_locally("Notes from the Operations Team and Quarterly Review.", "GDPR", gazetteer)
+            self.assertEqual(verdict["status"], "pass")
+        finally:
+            gazetteer.close()
+
+    def test_builtin_lists_alone_compile_outside_the_working_tree(self):
+        if Config.NAME_ALLOWLIST_PATHS or Config.NAME_DENYLIST_PATHS or Config.NAME_DENY_TERM_PATHS:
+            self.skipTest("name lists are configured in this environment")
+        self.assertEqual(os.path.dirname(get_gazetteer().path), builtin_cache_dir())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from app.utils.ingest import IngestError, spool_stream
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _spool(self, data: bytes, filename: str, **kwargs) -> dict:
+        return spool_stream(io.BytesIO(data), self.temp_dir, filename, **kwargs)
+
+    def test_text_is_hashed_and_spooled_in_one_pass(self):
+        data = ("Café owner jane.doe@example.com\n" * 1000).encode("utf-8")
+        # A small chunk size splits the two-byte é across chunks
+        upload = self._spool(data, "notes.txt", chunk_size=7)
+        self.assertEqual(upload["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(upload["size"], len(data))
+        self.assertEqual(upload["format"], "txt")
+        self.assertTrue(upload["path"].endswith(".txt"))
+        with open(upload["path"], "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    def test_size_limit_rejects_and_removes_spool(self):
+        with self.assertRaises(IngestError) as ctx:
+            self._spool(b"x" * 5000, "big.txt", max_bytes=4096, chunk_size=1024)
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_content_must_match_extension(self):
+        for data, filename in [(b"hello", "fake.pdf"), (b"PK\x03\x04junk", "fake.docx"),
+                               (b"\xff\xfe\x00binary", "notes.txt"), (b"plain text", "data.json"),
+                               (b"", "empty.txt"), (b"text", "script.exe")]:
+            with self.assertRaises(IngestError, msg=filename):
+                self._spool(data, filename)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.assertEqual(self._spool(b' \n{"name": "Jane"}', "data.json")["format"], "json")
+
+    def test_real_docx_and_pdf_are_accepted(self):
+        import docx
+        import fitz
+        docx_path = os.path.join(self.temp_dir, "source.docx")
+        document = docx.Document()
+        document.add_paragraph("Contact jane.doe@example.com")
+        document.save(docx_path)
+        pdf = fitz.open()
+        pdf.new_page().insert_text((72, 72), "Contact jane.doe@example.com")
+        pdf_bytes = pdf.tobytes()
+        pdf.close()
+        with open(docx_path, "rb") as f:
+            docx_bytes = f.read()
+
+        self.assertEqual(self._spool(docx_bytes, "contract.docx", chunk_size=5)["format"], "docx")
+        self.assertEqual(self._spool(pdf_bytes, "scan.pdf")["format"], "pdf")
+
+    def test_flask_single_rejects_oversized_upload(self):
+        from run import create_app
+        from config import Config
+
+        original = Config.MAX_UPLOAD_BYTES
+        Config.MAX_UPLOAD_BYTES = 1024
+        try:
+            response = create_app().test_client().post("/redact/single", data={
+                "complianceNum": "1", "file": (io.BytesIO(b"x" * 2048), "big.txt"),
+            }, content_type="multipart/form-data")
+        finally:
+            Config.MAX_UPLOAD_BYTES = original
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("too large", response.get_json()["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from app.utils.jobs import JobStore, JobWorkerPool, summarize_job
+
+
+def fake_process_file(input_path, compliance_type, work_dir):
+    if input_path.endswith("clean.txt"):
+        return None, None
+    if input_path.endswith("broken.txt"):
+        raise ValueError("cannot parse")
+    output_path = os.path.join(work_dir, "out_" + os.path.basename(input_path))
+    audit_path = os.path.join(work_dir, "audit_" + os.path.basename(input_path) + ".json")
+    for path in (output_path, audit_path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(compliance_type)
+    return output_path, audit_path
+
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.temp_dir, "jobs.db"))
+        self.pool = JobWorkerPool(self.store, fake_process_file, self.temp_dir, workers=1)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_job(self, job_id, names):
+        files = []
+        for name in names:
+            path = os.path.join(self.pool.job_dir(job_id), name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("data")
+            files.append((name, path))
+        return self.store.create_job(job_id, "GDPR", files)
+
+    def test_run_job_records_per_file_progress(self):
+        job_id = self._create_job("job-1", ["a.txt", "clean.txt", "broken.txt"])
+        self.pool.run_job(job_id)
+        summary = summarize_job(self.store.get_job(job_id))
+        self.assertEqual(summary["status"], "completed")
+        self.assertEqual(summary["progress"], {"processed": 3, "total": 3})
+        self.assertEqual([f["status"] for f in summary["files"]], ["redacted", "no_pii", "error"])
+        with zipfile.ZipFile(self.store.get_job(job_id)["result_path"]) as zipf:
+            self.assertIn("redacted/out_a.txt", zipf.namelist())
+
+    def test_unfinished_jobs_resume_after_restart(self):
+        job_id = self._create_job("job-2", ["a.txt", "b.txt"])
+        self.store.mark_job(job_id, "running")
+        self.store.mark_file(job_id, 0, "redacted", "done.txt", "done.json")
+        self.store.close()
+
+        # A fresh store on the same database sees the interrupted job
+        self.store = JobStore(os.path.join(self.temp_dir, "jobs.db"))
+        self.pool = JobWorkerPool(self.store, fake_process_file, self.temp_dir, workers=1)
+        self.assertEqual(self.store.unfinished_jobs(), [job_id])
+        self.pool.run_job(job_id)
+        files = self.store.get_job(job_id)["files"]
+        self.assertEqual(files[0]["output_path"], "done.txt")
+        self.assertEqual(files[1]["status"], "redacted")
+
+
+if __name__ == '__main__':
+    unittest.main()
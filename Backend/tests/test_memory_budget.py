@@ -0,0 +1,136 @@
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from app.utils import memory_budget
+from app.utils.executors import AdmissionRejected
+from app.utils.memory_budget import MB, MemoryBudget, estimate_cost
+
+
+class TestMemoryBudget(unittest.TestCase):
+
+    def test_estimate_grows_with_format_size_and_pages(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            paths = {}
+            for name in ("notes.txt", "data.json"):
+                paths[name] = os.path.join(temp_dir, name)
+                with open(paths[name], "w", encoding="utf-8") as f:
+                    f.write("x" * 100000)
+            self.assertGreater(estimate_cost(paths["data.json"]), estimate_cost(paths["notes.txt"]))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        self.assertGreater(estimate_cost("scan.pdf", size=MB, pages=500), estimate_cost("scan.pdf", size=MB, pages=5))
+        self.assertGreater(estimate_cost("big.txt", size=500 * MB), 500 * MB)
+
+    def test_queues_in_order_and_rejects_after_timeout(self):
+        budget = MemoryBudget(100, timeout=0.05)
+        order = []
+        with budget.reserve(60):
+            with self.assertRaises(AdmissionRejected):
+                with budget.reserve(60):
+                    pass
+            self.assertEqual(budget.stats()["rejected"], 1)
+
+            def job(name, cost):
+                with budget.reserve(cost, timeout=float("inf")):
+                    order.append(name)
+
+            big = threading.Thread(target=job, args=("big", 90))
+            big.start()
+            while budget.stats()["waiting"] < 1:
+                time.sleep(0.001)
+            # 30 would fit next to the 60 now, but the big job is first in line
+            small = threading.Thread(target=job, args=("small", 30))
+            small.start()
+            while budget.stats()["waiting"] < 2:
+                time.sleep(0.001)
+            self.assertEqual(order, [])
+        big.join()
+        small.join()
+        self.assertEqual(order, ["big", "small"])
+        self.assertEqual(budget.stats()["reserved_bytes"], 0)
+
+    def test_oversized_document_runs_alone_and_full_queue_rejects(self):
+        budget = MemoryBudget(100, timeout=0, max_waiting=0)
+        with budget.reserve(500):
+            self.assertEqual(budget.stats()["reserved_bytes"], 500)
+            with self.assertRaises(AdmissionRejected):
+                with budget.reserve(1):
+                    pass
+
+    def test_async_waiter_is_woken_by_a_thread_release(self):
+        budget = MemoryBudget(100, timeout=5)
+
+        async def scenario():
+            held = threading.Event()
+            release = threading.Event()
+
+            def hold():
+                with budget.reserve(80):
+                    held.set()
+                    release.wait()
+
+            thread = threading.Thread(target=hold)
+            thread.start()
+            held.wait()
+            with self.assertRaises(AdmissionRejected):
+                async with budget.areserve(50, timeout=0.05):
+                    pass
+            asyncio.get_running_loop().call_later(0.05, release.set)
+            async with budget.areserve(50):
+                stats = budget.stats()
+            thread.join()
+            return stats
+
+        stats = asyncio.run(scenario())
+        self.assertEqual(stats["reserved_bytes"], 50)
+        self.assertEqual(budget.stats()["running"], 0)
+
+    def test_flask_answers_503_with_retry_after_and_reports_memory(self):
+        import routes
+        from run import create_app
+        from config import Config
+
+        def build_coordinator():
+            # Regex-only, so the request neither downloads nor loads a model
+            return routes.CoordinatorAgent(memory=memory_budget.get_memory_budget())
+
+        # Every request temp dir is recorded, so a leaked upload shows up
+        created = []
+        mkdtemp = tempfile.mkdtemp
+
+        def tracking_mkdtemp(*args, **kwargs):
+            created.append(mkdtemp(*args, **kwargs))
+            return created[-1]
+
+        original = (memory_budget._memory_budget, Config.RESULT_CACHE_ENABLED, Config.MODEL_WARMUP_ON_STARTUP,
+                    routes.build_coordinator)
+        budget = memory_budget._memory_budget = MemoryBudget(1024, timeout=0, max_waiting=0, retry_after=7)
+        Config.RESULT_CACHE_ENABLED, Config.MODEL_WARMUP_ON_STARTUP = False, False
+        routes.build_coordinator, tempfile.mkdtemp = build_coordinator, tracking_mkdtemp
+        try:
+            client = create_app().test_client()
+            with budget.reserve(1024):
+                response = client.post("/redact/single", data={
+                    "complianceNum": "1", "file": (io.BytesIO(b"Mail jane@example.com"), "note.txt"),
+                }, content_type="multipart/form-data")
+                health = client.get("/health").get_json()
+        finally:
+            (memory_budget._memory_budget, Config.RESULT_CACHE_ENABLED, Config.MODEL_WARMUP_ON_STARTUP,
+             routes.build_coordinator) = original
+            tempfile.mkdtemp = mkdtemp
+        self.assertEqual(response.status_code, 503)
+        self.assertTrue(created)
+        self.assertEqual([path for path in created if os.path.exists(path)], [])
+        self.assertEqual(response.headers["Retry-After"], "7")
+        self.assertEqual(health["memory"]["reserved_bytes"], 1024)
+        self.assertGreater(health["memory"]["rss_bytes"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.utils.metrics import MetricsRegistry, ENTITIES, STAGE_SECONDS
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="regex")
+        histogram.observe(0.5, stage="regex")
+        text = registry.render()
+        self.assertIn('stage_seconds_bucket{stage="regex",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="regex",le="1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="regex",le="+Inf"} 2', text)
+        self.assertIn('stage_seconds_count{stage="regex"} 2', text)
+
+    def test_counter_renders_labels(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("documents_total", "Documents", ["format", "status"])
+        counter.inc(format="txt", status="redacted")
+        counter.inc(2, format="txt", status="redacted")
+        self.assertIn("# TYPE documents_total counter", registry.render())
+        self.assertIn('documents_total{format="txt",status="redacted"} 3', registry.render())
+
+    def test_flask_metrics_endpoint_reports_pipeline_stages(self):
+        from run import create_app
+        from routes import CoordinatorAgent
+        from app.agents.audit_agent import AuditAgent
+        from app.utils.audit_log import AuditLogWriter
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "note.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("Reach me at jane.doe@example.com")
+            emails_before = ENTITIES.value(type="email")
+            regex_runs_before = STAGE_SECONDS.count(stage="regex")
+            coordinator = CoordinatorAgent()
+            coordinator.audit = AuditAgent(AuditLogWriter(os.path.join(temp_dir, "audit")))
+            coordinator.handle_file(path, "GDPR", temp_dir)
+            coordinator.audit.writer.close()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        self.assertEqual(ENTITIES.value(type="email"), emails_before + 1)
+        self.assertEqual(STAGE_SECONDS.count(stage="regex"), regex_runs_before + 1)
+        response = create_app().test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('redaction_load_seconds_count{format="txt"}', body)
+        self.assertIn('redaction_stage_seconds_count{stage="audit_write"}', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
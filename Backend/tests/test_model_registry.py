@@ -0,0 +1,51 @@
+import unittest
+from app.utils.model_registry import ModelRegistry
+
+
+class FakeGliner:
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_entities(self, text, labels=None, threshold=0.5):
+        self.calls += 1
+        return []
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ModelRegistry()
+        # Skip the LLM so nothing touches the network
+        self.registry._llm_loaded = True
+        self.model = FakeGliner()
+
+    def _preload(self):
+        self.registry._gliner = self.model
+        self.registry._gliner_loaded = True
+
+    def test_models_are_shared_between_callers(self):
+        self._preload()
+        self.assertIs(self.registry.get_gliner(), self.model)
+        self.assertIs(self.registry.get_gliner(), self.registry.get_gliner())
+
+    def test_warmup_runs_one_inference_and_marks_ready(self):
+        self._preload()
+        self.assertFalse(self.registry.status()["ready"])
+        self.registry.warmup()
+        status = self.registry.status()
+        self.assertTrue(status["ready"])
+        self.assertTrue(status["gliner_loaded"])
+        self.assertEqual(self.model.calls, 1)
+
+    def test_missing_model_still_becomes_ready(self):
+        self.registry.gliner_model_name = "/nonexistent/gliner_model"
+        self.registry.warmup()
+        status = self.registry.status()
+        self.assertTrue(status["ready"])
+        self.assertFalse(status["gliner_loaded"])
+        self.assertIn("gliner", status["errors"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from app.agents.detectors import scan_spans
+from app.utils import parallel_scan
+from app.utils.parallel_scan import scan_spans_parallel, shard_bounds
+
+
+class TestParallelScan(unittest.TestCase):
+
+    def setUp(self):
+        lines = []
+        for i in range(400):
+            lines.append(f"Call {i:03d} 555 {i % 1000:03d} 1234 or card 4111 1111 1111 {i:04d} "
+                         f"and mail user{i}@example.com from 10.0.{i % 256}.7 now.")
+        self.text = "\n".join(lines)
+
+    def test_shards_are_cut_after_whitespace(self):
+        bounds = shard_bounds(self.text, 1000)
+        self.assertEqual(bounds[0], 0)
+        self.assertEqual(bounds[-1], len(self.text))
+        for bound in bounds[1:-1]:
+            self.assertIn(self.text[bound - 1], " \n")
+        self.assertEqual(shard_bounds("x" * 25, 10), [0, 10, 20, 25])
+
+    def test_matches_serial_scan_across_shard_boundaries(self):
+        expected = list(scan_spans(self.text).spans())
+        # Shards of a few hundred chars cut through phones and spaced card numbers all over
+        for shard_chars, overlap_chars in [(300, 64), (997, 32), (4096, 4096)]:
+            found = scan_spans_parallel(self.text, workers=2, shard_chars=shard_chars,
+                                        overlap_chars=overlap_chars, min_chars=0)
+            self.assertEqual(list(found.spans()), expected, (shard_chars, overlap_chars))
+
+    def test_respects_types_and_non_ascii_offsets(self):
+        text = "Ünïcödé " * 50 + self.text
+        expected = list(scan_spans(text, ["phone", "credit_card"]).spans())
+        found = scan_spans_parallel(text, ["phone", "credit_card"], workers=2, shard_chars=500, min_chars=0)
+        self.assertEqual(list(found.spans()), expected)
+
+    def test_small_texts_scan_serially(self):
+        found = scan_spans_parallel(self.text, workers=3, shard_chars=1000)
+        self.assertNotIn(3, parallel_scan._scan_pools)
+        self.assertEqual(list(found.spans()), list(scan_spans(self.text).spans()))
+
+
+if __name__ == '__main__':
+    unittest.main()
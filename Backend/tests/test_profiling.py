@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.utils.profiling import StageProfiler, profile_options
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_disabled_profiler_reports_nothing(self):
+        profiler = StageProfiler()
+        with profiler.stage("load"):
+            pass
+        self.assertIsNone(profiler.report())
+
+    def test_stage_records_time_memory_and_hot_functions(self):
+        profiler = StageProfiler(enabled=True, top_n=3)
+        with profiler.stage("detect"):
+            data = [str(i) * 10 for i in range(20000)]
+        report = profiler.report()
+        stage = report["stages"]["detect"]
+        self.assertGreater(stage["wall_ms"], 0)
+        self.assertGreater(stage["peak_memory_kb"], 100)
+        self.assertLessEqual(len(stage["hot_functions"]), 3)
+        self.assertEqual(report["total_wall_ms"], stage["wall_ms"])
+        del data
+
+    def test_profile_options_parse_form_values(self):
+        self.assertEqual(profile_options("true", "5"), {"enabled": True, "top_n": 5})
+        self.assertEqual(profile_options(None, "5"), {"enabled": False, "top_n": 0})
+        self.assertEqual(profile_options("1", "abc"), {"enabled": True, "top_n": 0})
+
+    def test_coordinator_writes_profile_into_audit_metadata(self):
+        from routes import CoordinatorAgent
+        from app.agents.audit_agent import AuditAgent
+        from app.utils.audit_log import AuditLogWriter, read_record
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "note.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("Reach me at jane.doe@example.com")
+            coordinator = CoordinatorAgent()
+            coordinator.audit = AuditAgent(AuditLogWriter(os.path.join(temp_dir, "audit")))
+            _, audit_record = coordinator.handle_file(
+                path, "GDPR", temp_dir, profile_options("true", "2")
+            )
+            coordinator.audit.writer.close()
+            metadata = read_record(os.path.join(temp_dir, "audit"), audit_record["record_id"])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        stages = metadata["profile"]["stages"]
+        self.assertEqual(list(stages), ["load", "detect", "redact", "save", "llm_validate"])
+        self.assertIn("hot_functions", stages["detect"])
+
+
+if __name__ == '__main__':
+    unittest.main()
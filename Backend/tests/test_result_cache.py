@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from app.utils.result_cache import ResultCache, cache_key, file_digest
+from app.utils.metrics import CACHE_HITS
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _artifact(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_key_depends_on_content_compliance_and_version(self):
+        digest = file_digest(self._artifact("a.txt", "hello"))
+        self.assertNotEqual(cache_key(digest, "GDPR", "1"), cache_key(digest, "HIPAA", "1"))
+        self.assertNotEqual(cache_key(digest, "GDPR", "1"), cache_key(digest, "GDPR", "2"))
+        self.assertEqual(cache_key(digest, "GDPR", "1"), cache_key(digest, "GDPR", "1"))
+
+    def test_put_get_and_reload(self):
+        cache = ResultCache(self.cache_dir)
+        output = self._artifact("out_redacted.txt", "[REDACTED]")
+        cache.put("k1", output, {"record_id": "abc", "total_redacted_items": 1, "file_path": output})
+        cache.put("k2", None, None)
+
+        entry = ResultCache(self.cache_dir).get("k1")
+        self.assertEqual(entry["audit"], {"total_redacted_items": 1})
+        copy = cache.materialize(entry, self.temp_dir)
+        with open(copy, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "[REDACTED]")
+        self.assertIsNone(cache.materialize(cache.get("k2"), self.temp_dir))
+        self.assertIsNone(cache.get("missing"))
+
+    def test_ttl_expires_entries(self):
+        cache = ResultCache(self.cache_dir, ttl_seconds=0.05)
+        cache.put("k", self._artifact("o.txt", "x"), {"total_redacted_items": 1})
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_quota_evicts_least_recently_used(self):
+        cache = ResultCache(self.cache_dir, max_bytes=2500)
+        for key in ("a", "b"):
+            cache.put(key, self._artifact(f"{key}.txt", "x" * 1000), {"total_redacted_items": 1})
+        cache.get("a")
+        cache.put("c", self._artifact("c.txt", "x" * 1000), {"total_redacted_items": 1})
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertLessEqual(cache.stats()["bytes"], 2500)
+
+    def test_flight_computes_once(self):
+        cache = ResultCache(self.cache_dir)
+        computed = []
+
+        def request():
+            with cache.flight("k"):
+                if cache.get("k") is None:
+                    time.sleep(0.05)
+                    computed.append(1)
+                    cache.put("k", None, None)
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(computed), 1)
+
+    def test_coordinator_serves_repeat_upload_from_cache(self):
+        from routes import CoordinatorAgent
+        from app.agents.audit_agent import AuditAgent
+        from app.utils.audit_log import AuditLogWriter
+
+        path = self._artifact("note.txt", "Reach me at jane.doe@example.com")
+        coordinator = CoordinatorAgent(cache=ResultCache(self.cache_dir))
+        coordinator.audit = AuditAgent(AuditLogWriter(os.path.join(self.temp_dir, "audit")))
+        hits_before = CACHE_HITS.value(cache="result")
+        first_output, first_record = coordinator.handle_file(path, "GDPR", self.temp_dir)
+        second_output, second_record = coordinator.handle_file(path, "GDPR", self.temp_dir)
+        other_output, _ = coordinator.handle_file(path, "HIPAA", self.temp_dir)
+        coordinator.audit.writer.close()
+
+        self.assertEqual(CACHE_HITS.value(cache="result"), hits_before + 1)
+        self.assertNotEqual(first_output, second_output)
+        with open(first_output, encoding="utf-8") as a, open(second_output, encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertTrue(second_record["cache_hit"])
+        self.assertNotEqual(second_record["record_id"], first_record["record_id"])
+        self.assertEqual(second_record["redacted_items_by_type"], first_record["redacted_items_by_type"])
+        self.assertIsNotNone(other_output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.agents.detectors import scan_regex
+from app.utils.revisions import RevisionStore, chunk_hash, detect_incremental, split_chunks
+
+
+def contract(clause_7: str) -> str:
+    lines = []
+    for i in range(400):
+        if i == 7 * 40:
+            lines.append(clause_7)
+        else:
+            lines.append(f"Clause {i}: the parties agree to the terms set out in schedule {i % 9}.")
+        if i % 50 == 0:
+            lines.append(f"Notices for section {i} go to legal{i}@example.com.")
+    return "\n".join(lines) + "\n"
+
+
+class TestRevisions(unittest.TestCase):
+
+    def test_chunks_cover_text_and_survive_local_edits(self):
+        before = contract("Clause 280: payment within 30 days.")
+        after = contract("Clause 280: payment within 45 days, call 555-123-4567 with questions.")
+        spans = split_chunks(before)
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(before))
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(spans, spans[1:])))
+
+        old = {chunk_hash(before[s:e]) for s, e in spans}
+        new = [chunk_hash(after[s:e]) for s, e in split_chunks(after)]
+        self.assertLessEqual(sum(1 for h in new if h not in old), 2)
+
+    def test_only_changed_chunks_are_rescanned(self):
+        scanned = []
+
+        def detect(text):
+            scanned.append(len(text))
+            return scan_regex(text)
+
+        items, state, report = detect_incremental(detect, contract("Clause 280: payment within 30 days."))
+        self.assertEqual(report["revision"], 1)
+        self.assertEqual(report["chunks_reused"], 0)
+        self.assertEqual(len(items), 8)
+
+        scanned.clear()
+        revised = contract("Clause 280: payment within 45 days, call 555-123-4567 with questions.")
+        items, state, report = detect_incremental(detect, revised, state)
+        self.assertEqual(report["revision"], 2)
+        self.assertLessEqual(len(scanned), 2)
+        self.assertEqual(report["chars_scanned"], sum(scanned))
+        self.assertEqual(report["chars_reused"] + report["chars_scanned"], len(revised))
+        self.assertIn({"type": "phone", "value": "555-123-4567"}, items)
+        self.assertEqual(len(items), 9)
+
+    def test_coordinator_reports_reuse_in_audit_record(self):
+        from routes import CoordinatorAgent
+        from app.agents.audit_agent import AuditAgent
+        from app.utils.audit_log import AuditLogWriter
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            coordinator = CoordinatorAgent(revisions=RevisionStore(os.path.join(temp_dir, "revisions")))
+            coordinator.audit = AuditAgent(AuditLogWriter(os.path.join(temp_dir, "audit")))
+            records = []
+            for clause in ("Clause 280: payment within 30 days.", "Clause 280: payment within 60 days."):
+                path = os.path.join(temp_dir, "contract.txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(contract(clause))
+                records.append(coordinator.handle_file(path, "GDPR", temp_dir, document_id="contract-17")[1])
+            coordinator.audit.writer.close()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        first, second = records[0]["incremental"], records[1]["incremental"]
+        self.assertEqual(first["chunks_reused"], 0)
+        self.assertEqual(second["revision"], 2)
+        self.assertGreater(second["chunks_reused"], 0)
+        self.assertGreater(second["chars_reused"], second["chars_scanned"])
+        self.assertEqual(records[1]["total_redacted_items"], records[0]["total_redacted_items"])
+
+    def test_revisions_bypass_the_result_cache(self):
+        from routes import CoordinatorAgent
+        from app.agents.audit_agent import AuditAgent
+        from app.utils.audit_log import AuditLogWriter
+        from app.utils.result_cache import ResultCache
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            coordinator = CoordinatorAgent(cache=ResultCache(os.path.join(temp_dir, "cache")),
+                                           revisions=RevisionStore(os.path.join(temp_dir, "revisions")))
+            coordinator.audit = AuditAgent(AuditLogWriter(os.path.join(temp_dir, "audit")))
+            path = os.path.join(temp_dir, "contract.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(contract("Clause 280: payment within 30 days."))
+            # Identical content twice: a cache hit would skip the revision and its report
+            records = [coordinator.handle_file(path, "GDPR", temp_dir, document_id="contract-17")[1]
+                       for _ in range(2)]
+            coordinator.audit.writer.close()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        self.assertEqual([r["incremental"]["revision"] for r in records], [1, 2])
+        self.assertEqual(records[1]["incremental"]["chars_scanned"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ["torch", "gliner", "langchain_google_genai", "fitz", "PyPDF2", "reportlab", "docx"]
+
+
+class TestStartup(unittest.TestCase):
+
+    def _imported_heavy_modules(self, module):
+        code = (
+            f"import sys, contextlib, io\n"
+            f"with contextlib.redirect_stdout(io.StringIO()):\n"
+            f"    import {module}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        return [m for m in result.stdout.strip().split(",") if m]
+
+    def test_flask_routes_import_without_heavy_backends(self):
+        self.assertEqual(self._imported_heavy_modules("routes"), [])
+
+    def test_fastapi_app_imports_without_heavy_backends(self):
+        self.assertEqual(self._imported_heavy_modules("fast_api_test"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
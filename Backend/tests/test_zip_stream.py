@@ -0,0 +1,43 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from app.utils.zip_stream import stream_zip
+
+
+class TestZipStream(unittest.TestCase):
+
+    def test_stream_zip_produces_valid_archive(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "big.txt")
+            with open(path, "wb") as f:
+                f.write(os.urandom(300 * 1024))
+
+            def entries():
+                yield "redacted/big.txt", path
+                yield "audit_logs/audit.json", b'{"ok": true}'
+
+            chunks = list(stream_zip(entries()))
+            self.assertGreater(len(chunks), 2)
+            with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zipf:
+                self.assertEqual(zipf.namelist(), ["redacted/big.txt", "audit_logs/audit.json"])
+                with open(path, "rb") as f:
+                    self.assertEqual(zipf.read("redacted/big.txt"), f.read())
+                self.assertIsNone(zipf.testzip())
+
+    def test_entries_are_pulled_lazily(self):
+        pulled = []
+
+        def entries():
+            for i in range(3):
+                pulled.append(i)
+                yield f"file_{i}.txt", b"x" * 10
+
+        chunks = stream_zip(entries())
+        next(chunks)
+        self.assertEqual(pulled, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
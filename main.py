@@ -1,44 +1,82 @@
 import os
+import sys
 import json
-import docx
-from PyPDF2 import PdfReader
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from docx import Document
 import re
+import glob
+import hashlib
+import uuid
+import fnmatch
+import argparse
+import contextlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from typing import List
-import fitz  # PyMuPDF
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import time
-from gliner import GLiNER
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-try:
-    gliner = GLiNER.from_pretrained("urchade/gliner_medium-v2.1")
-    print("✅ GLiNER NER model loaded")
-except Exception as e:
-    print(f"❌ Failed to load GLiNER model: {e}")
-    gliner = None
-
-try:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0,
-        google_api_key=GEMINI_API_KEY,
-        timeout=30
-    )
-    print("✅ LLM loaded for compliance validation")
-except Exception as e:
-    print(f"❌ Failed to load Gemini LLM: {e}")
-    llm = None
+# Person-name allow/deny lists are compiled by the Backend package, shared with the services
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Backend"))
+from app.utils.gazetteer import Gazetteer, filter_person_names, gazetteer_for
+from app.agents.compliance_agent import build_detection_plan
+from app.agents.detectors import GLINER_LABELS
+from app.utils.profiling import StageProfiler
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer:
+    """Name lists from NAME_ALLOWLIST_PATHS / NAME_DENYLIST_PATHS / NAME_DENY_TERM_PATHS, compiled once per process"""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = gazetteer_for(os.getenv("NAME_ALLOWLIST_PATHS", ""), os.getenv("NAME_DENYLIST_PATHS", ""),
+                                       os.getenv("NAME_DENY_TERM_PATHS", ""),
+                                       os.getenv("GAZETTEER_CACHE_DIR", "gazetteer_cache"))
+    return _gazetteer
+
+WARMUP_TEXT = "John Smith from Acme Corp emailed john.smith@example.com about the Paris office."
+
+def load_models(warmup: bool = True) -> tuple:
+    """Load GLiNER and the LLM once for the whole session; returns (gliner, llm)"""
+    try:
+        from gliner import GLiNER
+        gliner = GLiNER.from_pretrained(os.getenv("GLINER_MODEL", "urchade/gliner_medium-v2.1"))
+        print("✅ GLiNER NER model loaded")
+    except Exception as e:
+        print(f"❌ Failed to load GLiNER model: {e}")
+        gliner = None
+
+    try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash",
+            temperature=0,
+            google_api_key=GEMINI_API_KEY,
+            timeout=30
+        )
+        print("✅ LLM loaded for compliance validation")
+    except Exception as e:
+        print(f"❌ Failed to load Gemini LLM: {e}")
+        llm = None
+
+    # One throwaway inference so the first real file does not pay for lazy initialisation
+    if gliner is not None and warmup:
+        start = time.perf_counter()
+        try:
+            gliner.predict_entities(WARMUP_TEXT, labels=["Person", "Organization", "Email"], threshold=0.5)
+            print(f"🔥 GLiNER warmed up in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            print(f"⚠️ GLiNER warmup failed: {e}")
+    return gliner, llm
 
 
 class RunnerAgent:
     def load_text(self, file_path: str) -> str:
         if file_path.endswith(".pdf"):
+            from PyPDF2 import PdfReader
             reader = PdfReader(file_path)
             text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
 
@@ -52,6 +90,7 @@ class RunnerAgent:
                 text = json.dumps(self.json_data, indent=2)
 
         elif file_path.endswith(".docx"):
+            import docx
             doc = docx.Document(file_path)
             text = "\n".join([para.text for para in doc.paragraphs])
 
@@ -89,12 +128,15 @@ class RunnerAgent:
                     f.write(redacted_text)
 
         elif file_type == "docx":
+            from docx import Document
             doc = Document()
             for paragraph in redacted_text.split("\n"):
                 doc.add_paragraph(paragraph)
             doc.save(output_path)
 
         elif file_type == "pdf":
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.pagesizes import letter
             c = canvas.Canvas(output_path, pagesize=letter)
             lines = redacted_text.split("\n")
             width, height = letter
@@ -108,35 +150,35 @@ class RunnerAgent:
             c.save()
 
 class RedactorAgent:
-    def __init__(self):
-        # Common non-names to exclude
-        self.name_exclusions = {
-            'united states', 'new york', 'los angeles', 'san francisco',
-            'machine learning', 'data science', 'artificial intelligence',
-            'google drive', 'microsoft office', 'adobe acrobat', 'dear sir',
-            'dear madam', 'yours truly', 'best regards', 'thank you',
-            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'
-        }
+    def __init__(self, gliner_model=None, gazetteer: Gazetteer = None):
+        self.gliner = gliner_model
+        # Compiled allow/deny lists for person names; the process-wide ones unless injected
+        self.gazetteer = gazetteer
     
-    def detect_sensitive_info(self, text: str) -> List[dict]:
-        """Detect sensitive information using GLiNER + regex fallback"""
+    def detect_sensitive_info(self, text: str, plan: dict = None) -> List[dict]:
+        """Detect sensitive information using GLiNER + regex fallback, limited to the plan if given"""
         all_results = []
+        labels = plan["gliner_labels"] if plan else GLINER_LABELS
         
         # Try GLiNER first
-        if gliner is not None:
+        if self.gliner is not None and labels:
             try:
                 print("🔍 Using GLiNER for entity detection...")
-                gliner_results = self._detect_with_gliner(text)
+                gliner_results = self._detect_with_gliner(text, labels)
                 all_results.extend(gliner_results)
                 print(f"🤖 GLiNER found {len(gliner_results)} entities")
             except Exception as e:
                 print(f"❌ GLiNER detection failed: {e}")
         
         # Always run regex fallback for additional coverage
-        regex_results = self._regex_fallback(text)
+        regex_results = self._regex_fallback(text, plan["regex_types"] if plan else None)
         all_results.extend(regex_results)
         print(f"🔍 Regex found {len(regex_results)} additional items")
         
+        # Drop types the plan does not cover
+        if plan:
+            all_results = [item for item in all_results if item["type"] in plan["entity_types"]]
+        
         # Deduplicate results
         unique_items = {}
         for item in all_results:
@@ -148,14 +190,14 @@ class RedactorAgent:
         
         return final_results
     
-    def _detect_with_gliner(self, text: str) -> List[dict]:
+    def _detect_with_gliner(self, text: str, labels: List[str] = None) -> List[dict]:
         """Use GLiNER for Named Entity Recognition"""
-        labels = ["Person", "Organization", "Date", "Email", "Phone", "Location", "URL", "Money", "Time"]
+        labels = labels or GLINER_LABELS
         
         try:
             # Limit text length for processing
             text_chunk = text[:5000]  # Process first 5000 characters
-            entities = gliner.predict_entities(text_chunk, labels=labels, threshold=0.4)
+            entities = self.gliner.predict_entities(text_chunk, labels=labels, threshold=0.4)
             
             results = []
             for ent in entities:
@@ -183,8 +225,8 @@ class RedactorAgent:
             print(f"❌ GLiNER processing error: {e}")
             return []
     
-    def _regex_fallback(self, text: str) -> List[dict]:
-        """Enhanced regex patterns for additional coverage"""
+    def _regex_fallback(self, text: str, types: List[str] = None) -> List[dict]:
+        """Enhanced regex patterns for additional coverage; only the given types when set"""
         patterns = {
             "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
             "phone": [
@@ -201,14 +243,15 @@ class RedactorAgent:
         }
         
         found = []
+        types = set(patterns) if types is None else set(types)
         
         # Email detection
-        emails = re.findall(patterns["email"], text, re.IGNORECASE)
+        emails = re.findall(patterns["email"], text, re.IGNORECASE) if "email" in types else []
         for email in emails:
             found.append({"type": "email", "value": email})
         
         # Phone detection
-        for pattern in patterns["phone"]:
+        for pattern in patterns["phone"] if "phone" in types else []:
             phones = re.findall(pattern, text)
             for phone in phones:
                 # Validate phone number
@@ -217,24 +260,24 @@ class RedactorAgent:
                     found.append({"type": "phone", "value": phone})
         
         # URL detection
-        urls = re.findall(patterns["url"], text)
+        urls = re.findall(patterns["url"], text) if "url" in types else []
         for url in urls:
             found.append({"type": "url", "value": url})
         
         # SSN detection
-        ssns = re.findall(patterns["ssn"], text)
+        ssns = re.findall(patterns["ssn"], text) if "ssn" in types else []
         for ssn in ssns:
             found.append({"type": "ssn", "value": ssn})
         
         # Credit card detection
-        cards = re.findall(patterns["credit_card"], text)
+        cards = re.findall(patterns["credit_card"], text) if "credit_card" in types else []
         for card in cards:
             digits_only = re.sub(r'\D', '', card)
             if len(digits_only) == 16:
                 found.append({"type": "credit_card", "value": card})
         
         # IP address detection
-        ips = re.findall(patterns["ip_address"], text)
+        ips = re.findall(patterns["ip_address"], text) if "ip_address" in types else []
         for ip in ips:
             octets = ip.split('.')
             if all(0 <= int(octet) <= 255 for octet in octets):
@@ -243,30 +286,8 @@ class RedactorAgent:
         return found
     
     def _is_likely_person_name(self, name: str) -> bool:
-        """Enhanced name validation"""
-        name_lower = name.lower()
-        if name_lower in self.name_exclusions:
-            return False
-        
-        non_name_patterns = [
-            r'\b(mr|mrs|ms|dr|prof|sir|madam)\b',
-            r'\b(inc|llc|corp|ltd|co)\b',
-            r'\b(street|avenue|road|drive|lane)\b',
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\b'
-        ]
-        
-        for pattern in non_name_patterns:
-            if re.search(pattern, name_lower):
-                return False
-        
-        words = name.split()
-        if len(words) < 2 or len(words) > 4:
-            return False
-        
-        if any(len(word) < 2 or len(word) > 20 for word in words):
-            return False
-            
-        return True
+        """Allow/deny lists first; names neither list decides must be 2-4 words of 2-20 characters"""
+        return filter_person_names([name], self.gazetteer or get_gazetteer())[0]
     
     def redact(self, text: str, sensitive_items: List[dict]) -> str:
         """FIXED: Precise redaction that only replaces the sensitive data"""
@@ -315,6 +336,7 @@ class RedactorAgent:
     def redact_pdf_pymupdf(self, file_path: str, sensitive_items: List[dict], output_path: str):
         """Enhanced PDF redaction with better text matching"""
         try:
+            import fitz  # PyMuPDF
             doc = fitz.open(file_path)
             total_redactions = 0
             for page_num in range(len(doc)):
@@ -366,6 +388,13 @@ class PIIAgent:
         return matches
 
 class ComplianceAgent:
+    def __init__(self, llm=None):
+        self.llm = llm
+
+    def plan_detection(self, compliance_type: str) -> dict:
+        """Detection plan so the redactor only runs detectors the regime cares about"""
+        return build_detection_plan(compliance_type)
+
     def apply_policy(self, pii_items: list, compliance_type: str) -> list:
         """Enhanced compliance policy application"""
         redactions = []
@@ -382,7 +411,7 @@ class ComplianceAgent:
 
     def validate_redaction(self, redacted_text: str, compliance_type: str) -> str:
         """Enhanced compliance validation"""
-        if llm is None:
+        if self.llm is None:
             return f"Compliance validation skipped - LLM not available. Processed with {compliance_type} standards."
         try:
             prompt = (
@@ -394,14 +423,14 @@ class ComplianceAgent:
                 f"Return a brief assessment (2-3 sentences) of compliance status.\n\n"
                 f"Redacted Text:\n{redacted_text[:1000]}"  # Limit for API
             )
-            result = llm.invoke(prompt)
+            result = self.llm.invoke(prompt)
             return result.content if hasattr(result, 'content') else str(result)
             
         except Exception as e:
             return f"Compliance validation completed with basic standards. Error: {str(e)}"
         
 class AuditAgent:
-    def log_metadata(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str):
+    def log_metadata(self, original_text: str, redacted_text: str, sensitive_items: List[dict], compliance_feedback: str, file_path: str, profile: dict = None):
         """Enhanced audit logging with more details"""
         item_counts = {}
         for item in sensitive_items:
@@ -423,72 +452,391 @@ class AuditAgent:
             "compliance_notes": str(compliance_feedback),
             "processing_status": "completed"
         }
+        if profile:
+            metadata["profile"] = profile
 
         os.makedirs("audit_logs", exist_ok=True)
         
-        log_file = f"audit_logs/audit_log_{os.path.basename(file_path)}_{int(time.time())}.json"
+        # Parallel workers finish files with the same name within the same second
+        log_file = f"audit_logs/audit_log_{os.path.basename(file_path)}_{int(time.time())}_{uuid.uuid4().hex[:12]}.json"
         with open(log_file, "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=2)
         
         print(f"📋 [AuditAgent] Detailed metadata saved to {log_file}")
 
 class CoordinatorAgent:
-    def __init__(self):
+    def __init__(self, gliner_model=None, llm=None, profile: bool = False, profile_top: int = 0):
         self.runner = RunnerAgent()
-        self.redactor = RedactorAgent()
-        self.compliance = ComplianceAgent()
+        self.redactor = RedactorAgent(gliner_model)
+        self.compliance = ComplianceAgent(llm)
         self.audit = AuditAgent()
-    def handle_files(self, file_paths: List[str], compliance_type: str):
-        """Enhanced file processing with better error handling"""
-        for file_path in file_paths:
-            print(f"\n🔄 Processing: {file_path}")
-        
-            if not os.path.exists(file_path):
-                print(f"❌ File not found: {file_path}")
-                continue
-            
-            try:
+        self.profile = profile
+        self.profile_top = profile_top
+    def handle_file(self, file_path: str, compliance_type: str, output_path: str = None) -> dict:
+        """Redact one file; returns {path, status, output, items, bytes, seconds, error}"""
+        print(f"\n🔄 Processing: {file_path}")
+        result = {"path": file_path, "status": "error", "output": None, "items": 0, "bytes": 0, "error": None}
+        start = time.perf_counter()
+
+        if not os.path.exists(file_path):
+            print(f"❌ File not found: {file_path}")
+            result.update(status="missing", error="File not found", seconds=0.0)
+            return result
+        result["bytes"] = os.path.getsize(file_path)
+
+        profiler = StageProfiler(self.profile, self.profile_top)
+        try:
+            with profiler.stage("load"):
                 original_text = self.runner.load_text(file_path)
-                print(f"📄 Loaded {len(original_text)} characters")
-                pii_items = self.redactor.detect_sensitive_info(original_text)
-                if not pii_items:
-                    print("✅ No sensitive information detected")
-                    continue
-                
-                print(f"🔍 Found {len(pii_items)} sensitive items:")
-                for item in pii_items:
-                    print(f"   - {item['type']}: {item['value'][:30]}{'...' if len(item['value']) > 30 else ''}")
-            
+            print(f"📄 Loaded {len(original_text)} characters")
+            plan = self.compliance.plan_detection(compliance_type)
+            with profiler.stage("detect"):
+                pii_items = self.redactor.detect_sensitive_info(original_text, plan)
+            if not pii_items:
+                print("✅ No sensitive information detected")
+                result.update(status="no_pii", seconds=time.perf_counter() - start)
+                return result
+
+            print(f"🔍 Found {len(pii_items)} sensitive items:")
+            for item in pii_items:
+                print(f"   - {item['type']}: {item['value'][:30]}{'...' if len(item['value']) > 30 else ''}")
+
+            with profiler.stage("redact"):
                 redacted_text = self.redactor.redact(original_text, pii_items)
-                file_ext = os.path.splitext(file_path)[1]
-                output_path = file_path.replace(file_ext, f"_redacted{file_ext}")
-                if file_ext == ".pdf":
+            output_path = output_path or output_path_for(file_path)
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            if file_path.endswith(".pdf"):
+                with profiler.stage("pdf_apply"):
                     self.redactor.redact_pdf_pymupdf(file_path, pii_items, output_path)
-                else:
+            else:
+                with profiler.stage("save"):
                     self.runner.save_redacted_text(redacted_text, file_path, output_path)
 
-                print(f"✅ Redacted file saved at: {output_path}")
+            print(f"✅ Redacted file saved at: {output_path}")
+            with profiler.stage("llm_validate"):
                 feedback = self.compliance.validate_redaction(redacted_text, compliance_type)
-                print(f"📋 Compliance feedback: {feedback[:100]}...")
-                self.audit.log_metadata(original_text, redacted_text, pii_items, feedback, file_path)
-                
-            except Exception as e:
-                print(f"❌ Error processing {file_path}: {str(e)}")
-                import traceback
-                print(f"Full error details: {traceback.format_exc()}")
-                continue
-if __name__ == "__main__":
-    print("🚀 Multi-Agent Sensitive Data Redaction System with GLiNER")
-    print("=" * 60)
-    print(f"GLiNER Status: {'✅ Loaded' if gliner else '❌ Not Available'}")
-    print(f"LLM Status: {'✅ Loaded' if llm else '❌ Not Available'}")
-    print()
+            print(f"📋 Compliance feedback: {feedback[:100]}...")
+            self.audit.log_metadata(original_text, redacted_text, pii_items, feedback, file_path, profile=profiler.report())
+            result.update(status="redacted", output=output_path, items=len(pii_items))
+
+        except Exception as e:
+            print(f"❌ Error processing {file_path}: {str(e)}")
+            import traceback
+            print(f"Full error details: {traceback.format_exc()}")
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def handle_files(self, file_paths: List[str], compliance_type: str) -> List[dict]:
+        """Enhanced file processing with better error handling"""
+        return [self.handle_file(file_path, compliance_type) for file_path in file_paths]
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".json", ".docx")
+
+
+def output_path_for(file_path: str, root: str = None, output_dir: str = None) -> str:
+    """<name>_redacted<ext> beside the input, or at the same path relative to root under output_dir"""
+    base, ext = os.path.splitext(file_path)
+    if output_dir:
+        base = os.path.join(output_dir, os.path.relpath(base, root or os.path.dirname(file_path)))
+    return f"{base}_redacted{ext}"
+
+
+def _glob_root(pattern: str) -> str:
+    """Leading directories of a glob pattern before the first wildcard"""
+    parts = []
+    for part in pattern.replace("\\", "/").split("/"):
+        if any(c in part for c in "*?["):
+            break
+        parts.append(part)
+    return "/".join(parts) or "."
+
+
+def _matches(rel_path: str, patterns: List[str]) -> bool:
+    name = os.path.basename(rel_path)
+    return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def collect_inputs(paths: List[str], include: List[str] = None, exclude: List[str] = None) -> List[tuple]:
+    """(file, root) for each supported file named by paths, which may be files, directories or globs.
+
+    root is the directory the file's output path is mapped relative to. include/exclude are
+    glob patterns matched against the path relative to root or the bare file name. Earlier
+    *_redacted outputs are always skipped so re-running over a tree does not redact them again.
+    """
+    inputs, seen = [], set()
+    for path in paths:
+        if any(c in path for c in "*?["):
+            root, matches = _glob_root(path), sorted(glob.glob(path, recursive=True))
+        elif os.path.isdir(path):
+            root, matches = path, [path]
+        else:
+            root, matches = os.path.dirname(path) or ".", [path]
+        for match in matches:
+            if os.path.isdir(match):
+                files = []
+                for dirpath, dirnames, filenames in os.walk(match):
+                    dirnames.sort()
+                    files.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+            else:
+                files = [match]
+            for file_path in files:
+                base, ext = os.path.splitext(file_path)
+                if ext.lower() not in SUPPORTED_EXTENSIONS or base.endswith("_redacted"):
+                    continue
+                rel_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+                if include and not _matches(rel_path, include):
+                    continue
+                if exclude and _matches(rel_path, exclude):
+                    continue
+                key = os.path.realpath(file_path)
+                if key not in seen:
+                    seen.add(key)
+                    inputs.append((file_path, root))
+    return inputs
+
+
+def plan_outputs(inputs: List[tuple], output_dir: str = None) -> List[tuple]:
+    """(file, output path) for each (file, root) from collect_inputs.
+
+    Under output_dir, files of different roots can map to the same output (a/note.txt and
+    b/note.txt both to note_redacted.txt); every root involved in such a clash keeps its own
+    name as the first path component instead. Raises ValueError if outputs still clash.
+    """
+    def plan(roots_kept=()):
+        tasks, owners = [], {}
+        for file_path, root in inputs:
+            base = os.path.dirname(os.path.abspath(root)) if root in roots_kept else root
+            output = output_path_for(file_path, base, output_dir)
+            tasks.append((file_path, output))
+            owners.setdefault(os.path.normcase(os.path.abspath(output)), []).append(root)
+        return tasks, [roots for roots in owners.values() if len(roots) > 1]
+
+    tasks, clashes = plan()
+    if clashes and output_dir:
+        tasks, clashes = plan({root for roots in clashes for root in roots})
+    if clashes:
+        raise ValueError(f"{sum(len(roots) for roots in clashes)} inputs would share "
+                         f"{len(clashes)} output path(s); use separate --output-dir runs")
+    return tasks
+
+
+_worker_coordinator = None
+
+
+def _init_worker(profile: bool, profile_top: int, quiet: bool):
+    """Process-pool initializer: each worker loads the models once and keeps its own coordinator"""
+    global _worker_coordinator
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    gliner, llm = load_models()
+    _worker_coordinator = CoordinatorAgent(gliner, llm, profile=profile, profile_top=profile_top)
+
+
+def _process_task(coordinator: CoordinatorAgent, file_path: str, compliance_type: str, output_path: str,
+                  fingerprint: bool = False) -> dict:
+    """handle_file, plus the input's size, mtime and content hash when a checkpoint needs them.
+
+    The fingerprint is taken before processing and left out when the file changed meanwhile,
+    so the checkpoint never records content other than what was redacted.
+    """
+    if not fingerprint:
+        return coordinator.handle_file(file_path, compliance_type, output_path)
+    try:
+        stat = os.stat(file_path)
+        sha256 = file_sha256(file_path)
+    except OSError:
+        return coordinator.handle_file(file_path, compliance_type, output_path)
+    result = coordinator.handle_file(file_path, compliance_type, output_path)
+    try:
+        after = os.stat(file_path)
+    except OSError:
+        return result
+    if (after.st_size, after.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+        result.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=sha256)
+    return result
+
+
+def _handle_in_worker(file_path: str, compliance_type: str, output_path: str, fingerprint: bool) -> dict:
+    return _process_task(_worker_coordinator, file_path, compliance_type, output_path, fingerprint)
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Append-only JSON-lines manifest of finished inputs, so an interrupted batch can resume.
+
+    Each line records one input: path, size, mtime, sha256, status and output. Lines are
+    appended with a single O_APPEND write, so a crash loses at most the line being written,
+    and a torn last line is ignored on load. The latest line per path wins; the file is
+    rewritten without superseded lines once they outnumber the live ones.
+    """
+    DONE = ("redacted", "no_pii")
+
+    def __init__(self, path: str):
+        self.path = path
+        # realpath -> (size, mtime_ns, sha256, status, output)
+        self.entries = {}
+        lines = 0
+        if os.path.exists(path):
+            complete = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    complete += len(line)
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["path"]] = (entry["size"], entry["mtime_ns"], entry["sha256"],
+                                                       entry["status"], entry["output"])
+                    except (ValueError, KeyError):
+                        continue
+                    lines += 1
+            # Cut a torn last line so the next append starts on a line of its own
+            if complete < os.path.getsize(path):
+                os.truncate(path, complete)
+        if lines > 2 * len(self.entries):
+            self._compact()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    @staticmethod
+    def _line(key: str, entry: tuple) -> bytes:
+        size, mtime_ns, sha256, status, output = entry
+        return (json.dumps({"path": key, "size": size, "mtime_ns": mtime_ns, "sha256": sha256,
+                            "status": status, "output": output}, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for key, entry in self.entries.items():
+                f.write(self._line(key, entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, file_path: str, output_path: str) -> bool:
+        """True when the input finished earlier, is unchanged and its output is where this run would put it"""
+        key = os.path.realpath(file_path)
+        entry = self.entries.get(key)
+        if entry is None or entry[3] not in self.DONE:
+            return False
+        size, mtime_ns, sha256, status, output = entry
+        if status == "redacted" and (output != output_path or not os.path.exists(output)):
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+            return True
+        # Touched but possibly not changed: the hash decides, and the new mtime is remembered
+        if stat.st_size == size and file_sha256(file_path) == sha256:
+            self._append(key, (size, stat.st_mtime_ns, sha256, status, output))
+            return True
+        return False
+
+    def record(self, result: dict):
+        if "sha256" not in result:
+            return
+        key = os.path.realpath(result["path"])
+        self._append(key, (result["size"], result["mtime_ns"], result["sha256"], result["status"], result["output"]))
+
+    def _append(self, key: str, entry: tuple):
+        os.write(self._fd, self._line(key, entry))
+        self.entries[key] = entry
+
+    def close(self):
+        os.fsync(self._fd)
+        os.close(self._fd)
+
+
+def run_batch(tasks: List[tuple], compliance_type: str, jobs: int = 1, coordinator: CoordinatorAgent = None,
+              executor: str = "thread", profile: bool = False, profile_top: int = 0, quiet: bool = False,
+              checkpoint: Checkpoint = None) -> List[dict]:
+    """Redact (file, output path) tasks on a pool of jobs workers; returns per-file results in completion order.
+
+    "thread" shares coordinator (and its models) between threads; "process" gives each worker
+    process its own models, which scales pure-Python detection past the GIL at the cost of
+    one model copy per worker. At most 4 * jobs files are queued at once. With a checkpoint,
+    each result is recorded as soon as it completes.
+    """
+    fingerprint = checkpoint is not None
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(profile, profile_top, quiet))
+        submit = lambda path, out: pool.submit(_handle_in_worker, path, compliance_type, out, fingerprint)
+    else:
+        pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="batch")
+        submit = lambda path, out: pool.submit(_process_task, coordinator, path, compliance_type, out, fingerprint)
+
+    results, pending = [], set()
+
+    def collect(futures):
+        for future in futures:
+            result = future.result()
+            if checkpoint is not None:
+                checkpoint.record(result)
+            results.append(result)
+
+    with pool:
+        for file_path, output_path in tasks:
+            pending.add(submit(file_path, output_path))
+            if len(pending) >= 4 * jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(as_completed(pending))
+    return results
+
+
+def summarize(results: List[dict], seconds: float, skipped: int = 0) -> dict:
+    counts = {status: 0 for status in ("redacted", "no_pii", "error", "missing")}
+    for result in results:
+        counts[result["status"]] += 1
+    latencies = sorted(result["seconds"] * 1000 for result in results)
+    total_bytes = sum(result["bytes"] for result in results)
+    return {
+        "files": len(results),
+        **counts,
+        "skipped": skipped,
+        "entities": sum(result["items"] for result in results),
+        "bytes": total_bytes,
+        "seconds": round(seconds, 3),
+        "files_per_second": round(len(results) / seconds, 2) if seconds else None,
+        "mb_per_second": round(total_bytes / (1024 * 1024) / seconds, 2) if seconds else None,
+        "p50_ms": round(latencies[len(latencies) // 2], 1) if latencies else None,
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1) if latencies else None,
+    }
+
+
+def print_summary(summary: dict, results: List[dict]):
+    print("\n" + "=" * 60)
+    print(f"📊 {summary['files']} files: {summary['redacted']} redacted, {summary['no_pii']} clean, "
+          f"{summary['error'] + summary['missing']} failed, {summary['entities']} entities")
+    if summary["skipped"]:
+        print(f"⏭️ {summary['skipped']} files already done per checkpoint")
+    if summary["files"]:
+        print(f"⚡ {summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s over {summary['seconds']}s "
+              f"(per file p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms)")
+    for result in results:
+        if result["status"] in ("error", "missing"):
+            print(f"❌ {result['path']}: {result['error']}")
+
+
+def interactive(coordinator: CoordinatorAgent):
+    """The original prompt-driven session, used when no input paths are given"""
     test_mode = input("Do you want to test with sample data first? (y/n): ").strip().lower()
     
     if test_mode == 'y':
         print("\n🧪 Testing with sample data...")
         sample_text = "Dear Mr. Thompson, please contact John Smith at john.smith@email.com or call 555-123-4567. Our office is located in New York."
-        redactor = RedactorAgent()
+        redactor = coordinator.redactor
         items = redactor.detect_sensitive_info(sample_text)
         redacted = redactor.redact(sample_text, items)
         print(f"Original: {sample_text}")
@@ -527,9 +875,78 @@ if __name__ == "__main__":
             continue
 
         print(f"\n🔄 Processing with {compliance_type} compliance...")
-        coordinator = CoordinatorAgent()
         coordinator.handle_files(file_paths, compliance_type)
         more = input("\nDo you want to process more files? (y/n): ").strip().lower()
         if more != "y":
             print("👋 Thank you for using the redaction system!")
             break
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Multi-Agent Sensitive Data Redaction System",
+        epilog="With no paths, runs the interactive prompt. Example: "
+               "python main.py contracts/ 'scans/**/*.pdf' --compliance GDPR --jobs 8 --output-dir redacted/"
+    )
+    parser.add_argument("paths", nargs="*", help="files, directories (searched recursively) or glob patterns")
+    parser.add_argument("--compliance", type=str.upper, choices=["GDPR", "HIPAA", "DPDP"], help="required with paths")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="files processed in parallel")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="thread shares one set of models; process loads them once per worker")
+    parser.add_argument("--output-dir", "-o", help="write outputs here, mirroring each input's path relative to "
+                                                   "its directory or glob root (default: beside the input)")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB", help="only files matching GLOB (repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="skip files matching GLOB (repeatable)")
+    parser.add_argument("--checkpoint", metavar="PATH", help="resume from and record progress in this manifest; "
+                                                             "finished unchanged files are skipped, failures retried")
+    parser.add_argument("--quiet", "-q", action="store_true", help="only print the final summary")
+    parser.add_argument("--profile", action="store_true", help="record per-stage time and memory in the audit log")
+    parser.add_argument("--profile-top", type=int, default=0, help="also record the N hottest functions per stage (cProfile)")
+    args = parser.parse_args()
+    profile = args.profile or args.profile_top > 0
+
+    if args.paths:
+        if not args.compliance:
+            parser.error("--compliance is required when paths are given")
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        inputs = collect_inputs(args.paths, args.include, args.exclude)
+        if not inputs:
+            parser.error("no PDF, TXT, JSON or DOCX files matched")
+        try:
+            tasks = plan_outputs(inputs, args.output_dir)
+        except ValueError as e:
+            parser.error(str(e))
+        checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+        skipped = 0
+        if checkpoint is not None:
+            total = len(tasks)
+            tasks = [(path, output) for path, output in tasks if not checkpoint.is_done(path, output)]
+            skipped = total - len(tasks)
+        print(f"🚀 Redacting {len(tasks)} files with {args.compliance} on {args.jobs} {args.executor} worker(s)")
+
+        with contextlib.redirect_stdout(open(os.devnull, "w") if args.quiet else sys.stdout):
+            coordinator = None
+            if args.executor == "thread":
+                gliner, llm = load_models()
+                coordinator = CoordinatorAgent(gliner, llm, profile=profile, profile_top=args.profile_top)
+            # Throughput covers the batch itself; process workers still load their models inside it
+            start = time.perf_counter()
+            try:
+                results = run_batch(tasks, args.compliance, args.jobs, coordinator, args.executor,
+                                    profile, args.profile_top, args.quiet, checkpoint)
+            finally:
+                if checkpoint is not None:
+                    checkpoint.close()
+        summary = summarize(results, time.perf_counter() - start, skipped)
+        print_summary(summary, results)
+        sys.exit(1 if summary["error"] or summary["missing"] else 0)
+
+    print("🚀 Multi-Agent Sensitive Data Redaction System with GLiNER")
+    print("=" * 60)
+    gliner, llm = load_models()
+    coordinator = CoordinatorAgent(gliner, llm, profile=profile, profile_top=args.profile_top)
+    print(f"GLiNER Status: {'✅ Loaded' if gliner else '❌ Not Available'}")
+    print(f"LLM Status: {'✅ Loaded' if llm else '❌ Not Available'}")
+    print()
+    interactive(coordinator)
@@ -1,20 +1,11 @@
 import json
 import re
-import fitz  # PyMuPDF
 from typing import List
-from gliner import GLiNER
+from config import get_gazetteer
 
 class RedactorAgent:
     def __init__(self, gliner_model=None):
         self.gliner = gliner_model
-        self.name_exclusions = {
-            'united states', 'new york', 'los angeles', 'san francisco',
-            'machine learning', 'data science', 'artificial intelligence',
-            'google drive', 'microsoft office', 'adobe acrobat', 'dear sir',
-            'dear madam', 'yours truly', 'best regards', 'thank you',
-            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
-            'i', 'a', 'the'  # Add common single words
-        }
     
     def detect_sensitive_info(self, text: str) -> List[dict]:
         all_results = []
@@ -96,30 +87,12 @@ class RedactorAgent:
         return found
     
     def _is_strong_name_match(self, name: str) -> bool:
-        """More selective name validation"""
-        name_lower = name.lower()
-        if name_lower in self.name_exclusions:
-            return False
-        
-        non_name_patterns = [
-            r'\b(mr|mrs|ms|dr|prof|sir|madam)\b',
-            r'\b(inc|llc|corp|ltd|co)\b',
-            r'\b(street|avenue|road|drive|lane)\b',
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\b'
-        ]
-        
-        for pattern in non_name_patterns:
-            if re.search(pattern, name_lower):
-                return False
-        
+        """More selective name validation: allow/deny lists first, then 1-3 words of 3-20 letters"""
+        listed = get_gazetteer().verdicts([name])[0]
+        if listed is not None:
+            return listed
         words = name.split()
-        if len(words) < 1 or len(words) > 3:  # Allow 1-3 words
-            return False
-        
-        if any(len(word) < 3 or len(word) > 20 for word in words):  # Minimum 3 letters
-            return False
-            
-        return True
+        return 1 <= len(words) <= 3 and all(3 <= len(word) <= 20 for word in words)
     
     def redact(self, text: str, sensitive_items: List[dict]) -> str:
         redacted_text = text
@@ -161,6 +134,7 @@ class RedactorAgent:
 
     def redact_pdf_pymupdf(self, file_path: str, sensitive_items: List[dict], output_path: str):
         try:
+            import fitz  # PyMuPDF
             doc = fitz.open(file_path)
             total_redactions = 0
             
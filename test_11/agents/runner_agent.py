@@ -1,10 +1,5 @@
 import os
 import json
-import docx
-from PyPDF2 import PdfReader
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from docx import Document
 
 class RunnerAgent:
     def load_text(self, file_path: str) -> str:
@@ -14,6 +9,7 @@ class RunnerAgent:
         
         if file_path.endswith(".pdf"):
             try:
+                from PyPDF2 import PdfReader
                 reader = PdfReader(file_path)
                 text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
             except Exception as e:
@@ -27,6 +23,7 @@ class RunnerAgent:
                 text = json.dumps(self.json_data, indent=2)
         elif file_path.endswith(".docx"):
             try:
+                import docx
                 doc = docx.Document(file_path)
                 text = "\n".join([para.text for para in doc.paragraphs if para.text])
                 if not text.strip():
@@ -68,6 +65,7 @@ class RunnerAgent:
                     f.write(redacted_text)
         elif file_type == "docx":
             try:
+                from docx import Document
                 doc = Document()
                 for paragraph in redacted_text.split("\n"):
                     if paragraph.strip():
@@ -76,6 +74,8 @@ class RunnerAgent:
             except Exception as e:
                 raise ValueError(f"Error saving DOCX: {str(e)}")
         elif file_type == "pdf":
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.pagesizes import letter
             c = canvas.Canvas(output_path, pagesize=letter)
             lines = redacted_text.split("\n")
             width, height = letter
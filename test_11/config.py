@@ -1,15 +1,38 @@
 import os
+import sys
+import time
+import threading
 from dotenv import load_dotenv
-from gliner import GLiNER
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 load_dotenv()
 
+# Job store, executors, ZIP streaming and upload ingest are shared with the Backend package
+BACKEND_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
 # Environment variables
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 UPLOAD_FOLDER = "temp_uploads"
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Asynchronous job API
+JOBS_FOLDER = os.getenv("JOBS_FOLDER", "jobs")
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(JOBS_FOLDER, "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Pipeline executor: "thread" or "process" for CPU stages, plus admission limit
+PIPELINE_EXECUTOR = os.getenv("PIPELINE_EXECUTOR", "thread")
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", str(os.cpu_count() or 2)))
+PIPELINE_IO_WORKERS = int(os.getenv("PIPELINE_IO_WORKERS", "8"))
+MAX_PENDING_REQUESTS = int(os.getenv("MAX_PENDING_REQUESTS", "16"))
+
+# Person-name allow/deny lists, os.pathsep-separated text files (Backend app.utils.gazetteer)
+NAME_ALLOWLIST_PATHS = os.getenv("NAME_ALLOWLIST_PATHS", "")
+NAME_DENYLIST_PATHS = os.getenv("NAME_DENYLIST_PATHS", "")
+NAME_DENY_TERM_PATHS = os.getenv("NAME_DENY_TERM_PATHS", "")
+GAZETTEER_CACHE_DIR = os.getenv("GAZETTEER_CACHE_DIR", "gazetteer_cache")
+
 # Supported file types
 SUPPORTED_EXTENSIONS = {'.pdf', '.txt', '.json', '.docx'}
 
@@ -20,15 +43,43 @@ COMPLIANCE_MAPPING = {
     3: "DPDP"
 }
 
-# Global models (initialized on startup)
+# Global models, loaded once per process (at startup, or on first use in pool workers)
 gliner_model = None
 llm_model = None
+models_ready = False
+warmup_seconds = None
+_models_lock = threading.Lock()
+
+WARMUP_TEXT = "John Smith from Acme Corp emailed john.smith@example.com about the Paris office."
 
 def initialize_models():
-    """Initialize GLiNER and LLM models"""
+    """Initialize GLiNER and LLM models once and run a warmup inference"""
+    global gliner_model, llm_model, models_ready, warmup_seconds
+    with _models_lock:
+        if models_ready:
+            return
+        start = time.perf_counter()
+        _load_models()
+        if gliner_model is not None:
+            try:
+                gliner_model.predict_entities(WARMUP_TEXT, labels=["Person", "Organization", "Email"], threshold=0.5)
+            except Exception as e:
+                print(f"⚠️ GLiNER warmup failed: {e}")
+        warmup_seconds = round(time.perf_counter() - start, 3)
+        models_ready = True
+        print(f"🔥 Models ready in {warmup_seconds}s")
+
+def get_models() -> tuple:
+    """Shared (gliner_model, llm_model), loading them on first use"""
+    if not models_ready:
+        initialize_models()
+    return gliner_model, llm_model
+
+def _load_models():
     global gliner_model, llm_model
     
     try:
+        from gliner import GLiNER
         gliner_model = GLiNER.from_pretrained("urchade/gliner_medium-v2.1")
         print("✅ GLiNER NER model loaded")
     except Exception as e:
@@ -37,6 +88,7 @@ def initialize_models():
 
     try:
         if GEMINI_API_KEY:
+            from langchain_google_genai import ChatGoogleGenerativeAI
             llm_model = ChatGoogleGenerativeAI(
                 model="gemini-2.5-flash",
                 temperature=0,
@@ -50,6 +102,18 @@ def initialize_models():
         print(f"❌ Failed to load Gemini LLM: {e}")
         llm_model = None
 
+_gazetteer = None
+
+def get_gazetteer():
+    """Compiled name lists, shared by every redactor in the process; compiled or mapped on first use"""
+    global _gazetteer
+    with _models_lock:
+        if _gazetteer is None:
+            from app.utils.gazetteer import gazetteer_for
+            _gazetteer = gazetteer_for(NAME_ALLOWLIST_PATHS, NAME_DENYLIST_PATHS, NAME_DENY_TERM_PATHS,
+                                       GAZETTEER_CACHE_DIR)
+    return _gazetteer
+
 def ensure_upload_folder():
     """Ensure upload folder exists"""
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
\ No newline at end of file
@@ -1,26 +1,70 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List
 import os
-import zipfile
-import tempfile
-from contextlib import asynccontextmanager
+import uuid
+import asyncio
+import threading
+from contextlib import asynccontextmanager, AsyncExitStack
 
-from config import initialize_models, ensure_upload_folder, gliner_model, llm_model
+import config
+from config import (
+    initialize_models, get_models, ensure_upload_folder, JOBS_FOLDER, JOBS_DB_PATH, JOB_WORKERS,
+    PIPELINE_EXECUTOR, PIPELINE_WORKERS, PIPELINE_IO_WORKERS, MAX_PENDING_REQUESTS
+)
 from agents import CoordinatorAgent
+from app.utils.jobs import JobStore, JobWorkerPool, summarize_job
+from app.utils.executors import PipelineExecutor, AdmissionRejected
+from app.utils.zip_stream import stream_zip, astream_zip
 from utils import save_upload_file, cleanup_files, validate_compliance_number
-from models import SingleFileResponse, MultipleFileResponse, ErrorResponse
+from models import SingleFileResponse, MultipleFileResponse, ErrorResponse, JobResponse, JobStatusResponse
+
+job_store = None
+job_pool = None
+pipeline = None
+
+def process_file(file_path: str, compliance_type: str) -> dict:
+    """Pipeline entry point run inside the executor (module-level so a process pool can pickle it)"""
+    coordinator = CoordinatorAgent(*get_models())
+    result = coordinator.process_single_file(file_path, compliance_type)
+    result["file_path"] = file_path
+    return result
+
+def has_redacted_output(result: dict) -> bool:
+    return result["status"] == "success" and bool(result["redacted_file"])
+
+def process_job_file(file_path: str, compliance_type: str, work_dir: str) -> tuple:
+    """Job worker hook: run one stored upload through the coordinator"""
+    coordinator = CoordinatorAgent(*get_models())
+    result = coordinator.process_single_file(file_path, compliance_type)
+    if result["status"] == "error":
+        raise RuntimeError(result["message"])
+    return result["redacted_file"], result["audit_log"]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 Starting Multi-Agent Sensitive Data Redaction API")
     print("=" * 60)
-    initialize_models()
+    global job_store, job_pool, pipeline
+    # Load and warm the models in the background so /health answers during startup
+    threading.Thread(target=initialize_models, name="model-warmup", daemon=True).start()
     ensure_upload_folder()
+    pipeline = PipelineExecutor(
+        mode=PIPELINE_EXECUTOR,
+        workers=PIPELINE_WORKERS,
+        io_workers=PIPELINE_IO_WORKERS,
+        max_pending=MAX_PENDING_REQUESTS
+    )
+    job_store = JobStore(JOBS_DB_PATH)
+    job_pool = JobWorkerPool(job_store, process_job_file, JOBS_FOLDER, JOB_WORKERS)
+    job_pool.start()
     print("✅ API Ready!")
     yield
     print("👋 Shutting down API")
+    job_pool.stop()
+    job_store.close()
+    pipeline.shutdown()
 
 app = FastAPI(
     title="Data Redaction API",
@@ -29,6 +73,14 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"status": "error", "message": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -49,10 +101,17 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "gliner_loaded": gliner_model is not None,
-        "llm_loaded": llm_model is not None
+        "gliner_loaded": config.gliner_model is not None,
+        "llm_loaded": config.llm_model is not None,
+        "pipeline": pipeline.stats() if pipeline else None
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the models are loaded and warmed up"""
+    content = {"ready": config.models_ready, "warmup_seconds": config.warmup_seconds}
+    return JSONResponse(status_code=200 if config.models_ready else 503, content=content)
+
 @app.post("/redact/single", response_model=SingleFileResponse)
 async def redact_single_file(
     background_tasks: BackgroundTasks,
@@ -63,58 +122,56 @@ async def redact_single_file(
     redacted_file_path = None
     audit_log_path = None
 
-    try:
-        compliance_type = validate_compliance_number(complianceNum)
-        temp_file_path = await save_upload_file(file)
-        coordinator = CoordinatorAgent(gliner_model, llm_model)
-        result = coordinator.process_single_file(temp_file_path, compliance_type)
+    async with pipeline.admit():
+        try:
+            compliance_type = validate_compliance_number(complianceNum)
+            temp_file_path = await save_upload_file(file)
+            result = await pipeline.run_cpu(process_file, temp_file_path, compliance_type)
 
-        if result["status"] == "error":
-            raise HTTPException(status_code=500, detail=result["message"])
+            if result["status"] == "error":
+                raise HTTPException(status_code=500, detail=result["message"])
 
-        redacted_file_path = result["redacted_file"]
-        audit_log_path = result["audit_log"]
+            redacted_file_path = result["redacted_file"]
+            audit_log_path = result["audit_log"]
 
-        if not redacted_file_path:
-            return SingleFileResponse(
-                status="success",
-                message="No sensitive information detected in the file",
-                redacted_file=None,
-                audit_log=None,
-                redacted_items_count=0
-            )
+            if not redacted_file_path:
+                return SingleFileResponse(
+                    status="success",
+                    message="No sensitive information detected in the file",
+                    redacted_file=None,
+                    audit_log=None,
+                    redacted_items_count=0
+                )
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as zip_temp:
-            with zipfile.ZipFile(zip_temp.name, 'w') as zipf:
-                if os.path.exists(redacted_file_path):
-                    zipf.write(redacted_file_path, os.path.basename(redacted_file_path))
-                if audit_log_path and os.path.exists(audit_log_path):
-                    zipf.write(audit_log_path, os.path.basename(audit_log_path))
-            zip_path = zip_temp.name
+            entries = [
+                (os.path.basename(path), path)
+                for path in (redacted_file_path, audit_log_path)
+                if path and os.path.exists(path)
+            ]
+            background_tasks.add_task(cleanup_files, temp_file_path, redacted_file_path, audit_log_path)
 
-        background_tasks.add_task(cleanup_files, temp_file_path, redacted_file_path, audit_log_path, zip_path)
+            return StreamingResponse(
+                stream_zip(entries),
+                media_type="application/zip",
+                headers={"Content-Disposition": f"attachment; filename=redacted_{file.filename.rsplit('.', 1)[0]}.zip"}
+            )
 
-        return FileResponse(
-            path=zip_path,
-            filename=f"redacted_{file.filename.rsplit('.', 1)[0]}.zip",
-            media_type="application/zip"
-        )
-
-    except HTTPException as e:
-        cleanup_files(temp_file_path, redacted_file_path, audit_log_path)
-        raise
-    except Exception as e:
-        cleanup_files(temp_file_path, redacted_file_path, audit_log_path)
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        except HTTPException as e:
+            cleanup_files(temp_file_path, redacted_file_path, audit_log_path)
+            raise
+        except Exception as e:
+            cleanup_files(temp_file_path, redacted_file_path, audit_log_path)
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.post("/redact/multiple", response_model=MultipleFileResponse)
 async def redact_multiple_files(
-    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     complianceNum: int = Form(...)
 ):
     temp_file_paths = []
-    output_files = []
+    # Admission and upload cleanup are held until the streamed ZIP has been sent
+    stack = AsyncExitStack()
+    await stack.enter_async_context(pipeline.admit())
 
     try:
         compliance_type = validate_compliance_number(complianceNum)
@@ -125,21 +182,20 @@ async def redact_multiple_files(
         for file in files:
             temp_path = await save_upload_file(file)
             temp_file_paths.append(temp_path)
+        stack.callback(cleanup_files, *temp_file_paths)
 
-        coordinator = CoordinatorAgent(gliner_model, llm_model)
-        results = coordinator.process_multiple_files(temp_file_paths, compliance_type)
+        # Files finish in any order; wait only until the first one produces output
+        completed = asyncio.as_completed([
+            pipeline.run_cpu(process_file, path, compliance_type) for path in temp_file_paths
+        ])
+        results = []
+        for next_result in completed:
+            results.append(await next_result)
+            if has_redacted_output(results[-1]):
+                break
 
-        successful_count = sum(1 for r in results if r["status"] == "success" and r["redacted_file"])
-        failed_count = len(results) - successful_count
-
-        for result in results:
-            if result["status"] == "success" and result["redacted_file"]:
-                if os.path.exists(result["redacted_file"]):
-                    output_files.append(result["redacted_file"])
-                if result["audit_log"] and os.path.exists(result["audit_log"]):
-                    output_files.append(result["audit_log"])
-
-        if not output_files:
+        if not has_redacted_output(results[-1]):
+            await stack.aclose()
             return MultipleFileResponse(
                 status="success",
                 message="No sensitive information detected in any files",
@@ -149,28 +205,79 @@ async def redact_multiple_files(
                 results=results
             )
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as zip_temp:
-            with zipfile.ZipFile(zip_temp.name, 'w') as zipf:
-                for file_path in output_files:
-                    if os.path.exists(file_path):
-                        zipf.write(file_path, os.path.basename(file_path))
-            zip_path = zip_temp.name
+        async def redacted_entries():
+            """Zip each file into the response as soon as it finishes, then delete its outputs"""
+            result = results[-1]
+            while result is not None:
+                if has_redacted_output(result):
+                    for path in (result["redacted_file"], result["audit_log"]):
+                        if path and os.path.exists(path):
+                            yield os.path.basename(path), path
+                    cleanup_files(result["redacted_file"], result["audit_log"])
+                next_result = next(completed, None)
+                result = await next_result if next_result is not None else None
 
-        background_tasks.add_task(cleanup_files, *temp_file_paths, *output_files, zip_path)
+        async def body():
+            try:
+                async for chunk in astream_zip(redacted_entries()):
+                    yield chunk
+            finally:
+                await stack.aclose()
 
-        return FileResponse(
-            path=zip_path,
-            filename="redacted_files.zip",
-            media_type="application/zip"
+        return StreamingResponse(
+            body(),
+            media_type="application/zip",
+            headers={"Content-Disposition": "attachment; filename=redacted_files.zip"}
         )
 
     except HTTPException as e:
-        cleanup_files(*temp_file_paths, *output_files)
+        await stack.aclose()
+        cleanup_files(*temp_file_paths)
         raise
     except Exception as e:
-        cleanup_files(*temp_file_paths, *output_files)
+        await stack.aclose()
+        cleanup_files(*temp_file_paths)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(
+    files: List[UploadFile] = File(...),
+    complianceNum: int = Form(...)
+):
+    compliance_type = validate_compliance_number(complianceNum)
+    job_id = str(uuid.uuid4())
+    job_dir = job_pool.job_dir(job_id)
+
+    saved = []
+    for file in files:
+        saved.append((file.filename, await save_upload_file(file, job_dir)))
+
+    job_store.create_job(job_id, compliance_type, saved)
+    job_pool.submit(job_id)
+    return JobResponse(job_id=job_id, status="queued", status_url=f"/jobs/{job_id}")
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    summary = summarize_job(job)
+    summary["download_url"] = f"/jobs/{job_id}/download" if job["result_path"] else None
+    return JobStatusResponse(**summary)
+
+@app.get("/jobs/{job_id}/download")
+async def download_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed" or not job["result_path"] or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=409, detail=f"Job result not available (status: {job['status']})")
+    return FileResponse(
+        path=job["result_path"],
+        filename=f"redacted_job_{job_id}.zip",
+        media_type="application/zip"
+    )
+
 @app.get("/compliance-types")
 async def get_compliance_types():
     from config import COMPLIANCE_MAPPING
@@ -22,4 +22,20 @@ class MultipleFileResponse(BaseModel):
 class ErrorResponse(BaseModel):
     status: str
     message: str
-    detail: Optional[str] = None
\ No newline at end of file
+    detail: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    compliance_type: str
+    progress: dict
+    files: List[dict]
+    error: Optional[str] = None
+    download_url: Optional[str] = None
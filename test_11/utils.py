@@ -1,76 +1,23 @@
 import os
-import uuid
-import aiofiles
-import zipfile
-from fastapi import UploadFile, HTTPException
 import logging
+from fastapi import UploadFile, HTTPException
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-from config import SUPPORTED_EXTENSIONS, MAX_FILE_SIZE, UPLOAD_FOLDER
+from config import MAX_FILE_SIZE, UPLOAD_FOLDER
+from app.utils.ingest import IngestError, aspool_upload
 
-async def save_upload_file(upload_file: UploadFile) -> str:
-    """Save uploaded file to temporary location with streaming and validation"""
-    # Validate file extension
-    file_ext = os.path.splitext(upload_file.filename)[1].lower()
-    if file_ext not in SUPPORTED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Unsupported file type. Supported: {', '.join(SUPPORTED_EXTENSIONS)}"
-        )
-    
-    # Create upload directory if it doesn't exist
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-    
-    # Stream file content to avoid memory issues
-    total_size = 0
+async def save_upload_file(upload_file: UploadFile, folder: str = UPLOAD_FOLDER) -> str:
+    """Stream the upload to a temporary file, checking size and format and hashing it in the same pass"""
     try:
-        async with aiofiles.open(file_path, 'wb') as f:
-            while True:
-                chunk = await upload_file.read(1024 * 1024)  # Read 1MB chunks
-                if not chunk:
-                    break
-                total_size += len(chunk)
-                if total_size > MAX_FILE_SIZE:
-                    raise HTTPException(
-                        status_code=413,
-                        detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024):.1f}MB"
-                    )
-                await f.write(chunk)
-        logger.debug(f"Saved file to {file_path}, size: {total_size} bytes")
-        # Reset file pointer for potential re-reading
-        await upload_file.seek(0)
-    except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        logger.error(f"Error saving file {file_path}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
-    
-    # Validate DOCX if applicable
-    if file_ext == ".docx":
-        try:
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                logger.debug(f"Testing ZIP integrity for {file_path}")
-                test_result = zip_ref.testzip()
-                if test_result is not None:
-                    raise zipfile.BadZipFile(f"Invalid DOCX: Corrupted file at {test_result}")
-                logger.debug(f"ZIP validation passed for {file_path}")
-        except zipfile.BadZipFile as e:
-            os.remove(file_path)
-            logger.error(f"Invalid DOCX file {file_path}: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid DOCX file: {str(e)}")
-        except Exception as e:
-            os.remove(file_path)
-            logger.error(f"Unable to validate ZIP structure for {file_path}: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid DOCX file: Unable to validate ZIP structure - {str(e)}")
-    
-    return file_path
+        upload = await aspool_upload(upload_file, folder, MAX_FILE_SIZE)
+    except IngestError as e:
+        logger.error(f"Rejected upload {upload_file.filename}: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    logger.debug(f"Saved file to {upload['path']}, size: {upload['size']} bytes, sha256: {upload['sha256']}")
+    return upload["path"]
 
 def cleanup_files(*file_paths):
     """Clean up temporary files"""
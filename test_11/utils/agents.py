@@ -4,36 +4,13 @@ import json
 import re
 import time
 from typing import List
-from PyPDF2 import PdfReader
-from docx import Document
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import fitz  # PyMuPDF
-from langchain_google_genai import ChatGoogleGenerativeAI
-from gliner import GLiNER
-from dotenv import load_dotenv
-
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-try:
-    GLiNER.from_pretrained("urchade/gliner_base")
-except:
-    gliner = None
-
-try:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0,
-        google_api_key=GEMINI_API_KEY,
-        timeout=30
-    )
-except:
-    llm = None
+
+# Models are loaded once per process by config.get_models() and injected into the agents
 
 class RunnerAgent:
     def load_text(self, file_path: str) -> str:
         if file_path.endswith(".pdf"):
+            from PyPDF2 import PdfReader
             reader = PdfReader(file_path)
             text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
         elif file_path.endswith(".txt"):
@@ -44,6 +21,7 @@ class RunnerAgent:
                 self.json_data = json.load(f)
                 text = json.dumps(self.json_data, indent=2)
         elif file_path.endswith(".docx"):
+            from docx import Document
             doc = Document(file_path)
             text = "\n".join([para.text for para in doc.paragraphs])
         else:
@@ -67,11 +45,14 @@ class RunnerAgent:
                 with open(output_path, "w", encoding="utf-8") as f:
                     f.write(redacted_text)
         elif file_type == "docx":
+            from docx import Document
             doc = Document()
             for paragraph in redacted_text.split("\n"):
                 doc.add_paragraph(paragraph)
             doc.save(output_path)
         elif file_type == "pdf":
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.pagesizes import letter
             c = canvas.Canvas(output_path, pagesize=letter)
             lines = redacted_text.split("\n")
             width, height = letter
@@ -85,14 +66,15 @@ class RunnerAgent:
             c.save()
 
 class RedactorAgent:
-    def __init__(self):
+    def __init__(self, gliner_model=None):
+        self.gliner = gliner_model
         self.name_exclusions = {"united states", "new york", "monday", "tuesday"}
 
     def detect_sensitive_info(self, text: str) -> List[dict]:
         results = []
-        if gliner is not None:
+        if self.gliner is not None:
             try:
-                entities = gliner.predict_entities(text[:5000], labels=[
+                entities = self.gliner.predict_entities(text[:5000], labels=[
                     "Person", "Organization", "Date", "Email", "Phone",
                     "Location", "URL", "Money", "Time"
                 ], threshold=0.4)
@@ -137,6 +119,7 @@ class RedactorAgent:
 
     def redact_pdf_pymupdf(self, file_path: str, sensitive_items: List[dict], output_path: str):
         try:
+            import fitz  # PyMuPDF
             doc = fitz.open(file_path)
             for page in doc:
                 for item in sensitive_items:
@@ -150,6 +133,9 @@ class RedactorAgent:
             pass
 
 class ComplianceAgent:
+    def __init__(self, llm=None):
+        self.llm = llm
+
     def apply_policy(self, pii_items: list, compliance_type: str) -> list:
         redactions = []
         for item in pii_items:
@@ -164,14 +150,14 @@ class ComplianceAgent:
         return redactions
 
     def validate_redaction(self, redacted_text: str, compliance_type: str) -> str:
-        if llm is None:
+        if self.llm is None:
             return f"Compliance validation skipped."
         try:
             prompt = (
                 f"You are validating redaction under {compliance_type}.\n"
                 f"Redacted Text: {redacted_text[:1000]}"
             )
-            result = llm.invoke(prompt)
+            result = self.llm.invoke(prompt)
             return result.content if hasattr(result, 'content') else str(result)
         except:
             return "Compliance validation failed."
@@ -192,10 +178,10 @@ class AuditAgent:
             json.dump(metadata, f, indent=2)
 
 class CoordinatorAgent:
-    def __init__(self):
+    def __init__(self, gliner_model=None, llm=None):
         self.runner = RunnerAgent()
-        self.redactor = RedactorAgent()
-        self.compliance = ComplianceAgent()
+        self.redactor = RedactorAgent(gliner_model)
+        self.compliance = ComplianceAgent(llm)
         self.audit = AuditAgent()
 
     def handle_files(self, file_paths: List[str], compliance_type: str):